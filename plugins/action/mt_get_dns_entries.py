@@ -0,0 +1,26 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.basic import missing_required_lib
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
+from ansible_collections.andrei.utils.plugins.module_utils.mt.dns import (
+    HAS_NETADDR,
+    get_dns_entries,
+)
+from ansible_collections.andrei.utils.plugins.plugin_utils.mt_action import (
+    MTActionBase,
+)
+
+
+class ActionModule(MTActionBase):
+    argument_spec = argspec.DNS_ENTRIES
+    mutually_exclusive = argspec.DNS_ENTRIES_MUTUALLY_EXCLUSIVE
+
+    def compute(self, params, warnings):
+        if not HAS_NETADDR:
+            raise AnsibleActionFail(missing_required_lib("netaddr"))
+        return get_dns_entries(warn=warnings.append, **params)
@@ -0,0 +1,20 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    get_bridge_vlan,
+)
+from ansible_collections.andrei.utils.plugins.plugin_utils.mt_action import (
+    MTActionBase,
+)
+
+
+class ActionModule(MTActionBase):
+    argument_spec = argspec.INTERFACE_BRIDGE_VLAN
+
+    def compute(self, params, warnings):
+        return get_bridge_vlan(**params)
@@ -8,6 +8,7 @@
 """
 The items2dictlist filter plugin
 """
+
 from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
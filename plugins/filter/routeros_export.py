@@ -0,0 +1,93 @@
+#
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+
+"""
+The routeros_export filter plugin
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: routeros_export
+    author: Andrei Costescu (@cosandr)
+    version_added: "1.4.0"
+    short_description: Parse RouterOS export output into entry lists.
+    positional: _input, paths
+    description:
+        - Parses the output of C(/export terse) or C(/export) into the entries added under each menu path.
+        - The result can be used as I(existing) of the C(mt_get_*) modules, so a device is read with one command.
+        - Values are converted like the API does, C(yes) and C(no) to booleans and whole numbers to integers.
+        - Exported entries have no C(.id) and default values are not exported.
+        - Entries of C(interface vlan) and C(interface bridge port) get the defaults of missing fields,
+          so they can be compared like entries read with community.routeros.api_info and C(hide_defaults=false).
+        - Entries of other paths only have the exported fields, use them with modules that only compare
+          the fields they set, like the switch table and DNS modules.
+    options:
+        _input:
+            description:
+                - Export output as a string or a list of lines.
+            type: raw
+            required: true
+        paths:
+            description:
+                - Menu paths to return, like C(interface ethernet switch vlan).
+                - Paths without entries are returned as empty lists.
+                - All paths are returned if not set.
+            type: list
+            elements: str
+            required: false
+"""
+
+EXAMPLES = """
+    - name: Export configuration
+      community.routeros.command:
+        commands:
+          - /export terse
+      register: __export
+
+    - name: Get switch VLAN lists
+      andrei.utils.mt_get_interface_sw_vlan:
+        existing: "{{ (__export.stdout[0] | andrei.utils.routeros_export)['interface ethernet switch vlan'] | default([]) }}"
+        networks: "{{ mt_networks }}"
+        trunk_ports: [ether1]
+"""
+
+RETURN = """
+    _value:
+        description: Mapping of menu path to the list of entries added there.
+        type: dict
+"""
+
+
+from ansible.errors import AnsibleFilterError, AnsibleTypeError
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt.export import (
+    parse_export,
+)
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import MTError
+
+
+def routeros_export(_input, paths=None):
+    """Parse RouterOS export output into entry lists per menu path."""
+    if not isinstance(_input, (str, list)):
+        raise AnsibleTypeError(
+            "routeros_export requires a string or list, got %s instead." % type(_input)
+        )
+    try:
+        return parse_export(_input, paths)
+    except MTError as e:
+        raise AnsibleFilterError("routeros_export: %s" % to_text(e))
+
+
+class FilterModule(object):
+    """RouterOS filters"""
+
+    def filters(self):
+        return {
+            "routeros_export": routeros_export,
+        }
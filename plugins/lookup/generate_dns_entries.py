@@ -0,0 +1,138 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+  name: generate_dns_entries
+  author: Andrei Costescu (@cosandr)
+  version_added: "1.4.0"
+  short_description: Generates static DNS entries for all managed hosts
+  description:
+      - This lookup returns A and AAAA records for every host with a C(host_num), in the format
+        expected by the I(data) option of M(andrei.utils.mt_get_dns_entries).
+      - Addresses are computed like the andrei.utils.generate_hosts lookup in a single pass over the inventory.
+      - Hosts are returned in name order, records of a host in the order of I(address_vars).
+  options:
+    _terms:
+      description: N/A
+      required: false
+    domain:
+      description:
+        - Domain appended to host names.
+        - Host names already ending with the domain are not changed.
+      type: str
+      required: false
+    address_vars:
+      description:
+        - Computed addresses to create records for.
+        - Valid values are C(ansible_host), C(ansible_host6), C(wireguard_ip) and C(wireguard_ip6).
+      type: list
+      elements: str
+      default: [ansible_host, ansible_host6]
+    wildcard:
+      description:
+        - Also create regexp records matching all subdomains of each host.
+        - For example C(^.*\.server1\.example\.com$) for C(server1.example.com).
+      type: bool
+      default: false
+    ttl:
+      description: TTL of all records.
+      type: str
+      required: false
+    comment:
+      description: Comment of all records, useful with I(comment_regex) of M(andrei.utils.mt_get_dns_entries).
+      type: str
+      required: false
+"""
+
+EXAMPLES = r"""
+  - name: Get DNS entry lists
+    andrei.utils.mt_get_dns_entries:
+      existing: "{{ __mt_dns.result }}"
+      data: "{{ query('andrei.utils.generate_dns_entries', domain='example.com', comment='ansible') }}"
+      comment_regex: "^ansible$"
+    register: __dns_lists
+"""
+
+RETURN = r"""
+  _raw:
+     description:
+        - Static DNS entries with C(name) or C(regexp) and C(address).
+        - IPv6 entries have C(type=AAAA).
+     type: list
+     elements: dict
+"""
+
+from ansible.errors import AnsibleLookupError
+from ansible.module_utils.basic import missing_required_lib
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.andrei.utils.plugins.plugin_utils.host_addresses import (
+    NETADDR_IMPORT_ERROR,
+    compute_host_addresses,
+)
+
+ADDRESS_VARS = ("ansible_host", "ansible_host6", "wireguard_ip", "wireguard_ip6")
+
+
+def host_fqdn(name, domain):
+    if not domain or name == domain or name.endswith("." + domain):
+        return name
+    return "%s.%s" % (name, domain)
+
+
+def make_records(fqdn, addresses, address_vars, wildcard, extra):
+    records = []
+    for var in address_vars:
+        address = addresses.get(var)
+        if not address:
+            continue
+        names = [("name", fqdn)]
+        if wildcard:
+            names.append(("regexp", "^.*\\.%s$" % fqdn.replace(".", "\\.")))
+        for field, value in names:
+            record = {field: value, "address": address}
+            if ":" in address:
+                record["type"] = "AAAA"
+            record.update(extra)
+            records.append(record)
+    return records
+
+
+class LookupModule(LookupBase):
+    def run(self, terms, variables, **kwargs):
+        if NETADDR_IMPORT_ERROR:
+            raise AnsibleLookupError(
+                missing_required_lib("netaddr")
+            ) from NETADDR_IMPORT_ERROR
+
+        self.set_options(var_options=variables, direct=kwargs)
+        domain = self.get_option("domain")
+        address_vars = self.get_option("address_vars")
+        invalid = [v for v in address_vars if v not in ADDRESS_VARS]
+        if invalid:
+            raise AnsibleLookupError(
+                "Invalid address_vars %s, expected %s"
+                % (", ".join(invalid), ", ".join(ADDRESS_VARS))
+            )
+        extra = {}
+        for field in ("ttl", "comment"):
+            value = self.get_option(field)
+            if value is not None:
+                extra[field] = value
+
+        ret = []
+        hostvars = variables["hostvars"]
+        for name in sorted(hostvars):
+            addresses = compute_host_addresses(name, hostvars[name])
+            ret.extend(
+                make_records(
+                    host_fqdn(name, domain),
+                    addresses,
+                    address_vars,
+                    self.get_option("wildcard"),
+                    extra,
+                )
+            )
+        return ret
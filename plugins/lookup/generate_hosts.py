@@ -16,6 +16,25 @@ DOCUMENTATION = r"""
     _terms:
       description: N/A
       required: false
+    cache_file:
+      description:
+        - Path to a JSON file used to cache computed addresses between runs.
+        - Each host is stored with a fingerprint of its address variables and the subnets they refer to,
+          only hosts whose fingerprint changed are recomputed.
+        - The file is created if it does not exist and rewritten when its content changes.
+      type: path
+      required: false
+    auto_host_num:
+      description:
+        - Assign the lowest free C(host_num) to hosts that define C(host_net) and C(host_subnet) but no C(host_num).
+        - Numbers are unique per C(host_net) and C(host_subnet) pair, hosts are assigned in name order.
+        - Assigned numbers are added as a C(host_num) column so they can be persisted in the inventory.
+      type: bool
+      default: false
+    auto_host_num_start:
+      description: Lowest number that may be assigned by I(auto_host_num).
+      type: int
+      default: 1
 """
 
 EXAMPLES = r"""
@@ -27,6 +46,24 @@ EXAMPLES = r"""
       dest: "{{ hosts_dest }}"
       marker: "# {mark} AUTO GENERATED VARIABLES"
       insertafter: '^\[\all]$'
+
+  - name: Add block to hosts file, only recomputing changed hosts
+    delegate_to: localhost
+    run_once: true
+    ansible.builtin.blockinfile:
+      content: "{{ lookup('andrei.utils.generate_hosts', cache_file=playbook_dir ~ '/.generate_hosts.json') }}"
+      dest: "{{ hosts_dest }}"
+      marker: "# {mark} AUTO GENERATED VARIABLES"
+      insertafter: '^\[\all]$'
+
+  - name: Add block to hosts file, assigning host_num to new hosts
+    delegate_to: localhost
+    run_once: true
+    ansible.builtin.blockinfile:
+      content: "{{ lookup('andrei.utils.generate_hosts', auto_host_num=true, auto_host_num_start=10) }}"
+      dest: "{{ hosts_dest }}"
+      marker: "# {mark} AUTO GENERATED VARIABLES"
+      insertafter: '^\[\all]$'
 """
 
 RETURN = r"""
@@ -37,50 +74,99 @@ RETURN = r"""
      elements: string
 """
 
+from collections import ChainMap
+
 from ansible.errors import AnsibleLookupError
 from ansible.module_utils.basic import missing_required_lib
-from ansible.module_utils.common.text.converters import to_text
 from ansible.plugins.lookup import LookupBase
-from ansible_collections.andrei.utils.plugins.module_utils.network import (
-    NetworkError,
-    ipaddr_concat,
+from ansible_collections.andrei.utils.plugins.plugin_utils.host_addresses import (
+    check_ip_duplicates,
+    compute_host_addresses,
+    get_host_inputs,
+    host_fingerprint,
+    load_cache,
+    num6_offset,
+    save_cache,
 )
 from ansible_collections.ansible.utils.plugins.filter import ipv4, ipv6
 
 try:
-    from netaddr import IPAddress
+    from netaddr import IPAddress, IPNetwork
 except ImportError as imp_exc:
     NETADDR_IMPORT_ERROR = imp_exc
 else:
     NETADDR_IMPORT_ERROR = None
 
 
-def wrap_exception(fn, *args, **kwargs):
-    try:
-        return fn(*args, **kwargs)
-    except NetworkError as e:
-        raise AnsibleLookupError(to_text(e))
+def lowest_free_bit(bitmap, start=0):
+    """Index of the lowest unset bit in bitmap, at or above start"""
+    # Mark everything below start as used
+    bitmap |= (1 << start) - 1
+    return (~bitmap & (bitmap + 1)).bit_length() - 1
+
 
+def subnet_capacity(cidrs, v6_offset=1):
+    """Number of host_num values that fit in all address families of a subnet
+    v6_offset is added to host_num for IPv6, see num6_offset.
+    """
+    capacity = None
+    for family_cidrs, offset in ((ipv4.ipv4(cidrs), 0), (ipv6.ipv6(cidrs), v6_offset)):
+        if not family_cidrs:
+            continue
+        size = sum(IPNetwork(c).size for c in family_cidrs) - offset
+        if capacity is None or size < capacity:
+            capacity = size
+    return capacity
 
-def check_ip_duplicates(data):
-    # List if tuples containg (name, ip)
-    # Allows for more useful error messages than just IPs
-    checked = []
 
-    def _check_ip(ip):
-        for other_name, other_ip in checked:
-            if ip == other_ip:
-                return other_name
-        return None
+def assign_host_nums(hostvars, start):
+    """Assign the lowest free host_num to hosts without one
+    Returns a mapping of host name to assigned number.
+    """
+    # Bitmap of used host numbers per (host_net, host_subnet), built in one pass
+    used = {}
+    missing = []
+    # Numbers above this can never be the lowest free one, skip them to keep bitmaps small
+    limit = start + len(hostvars)
+    for name, hv in hostvars.items():
+        if "host_net" not in hv or "host_subnet" not in hv:
+            continue
+        key = (hv["host_net"], hv["host_subnet"])
+        if "host_num" in hv:
+            num = hv["host_num"]
+            if isinstance(num, bool) or not isinstance(num, int) or num < 0:
+                raise AnsibleLookupError(
+                    "host_num of %s must be an integer >= 0, got %r" % (name, num)
+                )
+            if num < limit:
+                used[key] = used.get(key, 0) | (1 << num)
+        else:
+            missing.append((name, key))
 
-    for name, ips in data.items():
-        for ip in ips.values():
-            dup = _check_ip(ip)
-            if dup is not None:
+    assigned = {}
+    capacities = {}
+    for name, key in sorted(missing):
+        hv = hostvars[name]
+        # Capacity depends on the IPv6 offset of the host being assigned
+        capacity_key = key + (num6_offset(hv, "host_num6_offset"),)
+        if capacity_key not in capacities:
+            try:
+                cidrs = hv["subnets"][key[0]][key[1]]
+            except KeyError:
                 raise AnsibleLookupError(
-                    "%s duplicated for %s and %s" % (ip, name, dup)
+                    "Cannot find subnet %s in %s for %s" % (key[1], key[0], name)
                 )
-            checked.append((name, ip))
+            capacities[capacity_key] = subnet_capacity(cidrs, capacity_key[2])
+        capacity = capacities[capacity_key]
+        bitmap = used.get(key, 0)
+        num = lowest_free_bit(bitmap, start)
+        if capacity is not None and num >= capacity:
+            raise AnsibleLookupError(
+                "No free host_num in %s [%s] for %s" % (key[1], key[0], name)
+            )
+        used[key] = bitmap | (1 << num)
+        assigned[name] = num
+    return assigned
 
 
 class LookupModule(LookupBase):
@@ -94,61 +180,46 @@ class LookupModule(LookupBase):
         managed_ips = {}
 
         self.set_options(var_options=variables, direct=kwargs)
+        cache_file = self.get_option("cache_file")
+        hostvars = variables["hostvars"]
 
-        for name, hv in variables["hostvars"].items():
-            tmp = {}
-            # Populate dict
-            if "host_num" in hv:
-                if "host_net" not in hv or "host_subnet" not in hv:
-                    raise AnsibleLookupError(
-                        "host_net and host_subnet must be defined for %s" % name
-                    )
-                v4_subnet = ipv4.ipv4(hv["subnets"][hv["host_net"]][hv["host_subnet"]])
-                if v4_subnet:
-                    tmp["ansible_host"] = wrap_exception(
-                        ipaddr_concat, v4_subnet, hv["host_num"]
-                    )
-                v6_subnet = ipv6.ipv6(hv["subnets"][hv["host_net"]][hv["host_subnet"]])
-                if v6_subnet:
-                    host_num6 = hv["host_num"] + 1
-                    if "host_num6_offset" in hv and hv["host_num6_offset"].lower() in (
-                        "false",
-                        "no",
-                    ):
-                        host_num6 = hv["host_num"]
-                    tmp["ansible_host6"] = wrap_exception(
-                        ipaddr_concat, v6_subnet, host_num6
-                    )
-            if "host_wg_num" in hv:
-                if "host_wg_net" not in hv or "host_wg_subnet" not in hv:
-                    raise AnsibleLookupError(
-                        "host_wg_net and host_wg_subnet must be defined for %s" % name
-                    )
-                v4_subnet = ipv4.ipv4(
-                    hv["subnets"][hv["host_wg_net"]][hv["host_wg_subnet"]]
-                )
-                if v4_subnet:
-                    tmp["wireguard_ip"] = wrap_exception(
-                        ipaddr_concat, v4_subnet, hv["host_wg_num"]
-                    )
-                v6_subnet = ipv6.ipv6(
-                    hv["subnets"][hv["host_wg_net"]][hv["host_wg_subnet"]]
-                )
-                if v6_subnet:
-                    host_wg_num6 = hv["host_wg_num"] + 1
-                    if "host_wg_num6_offset" in hv and hv[
-                        "host_wg_num6_offset"
-                    ].lower() in ("false", "no"):
-                        host_wg_num6 = hv["host_wg_num"]
-                    tmp["wireguard_ip6"] = wrap_exception(
-                        ipaddr_concat, v6_subnet, host_wg_num6
-                    )
+        assigned_nums = {}
+        if self.get_option("auto_host_num"):
+            assigned_nums = assign_host_nums(
+                hostvars, self.get_option("auto_host_num_start")
+            )
+
+        cached_hosts = load_cache(cache_file) if cache_file else {}
+        new_cache = {}
+        changed_ips = {}
+        ip_index = {}
+
+        for name, hv in hostvars.items():
+            if name in assigned_nums:
+                hv = ChainMap(dict(host_num=assigned_nums[name]), hv)
+            if cache_file:
+                fingerprint = host_fingerprint(get_host_inputs(hv))
+                cached = cached_hosts.get(name)
+                if cached and cached.get("fingerprint") == fingerprint:
+                    tmp = cached["addresses"]
+                    # Already checked for duplicates during a previous run
+                    for ip in tmp.values():
+                        ip_index[ip] = name
+                else:
+                    tmp = compute_host_addresses(name, hv)
+                    changed_ips[name] = tmp
+                new_cache[name] = dict(fingerprint=fingerprint, addresses=tmp)
+            else:
+                tmp = compute_host_addresses(name, hv)
+                changed_ips[name] = tmp
             # Skip if host isn't managed
             if not tmp:
                 continue
             managed_ips[name] = tmp
-        # Check for duplicates
-        check_ip_duplicates(managed_ips)
+        # Check for duplicates, only recomputed hosts need checking against the rest
+        check_ip_duplicates(changed_ips, ip_index)
+        if cache_file:
+            save_cache(cache_file, new_cache)
         # Sort by ansible_host or wireguard_ip
 
         def sort_func(x):
@@ -169,6 +240,8 @@ class LookupModule(LookupBase):
             for k, v in config.items():
                 if v:
                     tmp.append('%s="%s"' % (k, v))
+            if name in assigned_nums:
+                tmp.append("host_num=%d" % assigned_nums[name])
             col_map[name] = tmp
         max_lengths = []
         max_cols = len(max(col_map.values(), key=len))
@@ -243,6 +243,12 @@ def check_subnet_gaps(data, v4_name, v6_name):
 
 class LookupModule(template.LookupModule):
     def run(self, terms, variables, **kwargs):
+        ret = self.generate(terms, variables, **kwargs)
+        # Dump to YAML, with extra list indentations
+        return [to_nice_yaml(ret, indent=2, sort_keys=False)]
+
+    def generate(self, terms, variables, **kwargs):
+        """Template and validate network files, returns the resulting variables"""
         if NETADDR_IMPORT_ERROR:
             raise AnsibleLookupError(
                 missing_required_lib("netaddr")
@@ -280,5 +286,4 @@ class LookupModule(template.LookupModule):
         check_net_overlaps(ret, v4_name, v6_name)
         check_subnet_overlaps(ret)
         check_vip_duplicates(ret)
-        # Dump to YAML, with extra list indentations
-        return [to_nice_yaml(ret, indent=2, sort_keys=False)]
+        return ret
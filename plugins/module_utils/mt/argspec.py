@@ -0,0 +1,101 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+# Argument specs shared by modules and their action plugins
+
+INTERFACE_VLAN = dict(
+    networks=dict(type="dict", required=True),
+    bridge_name=dict(type="str", default="bridge1"),
+    existing=dict(type="list", elements="dict"),
+)
+
+INTERFACE_BRIDGE_PORTS = dict(
+    networks=dict(type="dict", required=True),
+    all_ports=dict(type="list", elements="str", required=True),
+    trunk_ports=dict(type="list", elements="raw", default=[]),
+    access_ports=dict(type="list", elements="dict", default=[]),
+    bridge_name=dict(type="str", default="bridge1"),
+    port_params=dict(type="dict", default={}),
+    existing=dict(type="list", elements="dict"),
+)
+
+INTERFACE_BRIDGE_VLAN = dict(
+    networks=dict(type="dict", required=True),
+    trunk_ports=dict(type="list", elements="raw", default=[]),
+    access_ports=dict(type="list", elements="dict", default=[]),
+    bridge_name=dict(type="str", default="bridge1"),
+)
+
+INTERFACE_SW_VLAN = dict(
+    existing=dict(type="list", elements="dict", required=True),
+    networks=dict(type="dict", required=True),
+    trunk_ports=dict(type="list", elements="raw", default=[]),
+    access_ports=dict(type="list", elements="dict", default=[]),
+    switch_cpu=dict(type="str", default="switch1-cpu"),
+)
+
+INTERFACE_SW_EGRESS = dict(
+    existing=dict(type="list", elements="dict", required=True),
+    networks=dict(type="dict", required=True),
+    trunk_ports=dict(type="list", elements="raw", default=[]),
+    access_ports=dict(type="list", elements="dict", default=[]),
+    switch_cpu=dict(type="str", default="switch1-cpu"),
+)
+
+INTERFACE_SW_INGRESS = dict(
+    existing=dict(type="list", elements="dict", required=True),
+    networks=dict(type="dict", required=True),
+    access_ports=dict(type="list", elements="dict", default=[]),
+)
+
+DNS_ENTRIES = dict(
+    existing=dict(type="list", elements="dict", required=True),
+    data=dict(type="list", elements="dict", required=True),
+    comment_regex=dict(type="str", default=""),
+    exclude_comment_regex=dict(type="str", default=""),
+    remove_without_comment=dict(type="bool", default=True),
+    output_commands=dict(type="bool", default=False),
+)
+
+DNS_ENTRIES_MUTUALLY_EXCLUSIVE = [["comment_regex", "exclude_comment_regex"]]
+
+DIFF = dict(
+    existing=dict(type="list", elements="dict", required=True),
+    data=dict(type="list", elements="dict", required=True),
+    keys=dict(type="list", elements="str", required=True, no_log=False),
+    ignore_fields=dict(type="list", elements="str", default=[]),
+    comment_regex=dict(type="str", default=""),
+    exclude_comment_regex=dict(type="str", default=""),
+)
+
+DIFF_MUTUALLY_EXCLUSIVE = DNS_ENTRIES_MUTUALLY_EXCLUSIVE
+
+VLAN_PLAN = dict(
+    networks=dict(type="dict", required=True),
+    all_ports=dict(type="list", elements="str", required=True),
+    trunk_ports=dict(type="list", elements="raw", default=[]),
+    access_ports=dict(type="list", elements="dict", default=[]),
+    bridge_name=dict(type="str", default="bridge1"),
+    port_params=dict(type="dict", default={}),
+    legacy=dict(type="bool", default=False),
+    switch_cpu=dict(type="str", default="switch1-cpu"),
+    existing=dict(
+        type="dict",
+        default={},
+        options=dict(
+            sw_vlan=dict(type="list", elements="dict", default=[]),
+            sw_egress=dict(type="list", elements="dict", default=[]),
+            sw_ingress=dict(type="list", elements="dict", default=[]),
+            interface_vlan=dict(type="list", elements="dict"),
+            bridge_ports=dict(type="list", elements="dict"),
+        ),
+    ),
+    summary=dict(type="bool", default=False),
+    existing_fingerprint=dict(type="str", no_log=False),
+)
+
+VLAN_FLEET_PLAN = dict(
+    hosts=dict(type="dict", required=True),
+    networks=dict(type="dict"),
+)
@@ -0,0 +1,252 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import traceback
+
+from collections import deque
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    entry_key,
+    filter_comments,
+    routeros_commands,
+)
+
+try:
+    from netaddr import IPAddress
+except ImportError:
+    HAS_NETADDR = False
+    NETADDR_IMPORT_ERROR = traceback.format_exc()
+else:
+    HAS_NETADDR = True
+    NETADDR_IMPORT_ERROR = None
+
+ALL_FAMILIES = (None, 4, 6)
+# Fields selecting records without an ID in RouterOS commands
+DNS_FIND_FIELDS = ("name", "regexp", "type", "address")
+
+
+class AddressCache(object):
+    """Family and canonical form of addresses, each address is parsed once"""
+
+    def __init__(self):
+        self.cache = {}
+
+    def get(self, address):
+        """(family, canonical address), family is None for records without one"""
+        if not address:
+            return None, address
+        found = self.cache.get(address)
+        if found is None:
+            ip = IPAddress(address)
+            found = self.cache[address] = (ip.version, str(ip))
+        return found
+
+    def annotate(self, entry):
+        return self.get(entry.get("address"))
+
+
+def content_key(entry, fields, canonical):
+    """Index key of the fields of entry, using the canonical address"""
+    key = entry_key(entry, fields)
+    if "address" in fields:
+        pos = fields.index("address")
+        key = key[:pos] + (canonical,) + key[pos + 1 :]
+    return key
+
+
+def compatible_families(family):
+    """Families of records that can match a record of family"""
+    if family is None:
+        return ALL_FAMILIES
+    return (family, None)
+
+
+class RecordIndex(object):
+    """Positions of records grouped by key, in order
+    Positions found in consumed are skipped and dropped lazily.
+    """
+
+    def __init__(self, consumed):
+        self.consumed = consumed
+        self.index = {}
+
+    def add(self, key, pos):
+        self.index.setdefault(key, deque()).append(pos)
+
+    def first(self, keys):
+        """Lowest unconsumed position stored under any of keys"""
+        found = None
+        for key in keys:
+            positions = self.index.get(key)
+            if not positions:
+                continue
+            while positions and positions[0] in self.consumed:
+                positions.popleft()
+            if positions and (found is None or positions[0] < found):
+                found = positions[0]
+        return found
+
+
+class ExistingRecords(object):
+    """Existing records indexed by name, regexp, address and content"""
+
+    def __init__(self, records, addresses):
+        self.records = records
+        # (family, canonical address) of each record
+        self.addresses = [addresses.annotate(d) for d in records]
+        self.consumed = set()
+        self.strict = RecordIndex(self.consumed)
+        self.loose = RecordIndex(self.consumed)
+        # Sorted field names => content index
+        self.content = {}
+        for pos, d in enumerate(records):
+            family, canonical = self.addresses[pos]
+            for field in ("name", "regexp"):
+                value = d.get(field)
+                if not value:
+                    continue
+                self.strict.add((field, value, canonical), pos)
+                self.loose.add((field, value, family), pos)
+
+    def content_index(self, fields):
+        index = self.content.get(fields)
+        if index is None:
+            index = RecordIndex(self.consumed)
+            for pos, d in enumerate(self.records):
+                if all(k in d for k in fields):
+                    index.add(content_key(d, fields, self.addresses[pos][1]), pos)
+            self.content[fields] = index
+        return index
+
+    def find_eq(self, entry, canonical):
+        """Record with all fields of entry equal"""
+        fields = tuple(sorted(entry))
+        return self.content_index(fields).first([content_key(entry, fields, canonical)])
+
+    def find(self, entry, family, canonical, strict):
+        """Record with the same name or regexp and a compatible family
+        With strict, the address must be equal as well.
+        """
+        keys = []
+        for field in ("name", "regexp"):
+            value = entry.get(field)
+            if not value:
+                continue
+            if strict:
+                keys.append((field, value, canonical))
+            else:
+                keys.extend((field, value, f) for f in compatible_families(family))
+        if strict:
+            return self.strict.first(keys)
+        return self.loose.first(keys)
+
+    def consume(self, pos):
+        self.consumed.add(pos)
+
+    def remaining(self):
+        for pos, d in enumerate(self.records):
+            if pos not in self.consumed:
+                yield d, self.addresses[pos][0]
+
+
+def get_dns_entries(
+    existing,
+    data,
+    comment_regex,
+    exclude_comment_regex,
+    remove_without_comment,
+    output_commands=False,
+    warn=None,
+):
+    """Compute static DNS add, update and remove lists"""
+    to_add = []
+    to_update = []
+    to_remove = []
+    # Existing record replaced by each entry of to_update
+    update_old = []
+
+    addresses = AddressCache()
+    existing_managed = ExistingRecords(
+        filter_comments(existing, comment_regex, exclude_comment_regex), addresses
+    )
+
+    data_tmp = data
+    data = []
+    # Remove invalid data and entries that are already present
+    for d in data_tmp:
+        if "name" not in d and "regexp" not in d:
+            if warn:
+                warn(
+                    "mt_get_dns_entries: Data missing 'name' and 'regexp', check for undefined variables."
+                )
+            continue
+        family, canonical = addresses.annotate(d)
+        pos = existing_managed.find_eq(d, canonical)
+        if pos is not None:
+            existing_managed.consume(pos)
+        else:
+            data.append((d, family, canonical))
+
+    data_tmp = data
+    data = []
+    # Find entries update strictly
+    for d, family, canonical in data_tmp:
+        pos = existing_managed.find(d, family, canonical, strict=True)
+        # Process further if we didn't find a match
+        if pos is None:
+            data.append((d, family, canonical))
+            continue
+        # Update if name/regexp + address match but some other field does not
+        # Exact matches were consumed above
+        old = existing_managed.records[pos]
+        if ".id" in old:
+            d[".id"] = old[".id"]
+        to_update.append(d)
+        update_old.append(old)
+        existing_managed.consume(pos)
+
+    # Find entries to update loosely or to add
+    data_keys = set()
+    for d, family, canonical in data:
+        for field in ("name", "regexp"):
+            if d.get(field):
+                data_keys.add((field, d[field], family))
+        pos = existing_managed.find(d, family, canonical, strict=False)
+        if pos is None:
+            to_add.append(d)
+            continue
+        old = existing_managed.records[pos]
+        # Add ID for faster editing, exported records have none
+        if ".id" in old:
+            d[".id"] = old[".id"]
+        to_update.append(d)
+        update_old.append(old)
+        existing_managed.consume(pos)
+
+    # Find entries to delete, keep those sharing a name or regexp with data
+    for d, family in existing_managed.remaining():
+        if any(
+            (field, d[field], f) in data_keys
+            for field in ("name", "regexp")
+            if d.get(field)
+            for f in compatible_families(family)
+        ):
+            continue
+        if not d.get("comment") and not remove_without_comment:
+            continue
+        to_remove.append(d)
+
+    result = dict(
+        changed=False, to_add=to_add, to_update=to_update, to_remove=to_remove
+    )
+    if output_commands:
+        result["commands"] = routeros_commands(
+            "ip dns static",
+            to_add,
+            to_update,
+            to_remove,
+            DNS_FIND_FIELDS,
+            update_old,
+        )
+    return result
@@ -0,0 +1,136 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import re
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    BRIDGE_PORT_DEFAULTS,
+    INTERFACE_VLAN_DEFAULTS,
+    MTError,
+)
+
+# Commands that end the menu path of an export line
+EXPORT_COMMANDS = frozenset(("add", "set", "remove"))
+EXPORT_ARG_RE = re.compile(r'([^\s=]+)=("(?:[^"\\]|\\.)*"|\S*)')
+EXPORT_ESCAPE_RE = re.compile(r"\\([0-9A-F]{2}|.)")
+EXPORT_ESCAPES = {
+    "_": " ",
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+EXPORT_SELECTOR_RE = re.compile(r"^\s*\[[^\]]*\]")
+INT_RE = re.compile(r"^-?[0-9]+$")
+# Default values are not exported, entries of these paths get them like
+# community.routeros.api_info with hide_defaults=false returns them
+EXPORT_DEFAULTS = {
+    "interface bridge port": BRIDGE_PORT_DEFAULTS,
+    "interface vlan": INTERFACE_VLAN_DEFAULTS,
+}
+
+
+def _unescape(match):
+    c = match.group(1)
+    if len(c) == 2:
+        return chr(int(c, 16))
+    return EXPORT_ESCAPES.get(c, c)
+
+
+def export_value(value):
+    """Convert an exported value like the API client does"""
+    if value.startswith('"'):
+        value = EXPORT_ESCAPE_RE.sub(_unescape, value[1:-1])
+        # Non-ASCII text is exported as escaped UTF-8 bytes
+        try:
+            return value.encode("latin-1").decode("utf-8")
+        except UnicodeError:
+            return value
+    if value == "yes":
+        return True
+    if value == "no":
+        return False
+    if INT_RE.match(value):
+        return int(value)
+    return value
+
+
+def export_lines(lines):
+    """Join continued lines, skipping comments and empty lines"""
+    buf = ""
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if buf:
+            line = buf + line.lstrip()
+            buf = ""
+        if line.endswith("\\"):
+            buf = line[:-1]
+            continue
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        yield line
+    if buf:
+        yield buf
+
+
+def iter_export(lines):
+    """Yield (path, command, args) for each command of an export
+    lines is any iterable of lines, so large exports are never held in
+    memory at once. Works with both terse and the default format, where
+    menu paths are on their own line.
+    """
+    path = None
+    for lineno, line in enumerate(export_lines(lines), 1):
+        if line.startswith("/"):
+            parts = line[1:].split(" ")
+            for idx, word in enumerate(parts):
+                if word in EXPORT_COMMANDS:
+                    path = " ".join(parts[:idx])
+                    command = word
+                    rest = " ".join(parts[idx + 1 :])
+                    break
+            else:
+                # Only the menu path, commands follow on the next lines
+                path = " ".join(p for p in parts if p)
+                continue
+        elif path is not None and line.split(" ", 1)[0] in EXPORT_COMMANDS:
+            command, _, rest = line.partition(" ")
+        else:
+            raise MTError("Cannot parse export line {}: {}".format(lineno, line))
+        args = {}
+        # Selectors like [ find default-name=ether1 ] are not arguments
+        rest = EXPORT_SELECTOR_RE.sub("", rest, count=1)
+        for m in EXPORT_ARG_RE.finditer(rest):
+            args[m.group(1)] = export_value(m.group(2))
+        yield path, command, args
+
+
+def parse_export(lines, paths=None):
+    """Entries added by an export, grouped by menu path
+    Paths are written like community.routeros paths, e.g. "ip dns static".
+    Only paths in paths are returned if given, missing paths are empty lists.
+    Entries of paths in EXPORT_DEFAULTS get the default values of fields
+    missing from the export.
+    """
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    if paths is not None:
+        result = {p: [] for p in paths}
+    else:
+        result = {}
+    for path, command, args in iter_export(lines):
+        if command != "add":
+            continue
+        if paths is not None and path not in result:
+            continue
+        defaults = EXPORT_DEFAULTS.get(path)
+        if defaults:
+            entry = {k: v for k, v in defaults.items() if v is not None}
+            entry.update(args)
+            args = entry
+        result.setdefault(path, []).append(args)
+    return result
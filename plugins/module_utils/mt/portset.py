@@ -0,0 +1,39 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class PortSet(object):
+    """Port names mapped to bit positions, sets of ports are integers
+    Ports are numbered in the order they are added, names() returns them
+    in that order.
+    """
+
+    def __init__(self, ports=()):
+        self.ports = []
+        self.positions = {}
+        for p in ports:
+            self.add(p)
+
+    def add(self, port):
+        """Bit of port, new ports are added after existing ones"""
+        pos = self.positions.get(port)
+        if pos is None:
+            pos = self.positions[port] = len(self.ports)
+            self.ports.append(port)
+        return 1 << pos
+
+    def mask(self, ports):
+        mask = 0
+        for p in ports:
+            mask |= self.add(p)
+        return mask
+
+    def names(self, mask):
+        """Port names in mask, in the order they were added"""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.ports[low.bit_length() - 1])
+            mask ^= low
+        return names
@@ -3,8 +3,18 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import hashlib
+import json
 import re
 
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
+from ansible_collections.andrei.utils.plugins.module_utils.mt.portset import PortSet
+
+
+class MTError(Exception):
+    pass
+
 
 def get_vlan_entry(data, entry, check_key):
     for d in data:
@@ -13,8 +23,10 @@ def get_vlan_entry(data, entry, check_key):
     return None
 
 
-def entries_eq(old, new):
+def entries_eq(old, new, ignore=()):
     for k, v in new.items():
+        if k in ignore:
+            continue
         if k not in old:
             return False
         if old[k] != v:
@@ -23,6 +35,22 @@ def entries_eq(old, new):
     return True
 
 
+def entries_eq_defaults(old, new, defaults):
+    """Like entries_eq, fields missing from either entry have their default
+    None and empty values mean the field is unset.
+    """
+    for k in set(new) | set(defaults):
+        if k.startswith("."):
+            continue
+        old_value = old.get(k, defaults.get(k))
+        new_value = new.get(k, defaults.get(k))
+        if old_value in (None, "") and new_value in (None, ""):
+            continue
+        if old_value != new_value:
+            return False
+    return True
+
+
 def make_vid_map(networks):
     vid_map = {}
     for name, cfg in networks.items():
@@ -32,55 +60,819 @@ def make_vid_map(networks):
     return vid_map
 
 
-def make_add_update_remove(existing, new_data, check_key):
+def _hashable(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+def entry_key(entry, check_key):
+    """Index key of entry, check_key is a field name or a list of field names"""
+    if isinstance(check_key, (list, tuple)):
+        return tuple(_hashable(entry.get(k)) for k in check_key)
+    return _hashable(entry.get(check_key))
+
+
+def index_entries(data, check_key):
+    """Map keys to the first entry with that key"""
+    index = {}
+    for d in data:
+        index.setdefault(entry_key(d, check_key), d)
+    return index
+
+
+def make_add_update_remove(
+    existing, new_data, check_key, ignore_fields=(), defaults=None
+):
+    """Compare entries by check_key, a field name or a list of field names
+    Fields in ignore_fields are not compared. With defaults, entries are
+    compared by entries_eq_defaults. Lists keep the order of their input.
+    """
     to_add = []
     to_update = []
     to_remove = []
 
+    if defaults is None:
+
+        def eq(old, new):
+            return entries_eq(old, new, ignore_fields)
+
+    else:
+
+        def eq(old, new):
+            return entries_eq_defaults(old, new, defaults)
+
+    existing_index = index_entries(existing, check_key)
+    new_keys = set(entry_key(d, check_key) for d in new_data)
+
     for d in existing:
-        if not get_vlan_entry(new_data, d, check_key):
+        if entry_key(d, check_key) not in new_keys:
             to_remove.append(d)
 
     for d in new_data:
-        old = get_vlan_entry(existing, d, check_key)
+        old = existing_index.get(entry_key(d, check_key))
         if not old:
             to_add.append(d)
-        elif not entries_eq(old, d):
-            # Add ID for faster editing
-            d[".id"] = old[".id"]
+        elif not eq(old, d):
+            # Add ID for faster editing, exported entries have none
+            if ".id" in old:
+                d[".id"] = old[".id"]
             to_update.append(d)
 
     return to_add, to_update, to_remove
 
 
-def sort_ports(ports):
-    """Sort like source data: switch, ether, sfpplus, sfp-sfpplus"""
-    ether = []
-    sfpplus = []
-    sfp = []
-    unknown = []
-    for p in ports:
-        # Sad Python <3.8 noises
-        m = re.match(r"^ether(\d+)$", p)
+ROUTEROS_ESCAPES = {
+    "\\": "\\\\",
+    '"': '\\"',
+    "$": "\\$",
+    "?": "\\?",
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+}
+
+
+def routeros_quote(value):
+    """Format value for a RouterOS script, numbers are not quoted"""
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, int):
+        return str(value)
+    return '"%s"' % "".join(ROUTEROS_ESCAPES.get(c, c) for c in str(value))
+
+
+def routeros_args(entry):
+    """key=value arguments of entry, skipping read-only fields and None values"""
+    return " ".join(
+        "%s=%s" % (k, routeros_quote(v))
+        for k, v in sorted(entry.items())
+        if v is not None and not k.startswith((".", "!"))
+    )
+
+
+def routeros_selector(entry, find_fields):
+    """ID of entry or a find command matching its find_fields"""
+    if entry.get(".id"):
+        return entry[".id"]
+    conditions = [
+        "%s=%s" % (k, routeros_quote(entry[k]))
+        for k in find_fields
+        if entry.get(k) is not None
+    ]
+    if not conditions:
+        raise MTError("Cannot select entry without .id or %s" % ", ".join(find_fields))
+    return "[find where %s]" % " and ".join(conditions)
+
+
+def routeros_commands(path, to_add, to_update, to_remove, find_fields, update_old=None):
+    """RouterOS script applying a change set, one command per line
+    Entries are removed first and added last, so removed entries cannot
+    collide with updated ones and updated entries cannot collide with new ones.
+    update_old are the existing entries replaced by to_update, in the same
+    order, updates without .id are selected by the fields of the old entry.
+    """
+    path = "/" + path.strip("/ ")
+    commands = []
+    for d in to_remove:
+        commands.append("%s remove %s" % (path, routeros_selector(d, find_fields)))
+    if update_old is None:
+        update_old = to_update
+    for d, old in zip(to_update, update_old):
+        selector = d[".id"] if d.get(".id") else routeros_selector(old, find_fields)
+        commands.append("%s set %s %s" % (path, selector, routeros_args(d)))
+    for d in to_add:
+        commands.append("%s add %s" % (path, routeros_args(d)))
+    return commands
+
+
+def filter_comments(existing, comment_regex, exclude_comment_regex):
+    """Entries without a comment or whose comment passes both regexes"""
+    if comment_regex:
+        comment_regex = re.compile(comment_regex)
+
+    if exclude_comment_regex:
+        exclude_comment_regex = re.compile(exclude_comment_regex)
+
+    managed = []
+    for d in existing:
+        comment = d.get("comment")
+        if comment:
+            if comment_regex and not comment_regex.match(comment):
+                continue
+            if exclude_comment_regex and exclude_comment_regex.match(comment):
+                continue
+        managed.append(d)
+    return managed
+
+
+# Port types in the order they are sorted, others are sorted after these
+PORT_TYPES = ("ether", "sfpplus", "sfp-sfpplus", "qsfp28-", "combo", "wlan", "bond")
+PORT_TYPE_RE = re.compile(
+    r"^(%s)(?=\d)" % "|".join(sorted(PORT_TYPES, key=len, reverse=True))
+)
+PORT_NUM_RE = re.compile(r"(\d+)")
+# Port types whose names never contain a dash, names like sfp28-1 or
+# qsfpplus1-1 (breakout ports) are not ranges
+RANGE_PORT_TYPES = ("ether", "sfp-sfpplus", "sfpplus", "combo")
+_RANGE_PREFIX = "(%s)" % "|".join(sorted(RANGE_PORT_TYPES, key=len, reverse=True))
+# Numbers with leading zeros are not ranges, they would not expand back to the same names
+PORT_RANGE_RE = re.compile(r"^%s(0|[1-9]\d*)-(0|[1-9]\d*)$" % _RANGE_PREFIX)
+PORT_NUM_END_RE = re.compile(r"^%s(0|[1-9]\d*)$" % _RANGE_PREFIX)
+# Port range => expanded ports
+_EXPANDED_PORTS = {}
+# Port name => sort key
+_PORT_KEYS = {}
+
+
+def port_sort_key(port):
+    """Port type rank, then the rest of the name with numbers compared by value"""
+    key = _PORT_KEYS.get(port)
+    if key is None:
+        m = PORT_TYPE_RE.match(port)
         if m:
-            ether.append((m.group(0), int(m.group(1))))
+            rank = PORT_TYPES.index(m.group(1))
+            rest = port[m.end() :]
+        else:
+            rank = len(PORT_TYPES)
+            rest = port
+        parts = PORT_NUM_RE.split(rest)
+        # Odd positions are always numbers
+        parts[1::2] = [int(p) for p in parts[1::2]]
+        key = _PORT_KEYS[port] = (rank, parts)
+    return key
+
+
+def expand_port(port):
+    """Ports of a range like ether1-24, other names are returned as is
+    Only RANGE_PORT_TYPES form ranges.
+    """
+    ports = _EXPANDED_PORTS.get(port)
+    if ports is None:
+        m = PORT_RANGE_RE.match(port)
+        if not m:
+            ports = (port,)
+        else:
+            first = int(m.group(2))
+            last = int(m.group(3))
+            if first > last:
+                raise MTError("Invalid port range '{}'".format(port))
+            ports = tuple("%s%d" % (m.group(1), i) for i in range(first, last + 1))
+        _EXPANDED_PORTS[port] = ports
+    return ports
+
+
+def expand_ports(ports):
+    """Expand port ranges, keeping order"""
+    expanded = []
+    for p in ports:
+        expanded.extend(expand_port(p))
+    return expanded
+
+
+def compress_ports(ports):
+    """Join consecutive ports of the same type into ranges, keeping order
+    Only RANGE_PORT_TYPES are joined, so the result expands back to ports.
+    """
+    compressed = []
+    prefix = first = last = None
+    for p in ports:
+        m = PORT_NUM_END_RE.match(p)
+        if m and m.group(1) == prefix and int(m.group(2)) == last + 1:
+            last += 1
             continue
-        m = re.match(r"^sfp-sfpplus(\d+)$", p)
+        if prefix is not None:
+            compressed.append(_port_range(prefix, first, last))
         if m:
-            sfpplus.append((m.group(0), int(m.group(1))))
+            prefix = m.group(1)
+            first = last = int(m.group(2))
+        else:
+            prefix = None
+            compressed.append(p)
+    if prefix is not None:
+        compressed.append(_port_range(prefix, first, last))
+    return compressed
+
+
+def _port_range(prefix, first, last):
+    if first == last:
+        return "%s%d" % (prefix, first)
+    return "%s%d-%d" % (prefix, first, last)
+
+
+def iter_trunk_ports(trunk_ports):
+    """Yield (vlan, ports) of each trunk_ports item, vlan is None for plain ports"""
+    for idx, item in enumerate(trunk_ports):
+        if isinstance(item, str):
+            yield None, expand_port(item)
+        elif isinstance(item, dict):
+            yield item["vlan"], expand_ports(item["ports"])
+        else:
+            raise MTError(
+                "Element at index {} type ({}) is unsupported".format(
+                    idx, type(item).__name__
+                )
+            )
+
+
+def expand_trunk_ports(vid_map, trunk_ports):
+    """Mapping of each VLAN name in vid_map to a sorted tuple of its trunk ports
+    trunk_ports is walked once, VLAN names are checked against vid_map.
+    VLANs with only the ports shared by all VLANs get the same tuple.
+    """
+    plain = set()
+    vlan_ports = {}
+    for vlan, ports in iter_trunk_ports(trunk_ports):
+        if vlan is None:
+            # Plain ports are in all VLANs
+            plain.update(ports)
             continue
-        m = re.match(r"^sfpplus(\d+)$", p)
-        if m:
-            sfp.append((m.group(0), int(m.group(1))))
+        if vlan not in vid_map:
+            raise MTError("Cannot find VLAN '{}'".format(vlan))
+        vlan_ports.setdefault(vlan, set()).update(ports)
+    sorted_plain = tuple(sort_ports(plain))
+    trunk_map = {}
+    for name in vid_map:
+        if name in vlan_ports:
+            trunk_map[name] = tuple(sort_ports(plain.union(vlan_ports[name])))
+        else:
+            trunk_map[name] = sorted_plain
+    return trunk_map
+
+
+def sort_ports(ports):
+    """Sort like source data: ether, sfpplus, sfp-sfpplus, qsfp28, combo, wlan, bond
+    Numbers are compared by value, so ether2 comes before ether10 and
+    ether1.10 (VLAN sub-interfaces) after ether1.
+    """
+    return sorted(ports, key=port_sort_key)
+
+
+class PlanCache(object):
+    """Caches shared between the VLAN plans of multiple devices"""
+
+    def __init__(self):
+        # id(networks) => (networks, vid_map), networks is kept so its id is not reused
+        self._vid_maps = {}
+        self._sorted_ports = {}
+
+    def vid_map(self, networks):
+        """VLAN IDs of networks, shared by plans given the same networks object
+        Keyed by identity, hashing the content costs more than make_vid_map.
+        """
+        cached = self._vid_maps.get(id(networks))
+        if cached is None:
+            cached = (networks, make_vid_map(networks))
+            self._vid_maps[id(networks)] = cached
+        return cached[1]
+
+    def sort_ports(self, ports):
+        key = tuple(ports)
+        if key not in self._sorted_ports:
+            self._sorted_ports[key] = sort_ports(key)
+        # Callers may modify the list
+        return list(self._sorted_ports[key])
+
+
+class VlanModel(object):
+    """Ports and VLANs of a device, shared by all config sections
+    VLAN IDs and port membership are computed once and reused. Membership
+    is stored as bitsets of port_set, which numbers ports in sorted order.
+    """
+
+    def __init__(self, networks, trunk_ports=None, access_ports=None, cache=None):
+        self.networks = networks
+        self.cache = cache
+        if cache is not None:
+            self.vid_map = cache.vid_map(networks)
+        else:
+            self.vid_map = make_vid_map(networks)
+        self.trunk_ports = trunk_ports or []
+        self.access_ports = access_ports or []
+        self.port_set = None
+        self._vlan_port_masks = None
+        self._access_port_map = None
+        self._trunk_port_map = None
+        self._all_trunk_ports = None
+
+    def trunk_port_map(self):
+        """Mapping of VLAN name to its sorted trunk ports"""
+        if self._trunk_port_map is None:
+            self._trunk_port_map = expand_trunk_ports(self.vid_map, self.trunk_ports)
+        return self._trunk_port_map
+
+    def all_trunk_ports(self):
+        """All ports in trunk_ports, sorted
+        Taken from trunk_ports itself, so plain ports are trunk ports even
+        when networks defines no VLANs.
+        """
+        if self._all_trunk_ports is None:
+            ports = set()
+            for _, item_ports in iter_trunk_ports(self.trunk_ports):
+                ports.update(item_ports)
+            self._all_trunk_ports = self.sort_ports(sorted(ports))
+        return self._all_trunk_ports
+
+    def vlan_port_masks(self):
+        """Mapping of VLAN name to its (trunk, access) port bitsets"""
+        if self._vlan_port_masks is not None:
+            return self._vlan_port_masks
+        masks = {}
+        # Nothing to validate against
+        if self.vid_map:
+            trunk_port_map = self.trunk_port_map()
+            access_port_map = self.access_port_map()
+            all_ports = set(self.all_trunk_ports())
+            for ports in access_port_map.values():
+                all_ports.update(ports)
+            self.port_set = PortSet(self.sort_ports(sorted(all_ports)))
+            # Most VLANs share one tuple of trunk ports, compute its mask once
+            trunk_masks = {}
+            for name in self.vid_map:
+                trunk = trunk_port_map[name]
+                if id(trunk) not in trunk_masks:
+                    trunk_masks[id(trunk)] = self.port_set.mask(trunk)
+                masks[name] = (
+                    trunk_masks[id(trunk)],
+                    self.port_set.mask(access_port_map.get(name, [])),
+                )
+        self._vlan_port_masks = masks
+        return masks
+
+    def port_names(self, mask):
+        """Sorted names of the ports in mask"""
+        if not mask:
+            return []
+        return self.port_set.names(mask)
+
+    def access_port_map(self):
+        """Mapping of VLAN name to its access ports, later entries win"""
+        if self._access_port_map is None:
+            self._access_port_map = {
+                cfg["vlan"]: expand_ports(cfg["ports"]) for cfg in self.access_ports
+            }
+        return self._access_port_map
+
+    def sort_ports(self, ports):
+        if self.cache is not None:
+            return self.cache.sort_ports(ports)
+        return sort_ports(ports)
+
+    def check_access_vlans(self):
+        for cfg in self.access_ports:
+            if cfg["vlan"] not in self.vid_map:
+                raise MTError("Cannot find VLAN '{}'".format(cfg["vlan"]))
+
+
+def build_interface_vlan(model, bridge_name):
+    new_data = []
+    for net_name, net_config in model.networks.items():
+        if "vlan" not in net_config:
             continue
-        unknown.append(p)
-    # Sort by number
-    ether = sorted(ether, key=lambda x: x[1])
-    sfpplus = sorted(sfpplus, key=lambda x: x[1])
-    sfp = sorted(sfp, key=lambda x: x[1])
-    return (
-        [x[0] for x in ether]
-        + [x[0] for x in sfp]
-        + [x[0] for x in sfpplus]
-        + sorted(unknown)
+        comment = []
+        if "cidr" in net_config:
+            comment.append(net_config["cidr"])
+        if "cidr6" in net_config:
+            comment.append(net_config["cidr6"])
+        comment = "; ".join(comment)
+        new_data.append(
+            {
+                "interface": bridge_name,
+                "name": net_name.upper(),
+                "vlan-id": net_config["vlan"],
+                "mtu": net_config.get("mtu", 1500),
+                "comment": comment or None,
+            }
+        )
+    return new_data
+
+
+SW_VLAN_PATH = "interface ethernet switch vlan"
+SW_EGRESS_PATH = "interface ethernet switch egress-vlan-tag"
+SW_INGRESS_PATH = "interface ethernet switch ingress-vlan-translation"
+
+# Writable fields and their defaults, like community.routeros api_modify
+# resets them with handle_entries_content=remove_as_much_as_possible.
+# None means the field is unset.
+INTERFACE_VLAN_DEFAULTS = {
+    "arp": "enabled",
+    "arp-timeout": "auto",
+    "comment": None,
+    "disabled": False,
+    "loop-protect": "default",
+    "loop-protect-disable-time": "5m",
+    "loop-protect-send-interval": "5s",
+    "mtu": 1500,
+    "use-service-tag": False,
+}
+# ingress-filtering is left out, its default depends on the RouterOS version
+BRIDGE_PORT_DEFAULTS = {
+    "auto-isolate": False,
+    "bpdu-guard": False,
+    "broadcast-flood": True,
+    "comment": None,
+    "disabled": False,
+    "edge": "auto",
+    "fast-leave": False,
+    "frame-types": "admit-all",
+    "horizon": "none",
+    "hw": True,
+    "internal-path-cost": 10,
+    "learn": "auto",
+    "multicast-router": "temporary-query",
+    "path-cost": 10,
+    "point-to-point": "auto",
+    "priority": "0x80",
+    "pvid": 1,
+    "restricted-role": False,
+    "restricted-tcn": False,
+    "tag-stacking": False,
+    "trusted": False,
+    "unknown-multicast-flood": True,
+    "unknown-unicast-flood": True,
+}
+
+
+def build_bridge_ports(model, all_ports, bridge_name, port_params):
+    # Mapping to make processing easier
+    new_data = {}
+    # Add all ports
+    for p in expand_ports(all_ports):
+        new_data[p] = {
+            "bridge": bridge_name,
+            "interface": p,
+        }
+        for k, v in port_params.items():
+            new_data[p][k] = v
+    all_access_ports = set()
+    # Configure access ports
+    for cfg in model.access_ports:
+        vid = model.vid_map.get(cfg["vlan"])
+        if not vid:
+            raise MTError("Cannot find VID for '{}'".format(cfg["vlan"]))
+        for p in expand_ports(cfg["ports"]):
+            if p not in new_data:
+                raise MTError("'{}' is not a bridge port".format(p))
+            new_data[p]["pvid"] = vid
+            all_access_ports.add(p)
+
+    # Configure trunk ports
+    for p in model.all_trunk_ports():
+        if p not in new_data:
+            raise MTError("'{}' is not a bridge port".format(p))
+        if p not in all_access_ports:
+            new_data[p]["frame-types"] = "admit-only-vlan-tagged"
+
+    return list(new_data.values())
+
+
+def build_bridge_vlan(model, bridge_name):
+    model.check_access_vlans()
+    access_port_map = model.access_port_map()
+    vlan_port_masks = model.vlan_port_masks()
+    new_data = []
+    for name, vid in model.vid_map.items():
+        entry = {
+            "bridge": bridge_name,
+            "vlan-ids": vid,
+        }
+        trunk, access = vlan_port_masks[name]
+        if name in access_port_map:
+            entry["untagged"] = ",".join(model.port_names(access))
+        tagged = trunk & ~access
+        if tagged:
+            entry["tagged"] = ",".join([bridge_name] + model.port_names(tagged))
+        new_data.append(entry)
+    return new_data
+
+
+def build_sw_vlan(model, switch_cpu):
+    model.check_access_vlans()
+    vlan_port_masks = model.vlan_port_masks()
+    new_data = []
+    for name, vid in model.vid_map.items():
+        trunk, access = vlan_port_masks[name]
+        ports = trunk | access
+        if not ports:
+            continue
+        new_data.append(
+            {
+                "ports": ",".join([switch_cpu] + model.port_names(ports)),
+                "vlan-id": vid,
+            }
+        )
+    return new_data
+
+
+def build_sw_egress(model, switch_cpu):
+    vlan_port_masks = model.vlan_port_masks()
+    new_data = []
+    for name, vid in model.vid_map.items():
+        trunk, access = vlan_port_masks[name]
+        tagged = trunk & ~access
+        if tagged:
+            new_data.append(
+                {
+                    "tagged-ports": ",".join([switch_cpu] + model.port_names(tagged)),
+                    "vlan-id": vid,
+                }
+            )
+    return new_data
+
+
+def build_sw_ingress(model):
+    new_data = []
+    for cfg in model.access_ports:
+        vlan = cfg["vlan"]
+        vid = model.vid_map.get(vlan)
+        if not vid:
+            raise MTError("Cannot find VLAN or its VID '{}'".format(vlan))
+
+        new_data.append(
+            {
+                "customer-vid": 0,
+                "new-customer-vid": vid,
+                "ports": ",".join(expand_ports(cfg["ports"])),
+            }
+        )
+    return new_data
+
+
+def build_port_summary(model):
+    """Tagged and untagged ports of each VLAN, with ranges compressed"""
+    vlan_port_masks = model.vlan_port_masks()
+    summary = {}
+    for name, vid in model.vid_map.items():
+        trunk, access = vlan_port_masks[name]
+        summary[name] = {
+            "vlan-id": vid,
+            "tagged": ",".join(compress_ports(model.port_names(trunk & ~access))),
+            "untagged": ",".join(compress_ports(model.port_names(access))),
+        }
+    return summary
+
+
+def _new_data_result(new_data, existing, check_key, defaults):
+    """new_data, with the changes compared to existing if it is given
+    Existing entries should include default values, fields missing from
+    new_data are compared to defaults, other fields are not compared.
+    """
+    result = dict(new_data=new_data)
+    if existing is not None:
+        # new_data is applied as is, keep IDs out of it
+        to_add, to_update, to_remove = make_add_update_remove(
+            existing, [dict(d) for d in new_data], check_key, defaults=defaults
+        )
+        result.update(
+            to_add=to_add,
+            to_update=to_update,
+            to_remove=to_remove,
+            unchanged=not (to_add or to_update or to_remove),
+        )
+    return result
+
+
+def get_interface_vlan(networks, bridge_name, existing=None):
+    """Compute interface VLAN entries"""
+    new_data = build_interface_vlan(VlanModel(networks), bridge_name)
+    result = _new_data_result(new_data, existing, "name", INTERFACE_VLAN_DEFAULTS)
+    result["changed"] = False
+    return result
+
+
+def get_bridge_ports(
+    networks,
+    all_ports,
+    trunk_ports,
+    access_ports,
+    bridge_name,
+    port_params,
+    existing=None,
+):
+    """Compute interface bridge port entries"""
+    model = VlanModel(networks, trunk_ports, access_ports)
+    new_data = build_bridge_ports(model, all_ports, bridge_name, port_params)
+    result = _new_data_result(new_data, existing, "interface", BRIDGE_PORT_DEFAULTS)
+    result["changed"] = False
+    return result
+
+
+def get_bridge_vlan(networks, trunk_ports, access_ports, bridge_name):
+    """Compute interface bridge VLAN entries"""
+    model = VlanModel(networks, trunk_ports, access_ports)
+    return dict(changed=False, new_data=build_bridge_vlan(model, bridge_name))
+
+
+def _add_update_remove_result(existing, new_data, check_key, path):
+    """Changes compared to existing, also as one RouterOS script"""
+    to_add, to_update, to_remove = make_add_update_remove(existing, new_data, check_key)
+    return dict(
+        to_add=to_add,
+        to_update=to_update,
+        to_remove=to_remove,
+        commands=routeros_commands(path, to_add, to_update, to_remove, (check_key,)),
+    )
+
+
+def get_sw_vlan(existing, networks, trunk_ports, access_ports, switch_cpu):
+    """Compute switch VLAN add, update and remove lists"""
+    model = VlanModel(networks, trunk_ports, access_ports)
+    result = _add_update_remove_result(
+        existing, build_sw_vlan(model, switch_cpu), "vlan-id", SW_VLAN_PATH
+    )
+    result["changed"] = False
+    return result
+
+
+def get_sw_egress(existing, networks, trunk_ports, access_ports, switch_cpu):
+    """Compute switch egress VLAN tag add, update and remove lists"""
+    model = VlanModel(networks, trunk_ports, access_ports)
+    result = _add_update_remove_result(
+        existing, build_sw_egress(model, switch_cpu), "vlan-id", SW_EGRESS_PATH
+    )
+    result["changed"] = False
+    return result
+
+
+def get_sw_ingress(existing, networks, access_ports):
+    """Compute switch ingress VLAN translation add, update and remove lists"""
+    model = VlanModel(networks, access_ports=access_ports)
+    result = _add_update_remove_result(
+        existing, build_sw_ingress(model), "new-customer-vid", SW_INGRESS_PATH
+    )
+    result["changed"] = False
+    return result
+
+
+# Changes whenever the meaning of a fingerprint changes
+FINGERPRINT_VERSION = 1
+
+
+def plan_fingerprint(desired):
+    """Stable hash of the desired entries of all config sections"""
+    data = json.dumps(
+        dict(version=FINGERPRINT_VERSION, desired=desired),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def get_vlan_plan(
+    networks,
+    all_ports,
+    trunk_ports,
+    access_ports,
+    bridge_name,
+    port_params,
+    legacy,
+    switch_cpu,
+    existing,
+    summary=False,
+    existing_fingerprint=None,
+    cache=None,
+):
+    """Compute all VLAN config sections from one shared model"""
+    model = VlanModel(networks, trunk_ports, access_ports, cache=cache)
+    # Legacy devices don't configure VLANs on bridge ports
+    port_model = VlanModel(networks, cache=cache) if legacy else model
+    desired = dict(
+        interface_vlan=build_interface_vlan(model, bridge_name),
+        bridge_ports=build_bridge_ports(
+            port_model, all_ports, bridge_name, port_params
+        ),
+    )
+    if legacy:
+        desired["sw_ingress"] = build_sw_ingress(model)
+        desired["sw_egress"] = build_sw_egress(model, switch_cpu)
+        desired["sw_vlan"] = build_sw_vlan(model, switch_cpu)
+    else:
+        desired["bridge_vlan"] = build_bridge_vlan(model, bridge_name)
+    # Before comparing, which adds IDs to entries
+    fingerprint = plan_fingerprint(desired)
+
+    result = dict(changed=False)
+    result["interface_vlan"] = _new_data_result(
+        desired["interface_vlan"],
+        existing.get("interface_vlan"),
+        "name",
+        INTERFACE_VLAN_DEFAULTS,
+    )
+    result["bridge_ports"] = _new_data_result(
+        desired["bridge_ports"],
+        existing.get("bridge_ports"),
+        "interface",
+        BRIDGE_PORT_DEFAULTS,
+    )
+    if legacy:
+        result["sw_ingress"] = _add_update_remove_result(
+            existing["sw_ingress"],
+            desired["sw_ingress"],
+            "new-customer-vid",
+            SW_INGRESS_PATH,
+        )
+        result["sw_egress"] = _add_update_remove_result(
+            existing["sw_egress"], desired["sw_egress"], "vlan-id", SW_EGRESS_PATH
+        )
+        result["sw_vlan"] = _add_update_remove_result(
+            existing["sw_vlan"], desired["sw_vlan"], "vlan-id", SW_VLAN_PATH
+        )
+    else:
+        result["bridge_vlan"] = dict(new_data=desired["bridge_vlan"])
+    if summary:
+        result["summary"] = build_port_summary(model)
+    result["fingerprint"] = fingerprint
+    result["fingerprint_matches"] = existing_fingerprint == fingerprint
+    return result
+
+
+def get_vlan_fleet_plan(hosts, networks):
+    """Compute VLAN plans of multiple devices, sharing caches between them
+    hosts maps host names to the arguments of get_vlan_plan, networks is
+    used for hosts that don't define their own.
+    """
+    cache = PlanCache()
+    validator = ArgumentSpecValidator(argspec.VLAN_PLAN)
+    plans = {}
+    for host, host_params in hosts.items():
+        if not isinstance(host_params, dict):
+            raise MTError("{}: parameters must be a dict".format(host))
+        host_params = dict(host_params)
+        # Validation copies parameters, pass shared networks as is so the cache hits
+        shared = "networks" not in host_params and networks is not None
+        if shared:
+            host_params["networks"] = {}
+        validated = validator.validate(host_params)
+        if validated.error_messages:
+            raise MTError("{}: {}".format(host, ", ".join(validated.error_messages)))
+        params = validated.validated_parameters
+        if shared:
+            params["networks"] = networks
+        try:
+            plan = get_vlan_plan(cache=cache, **params)
+        except MTError as e:
+            raise MTError("{}: {}".format(host, e))
+        plan.pop("changed")
+        plans[host] = plan
+    return dict(changed=False, plans=plans)
+
+
+def get_diff(existing, data, keys, ignore_fields, comment_regex, exclude_comment_regex):
+    """Compute add, update and remove lists for any RouterOS table"""
+    for d in data:
+        missing = [k for k in keys if k not in d]
+        if missing:
+            raise MTError(
+                "Data entry missing key fields %s: %s" % (", ".join(missing), d)
+            )
+    existing = filter_comments(existing, comment_regex, exclude_comment_regex)
+    to_add, to_update, to_remove = make_add_update_remove(
+        existing, [dict(d) for d in data], keys, ignore_fields
+    )
+    return dict(
+        changed=False,
+        to_add=to_add,
+        to_update=to_update,
+        to_remove=to_remove,
     )
@@ -11,6 +11,8 @@ author: Andrei Costescu (@cosandr)
 version_added: "1.2.0"
 short_description: Configure fs snapshot schedules on CephFS.
 description: Configure fs snapshot schedules on CephFS.
+requirements:
+  - rados (Python bindings, only with I(backend=rados))
 options:
     state:
         description: State of retention for this path
@@ -23,17 +25,75 @@ options:
         required: false
         type: str
     path:
-        description: Path to manipulate
-        required: true
+        description:
+          - Path to manipulate
+          - Mutually exclusive with I(paths), one of them is required.
+        required: false
         type: str
+    paths:
+        description:
+          - Configure many paths in one run.
+          - Existing schedules of all paths are listed with one recursive C(ceph fs snap-schedule list) call.
+          - Each path may only be given once, paths are compared without trailing or duplicate slashes.
+          - Mutually exclusive with I(path).
+        required: false
+        type: list
+        elements: dict
+        version_added: "1.4.0"
+        suboptions:
+            path:
+                description: Path to manipulate
+                required: true
+                type: str
+            schedule:
+                description: Schedule for path, defaults to I(schedule).
+                required: false
+                type: str
+            retention:
+                description:
+                  - Retention settings for path, defaults to I(retention).
+                  - Takes the same keys as I(retention).
+                required: false
+                type: dict
+    backend:
+        description:
+          - How commands are sent to the cluster.
+          - C(cli) runs the C(ceph) CLI for each command.
+          - C(rados) sends all commands to the manager over one connection using the C(rados) Python bindings.
+          - C(auto) uses C(rados) if the bindings are installed and the cluster is reachable, the CLI otherwise.
+        required: false
+        type: str
+        default: cli
+        choices: ["cli", "rados", "auto"]
+        version_added: "1.4.0"
+    connect_timeout:
+        description:
+          - Seconds to wait for the monitors when connecting with the C(rados) bindings.
+          - With I(backend=auto), the CLI is used if the cluster cannot be reached in time.
+        required: false
+        type: int
+        default: 10
+        version_added: "1.4.0"
+    concurrency:
+        description:
+          - Number of paths in I(paths) changed at the same time.
+          - Commands of one path always run in order.
+        required: false
+        type: int
+        default: 4
+        version_added: "1.4.0"
     schedule:
-        description: Schedule for path
+        description:
+          - Schedule for path
+          - Default schedule of entries in I(paths).
         required: false
         type: str
         default: 1h
     retention:
-        description: List of retention settings for path
-        required: true
+        description:
+          - List of retention settings for path
+          - Required with I(path), default retention of entries in I(paths).
+        required: false
         type: dict
         suboptions:
             hours:
@@ -67,6 +127,32 @@ EXAMPLES = r"""
     retention:
       days: 2
       weeks: 1
+
+- name: Configure snapshots of many paths
+  andrei.utils.ceph_fs_snap_schedule:
+    fs: cephfs
+    schedule: 1h
+    retention:
+      days: 2
+    paths:
+      - path: /home
+      - path: /backup
+        schedule: 1d
+        retention:
+          weeks: 4
+          months: 6
+
+- name: Configure snapshots over one cluster connection if python3-rados is installed
+  andrei.utils.ceph_fs_snap_schedule:
+    fs: cephfs
+    backend: auto
+    concurrency: 8
+    retention:
+      days: 2
+    paths:
+      - path: /volumes/a
+      - path: /volumes/b
+      - path: /volumes/c
 """
 
 RETURN = r"""
@@ -77,195 +163,516 @@ fs:
 add_spec:
     description: Snapshot spec that has been added.
     type: str
-    returned: success
+    returned: success with I(path)
     sample: 2d1w
 remove_spec:
     description: Snapshot spec that has been removed.
     type: str
-    returned: success
+    returned: success with I(path)
     sample: 2h1y
+commands:
+    description:
+      - Arguments of the C(ceph fs snap-schedule) commands run for the path, in order, without the path.
+      - Only the commands needed are run, changed retention units are removed and added again.
+    type: list
+    elements: str
+    returned: success with I(path)
+    sample: ["add 1d", "remove 1h", "retention add 2d"]
+    version_added: "1.4.0"
+paths:
+    description: Result of each entry of I(paths), in order.
+    type: list
+    elements: dict
+    returned: success with I(paths)
+    version_added: "1.4.0"
+    contains:
+        path:
+            description: Path of the entry.
+            type: str
+        changed:
+            description: Whether schedule or retention of the path changed.
+            type: bool
+        add_spec:
+            description: Snapshot spec that has been added.
+            type: str
+        remove_spec:
+            description: Snapshot spec that has been removed.
+            type: str
+        commands:
+            description: Arguments of the commands run for the path, see I(commands).
+            type: list
+            elements: str
 """
 
 import json
-from ansible.module_utils.basic import AnsibleModule
+import posixpath
+import re
+import traceback
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def get_schedule(module: AnsibleModule, path: str, fs: str) -> dict:
-    """Get schedule for path on filesystem"""
-    cmd = [
-        "ceph",
-        "fs",
-        "snap-schedule",
-        "list",
-        path,
-        "--format",
-        "json",
-    ]
-    if fs:
-        cmd.extend(["--fs", fs])
-    rc, stdout, stderr = module.run_command(cmd)
-    if rc != 0:
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+from ansible.module_utils.common.text.converters import to_text
+
+try:
+    import rados
+except ImportError:
+    HAS_RADOS = False
+    RADOS_IMPORT_ERROR = traceback.format_exc()
+else:
+    HAS_RADOS = True
+    RADOS_IMPORT_ERROR = None
+
+# Retention option => unit used by Ceph
+RETENTION_UNITS = {
+    "hours": "h",
+    "days": "d",
+    "weeks": "w",
+    "months": "M",
+    "years": "y",
+}
+RETENTION_SPEC_RE = re.compile(r"(\d+)([a-zA-Z])")
+# <path> <schedule> <retention> line of a plain listing
+SCHEDULE_LINE_RE = re.compile(r"^(.+?) (\d+[a-zA-Z])(?: ((?:\d+[a-zA-Z])+))?$")
+
+RETENTION_ARGSPEC = dict(
+    hours=dict(type="int"),
+    days=dict(type="int"),
+    weeks=dict(type="int"),
+    months=dict(type="int"),
+    years=dict(type="int"),
+)
+
+
+class CephError(Exception):
+    """Failed ceph command, details are passed to fail_json"""
+
+    def __init__(self, msg: str, **details):
+        super(CephError, self).__init__(msg)
+        self.msg = msg
+        self.details = details
+
+
+class CephCLI(object):
+    """Runs fs snap-schedule commands with the ceph CLI, one process each"""
+
+    def __init__(self, module: AnsibleModule, fs: str):
+        self.module = module
+        self.fs = fs
+
+    def run(self, command: str, args: list, msg: str, **options) -> str:
+        """Run fs snap-schedule command, returns its output
+        args are (name, value) pairs of positional arguments, options are
+        flags. Raises CephError instead of failing, so it can run in worker
+        threads.
+        """
+        cmd = ["ceph", "fs", "snap-schedule"] + command.split()
+        cmd.extend(value for _, value in args)
+        for k, v in options.items():
+            cmd.append(f"--{k}")
+            if v is not True:
+                cmd.append(v)
+        if self.fs:
+            cmd.extend(["--fs", self.fs])
+        rc, stdout, stderr = self.module.run_command(cmd)
+        if rc != 0:
+            raise CephError(msg, cmd=cmd, rc=rc, stdout=stdout, stderr=stderr)
+        return stdout
+
+    def close(self):
+        pass
+
+
+class CephMgr(object):
+    """Sends fs snap-schedule commands to the manager over one librados connection"""
+
+    def __init__(self, fs: str, connect_timeout: int):
+        self.fs = fs
+        # Empty conffile reads the default config like the CLI, connect()
+        # waits for the monitors forever without the timeouts
+        timeout = str(connect_timeout)
+        self.cluster = rados.Rados(
+            conffile="",
+            conf=dict(client_mount_timeout=timeout, rados_mon_op_timeout=timeout),
+        )
+        try:
+            self.cluster.connect(timeout=connect_timeout)
+        except rados.Error:
+            self.cluster.shutdown()
+            raise
+
+    def run(self, command: str, args: list, msg: str, **options) -> str:
+        """Same as CephCLI.run"""
+        cmd = dict(prefix=f"fs snap-schedule {command}")
+        cmd.update(args)
+        cmd.update(options)
+        if self.fs:
+            cmd["fs"] = self.fs
+        rc, outbuf, outs = self.cluster.mgr_command(json.dumps(cmd), b"")
+        stdout = to_text(outbuf)
+        if rc != 0:
+            raise CephError(msg, cmd=cmd, rc=rc, stdout=stdout, stderr=outs)
+        return stdout
+
+    def close(self):
+        self.cluster.shutdown()
+
+
+def connect(module: AnsibleModule):
+    """Backend selected by the backend option"""
+    backend = module.params["backend"]
+    fs = module.params["fs"]
+    if backend == "cli" or (backend == "auto" and not HAS_RADOS):
+        return CephCLI(module, fs)
+    if not HAS_RADOS:
         module.fail_json(
-            msg="Failed to list snap schedules",
-            cmd=cmd,
-            rc=rc,
-            stdout=stdout,
-            stderr=stderr,
+            msg=missing_required_lib("rados"), exception=RADOS_IMPORT_ERROR
         )
+    try:
+        return CephMgr(fs, module.params["connect_timeout"])
+    except rados.Error as e:
+        if backend == "rados":
+            module.fail_json(msg=f"Failed to connect to cluster: {to_text(e)}")
+        module.warn(f"Using ceph CLI, failed to connect to cluster: {to_text(e)}")
+        return CephCLI(module, fs)
+
+
+def get_schedule(ceph, path: str) -> dict:
+    """Get schedule for path on filesystem"""
+    stdout = ceph.run(
+        "list",
+        [("path", path)],
+        "Failed to list snap schedules",
+        format="json",
+    )
     return json.loads(stdout)
 
 
-def change_schedule(module: AnsibleModule, command: str, path: str, fs: str, spec: str):
-    cmd = [
-        "ceph",
-        "fs",
-        "snap-schedule",
-        command,
-        path,
-        spec,
-    ]
-    if fs:
-        cmd.extend(["--fs", fs])
-    rc, stdout, stderr = module.run_command(cmd)
-    if rc != 0:
-        module.fail_json(
-            msg=f"Failed to {command} snap schedule",
-            cmd=cmd,
-            rc=rc,
-            stdout=stdout,
-            stderr=stderr,
+def parse_retention(spec: str) -> dict:
+    """Convert a retention spec like 2d1w to {"d": 2, "w": 1}"""
+    return {unit: int(count) for count, unit in RETENTION_SPEC_RE.findall(spec)}
+
+
+def normalize_path(path: str) -> str:
+    """Path as listed by Ceph, without duplicate or trailing slashes"""
+    path = posixpath.normpath(path)
+    # POSIX allows a leading // to mean something else, Ceph does not
+    if path.startswith("//"):
+        path = "/" + path.lstrip("/")
+    return path
+
+
+def list_all_schedules(ceph) -> dict:
+    """Schedules and retention of every path on filesystem
+    The JSON output of a recursive listing does not say which path a
+    schedule belongs to, the plain output has one line per schedule:
+    <path> <schedule> <retention>
+    """
+    try:
+        stdout = ceph.run(
+            "list",
+            [("path", "/")],
+            "Failed to list snap schedules",
+            recursive=True,
         )
+    except CephError as e:
+        # Plain listing fails if there are no schedules at all
+        if "not found" in e.details["stderr"]:
+            return {}
+        raise
+    schedules = {}
+    for line in stdout.splitlines():
+        if not line.strip():
+            continue
+        # Paths may contain spaces, schedules and retention specs cannot
+        match = SCHEDULE_LINE_RE.match(line.rstrip())
+        if not match:
+            raise CephError(f"Cannot parse snap schedule '{line}'", stdout=stdout)
+        path = normalize_path(match.group(1))
+        # Retention is the same on every line of a path
+        found = schedules.setdefault(
+            path, dict(schedule=[], retention=parse_retention(match.group(3) or ""))
+        )
+        found["schedule"].append(match.group(2))
+    return schedules
 
 
-def change_retention(
-    module: AnsibleModule, command: str, path: str, fs: str, spec: str
-):
-    cmd = [
-        "ceph",
-        "fs",
-        "snap-schedule",
-        "retention",
+def change_schedule(ceph, command: str, path: str, spec: str):
+    # Named like the arguments of the snap_schedule manager module
+    spec_name = "snap_schedule" if command == "add" else "repeat"
+    ceph.run(
         command,
-        path,
-        spec,
-    ]
-    if fs:
-        cmd.extend(["--fs", fs])
-    rc, stdout, stderr = module.run_command(cmd)
-    if rc != 0:
-        module.fail_json(
-            msg=f"Failed to {command} snap retention",
-            cmd=cmd,
-            rc=rc,
-            stdout=stdout,
-            stderr=stderr,
-        )
+        [("path", path), (spec_name, spec)],
+        f"Failed to {command} snap schedule",
+    )
 
 
-def main():
-    argument_spec = dict(
-        fs=dict(type="str", required=False),
-        state=dict(type="str", default="present", choices=["present", "absent"]),
-        path=dict(type="str", required=True),
-        schedule=dict(type="str", default="1h"),
-        retention=dict(
-            type="dict",
-            required=True,
-            options=dict(
-                hours=dict(type="int"),
-                days=dict(type="int"),
-                weeks=dict(type="int"),
-                months=dict(type="int"),
-                years=dict(type="int"),
+def change_retention(ceph, command: str, path: str, spec: str):
+    ceph.run(
+        f"retention {command}",
+        [("path", path), ("retention_spec_or_period", spec)],
+        f"Failed to {command} snap retention",
+    )
+
+
+def format_retention(retention: dict) -> str:
+    """Retention spec like 24h7d, units ordered like RETENTION_UNITS"""
+    units = list(RETENTION_UNITS.values())
+    # Units this module does not set go last
+    order = sorted(
+        retention, key=lambda k: units.index(k) if k in units else len(units)
+    )
+    return "".join(f"{retention[k]}{k}" for k in order)
+
+
+def predict_state(schedules: list, retention: dict, commands: list) -> tuple:
+    """Schedules and retention of a path after running commands
+    Follows the checks of the snap_schedule manager module, so a plan it
+    would refuse fails here before anything is changed.
+    """
+    schedules = list(schedules)
+    retention = dict(retention)
+    for command in commands:
+        command, _, spec = command.rpartition(" ")
+        if command == "add":
+            if spec in schedules:
+                raise CephError(f"Snap schedule {spec} is already present")
+            schedules.append(spec)
+        elif command == "remove":
+            schedules.remove(spec)
+            # Retention is stored with the schedules of a path
+            if not schedules:
+                retention = {}
+        elif command == "retention remove":
+            for k, v in parse_retention(spec).items():
+                if retention.get(k) != v:
+                    raise CephError(f"Retention {v}{k} is not set")
+                del retention[k]
+        else:
+            if not schedules:
+                raise CephError("Retention needs a snap schedule")
+            for k, v in parse_retention(spec).items():
+                if k in retention:
+                    raise CephError(f"Retention for {k} is already present")
+                retention[k] = v
+    return schedules, retention
+
+
+def plan_changes(
+    existing_schedules: list, existing_retention: dict, schedule: str, retention: dict
+) -> dict:
+    """Fewest commands giving a path schedule and retention, with the diff
+    Commands are fs snap-schedule arguments without the path. The result is
+    predicted from the listed state and checked, instead of listing again.
+    """
+    # Convert input retention to format expected by Ceph
+    set_retention = {}
+    for k, v in retention.items():
+        if v:
+            set_retention[RETENTION_UNITS[k]] = v
+
+    commands = []
+    # Any of the schedules of a path may be the wanted one
+    if schedule in existing_schedules:
+        existing_schedule = schedule
+    else:
+        existing_schedule = existing_schedules[0] if existing_schedules else ""
+        # Add new schedule before removing old one so we don't lose retention settings
+        commands.append(f"add {schedule}")
+        if existing_schedule:
+            commands.append(f"remove {existing_schedule}")
+
+    # Ceph refuses to add a unit that is set, changed units are removed first
+    remove = {k: v for k, v in existing_retention.items() if set_retention.get(k) != v}
+    add = {k: v for k, v in set_retention.items() if existing_retention.get(k) != v}
+    remove_spec = format_retention(remove)
+    add_spec = format_retention(add)
+    if remove_spec:
+        commands.append(f"retention remove {remove_spec}")
+    if add_spec:
+        commands.append(f"retention add {add_spec}")
+
+    schedules, new_retention = predict_state(
+        existing_schedules, existing_retention, commands
+    )
+    if schedule not in schedules or new_retention != set_retention:
+        raise CephError("Cannot plan snap schedule changes", commands=commands)
+
+    return dict(
+        changed=bool(commands),
+        add_spec=add_spec,
+        remove_spec=remove_spec,
+        commands=commands,
+        diff=dict(
+            before=dict(
+                schedule=existing_schedule,
+                retention=format_retention(existing_retention),
             ),
+            after=dict(schedule=schedule, retention=format_retention(new_retention)),
         ),
     )
 
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        supports_check_mode=True,
-    )
 
+def apply_changes(ceph, path: str, commands: list) -> None:
+    """Run the planned commands of path in order"""
+    for command in commands:
+        command, _, spec = command.rpartition(" ")
+        if command.startswith("retention "):
+            change_retention(ceph, command.split()[1], path, spec)
+        else:
+            change_schedule(ceph, command, path, spec)
+
+
+def run_jobs(func, jobs: list, concurrency: int):
+    """Call func with the arguments of each job, up to concurrency at once
+    The first error is raised once running jobs are done, jobs that did
+    not start yet are cancelled.
+    """
+    if concurrency <= 1 or len(jobs) <= 1:
+        for args in jobs:
+            func(*args)
+        return
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(jobs))) as executor:
+        futures = [executor.submit(func, *args) for args in jobs]
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                for pending in futures:
+                    pending.cancel()
+                raise future.exception()
+
+
+def run_single(module: AnsibleModule, ceph):
     fs = module.params["fs"]
     path = module.params["path"]
     schedule = module.params["schedule"]
     retention = module.params["retention"]
 
-    changed = False
     result = dict(path=path)
     if fs:
         result["fs"] = fs
 
-    existing = get_schedule(module, path, fs)
-    # Convert input retention to format expected by Ceph
-    retention_conv_map = {
-        "hours": "h",
-        "days": "d",
-        "weeks": "w",
-        "months": "M",
-        "years": "y",
-    }
-    set_retention = {}
-    for k, v in retention.items():
-        if v:
-            set_retention[retention_conv_map[k]] = v
+    try:
+        existing = get_schedule(ceph, path)
+        try:
+            existing_retention = existing["retention"][0]
+        except (KeyError, IndexError):
+            existing_retention = {}
+        changes = plan_changes(
+            existing.get("schedule", []), existing_retention, schedule, retention
+        )
+    except CephError as e:
+        module.fail_json(msg=e.msg, **e.details)
+    result.update(changes)
+
+    # Stop before changing anything
+    if module.check_mode:
+        module.exit_json(**result)
 
     try:
-        existing_retention = existing["retention"][0]
-    except (KeyError, IndexError):
-        existing_retention = {}
+        apply_changes(ceph, path, changes["commands"])
+    except CephError as e:
+        module.fail_json(msg=e.msg, **e.details)
+    module.exit_json(**result)
+
+
+def run_batch(module: AnsibleModule, ceph):
+    fs = module.params["fs"]
+
+    result = dict(changed=False, paths=[])
+    if fs:
+        result["fs"] = fs
+
+    # Jobs of the same path would run at the same time
+    seen = {}
+    for entry in module.params["paths"]:
+        path = normalize_path(entry["path"])
+        if path in seen:
+            module.fail_json(
+                msg=f"Path {path} is given more than once: {seen[path]}, {entry['path']}"
+            )
+        seen[path] = entry["path"]
+
     try:
-        existing_schedule = existing["schedule"][0]
-    except (KeyError, IndexError):
-        existing_schedule = ""
-
-    add_spec = ""
-    remove_spec = ""
-    if existing_retention != set_retention:
-        changed = True
-        for k, v in existing_retention.items():
-            # Remove if it's no longer present or if it's different
-            if k not in set_retention or v != set_retention[k]:
-                remove_spec += f"{v}{k}"
-        for k, v in set_retention.items():
-            if k not in existing_retention or v != existing_retention[k]:
-                add_spec += f"{v}{k}"
-
-    result["changed"] = changed
-    result["add_spec"] = add_spec
-    result["remove_spec"] = remove_spec
-
-    # Format diff
-    before = dict(schedule=existing_schedule, retention="")
-    after = dict(schedule=schedule, retention="")
-    # Maintain order for consistency
-    for k in retention_conv_map.values():
-        if existing_retention.get(k):
-            before["retention"] += f"{existing_retention[k]}{k}"
-        if set_retention.get(k):
-            after["retention"] += f"{set_retention[k]}{k}"
-    result["diff"] = dict(
-        before=before,
-        after=after,
-    )
+        existing = list_all_schedules(ceph)
+    except CephError as e:
+        module.fail_json(msg=e.msg, **e.details)
+    before = {}
+    after = {}
+    jobs = []
+    for entry in module.params["paths"]:
+        path = normalize_path(entry["path"])
+        schedule = entry["schedule"] or module.params["schedule"]
+        retention = entry["retention"] or module.params["retention"]
+        if retention is None:
+            module.fail_json(msg=f"retention is required for path {path}")
+        found = existing.get(path, {})
+        try:
+            changes = plan_changes(
+                found.get("schedule", []),
+                found.get("retention", {}),
+                schedule,
+                retention,
+            )
+        except CephError as e:
+            module.fail_json(msg=f"{e.msg} for path {path}", **e.details)
+        diff = changes.pop("diff")
+        before[path] = diff["before"]
+        after[path] = diff["after"]
+        result["paths"].append(dict(path=path, **changes))
+        result["changed"] = result["changed"] or changes["changed"]
+        if changes["commands"]:
+            jobs.append((ceph, path, changes["commands"]))
+    result["diff"] = dict(before=before, after=after)
 
     # Stop before changing anything
     if module.check_mode:
         module.exit_json(**result)
 
-    # Add new schedule before removing old one so we don't lose retention settings
-    if existing_schedule != schedule:
-        changed = True
-        change_schedule(module, "add", path, fs, schedule)
-        if existing_schedule:
-            change_schedule(module, "remove", path, fs, existing_schedule)
+    # Paths are independent, the commands of one path run in order in one job
+    try:
+        run_jobs(apply_changes, jobs, module.params["concurrency"])
+    except CephError as e:
+        module.fail_json(msg=e.msg, **e.details)
+    module.exit_json(**result)
 
-    if remove_spec:
-        change_retention(module, "remove", path, fs, remove_spec)
-    if add_spec:
-        change_retention(module, "add", path, fs, add_spec)
 
-    module.exit_json(**result)
+def main():
+    argument_spec = dict(
+        fs=dict(type="str", required=False),
+        state=dict(type="str", default="present", choices=["present", "absent"]),
+        path=dict(type="str"),
+        paths=dict(
+            type="list",
+            elements="dict",
+            options=dict(
+                path=dict(type="str", required=True),
+                schedule=dict(type="str"),
+                retention=dict(type="dict", options=RETENTION_ARGSPEC),
+            ),
+        ),
+        schedule=dict(type="str", default="1h"),
+        retention=dict(type="dict", options=RETENTION_ARGSPEC),
+        concurrency=dict(type="int", default=4),
+        backend=dict(type="str", default="cli", choices=["cli", "rados", "auto"]),
+        connect_timeout=dict(type="int", default=10),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        mutually_exclusive=[["path", "paths"]],
+        required_one_of=[["path", "paths"]],
+        required_by=dict(path=["retention"]),
+        supports_check_mode=True,
+    )
+
+    ceph = connect(module)
+    try:
+        if module.params["paths"] is not None:
+            run_batch(module, ceph)
+        else:
+            run_single(module, ceph)
+    finally:
+        ceph.close()
 
 
 if __name__ == "__main__":
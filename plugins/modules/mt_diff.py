@@ -0,0 +1,137 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: mt_diff
+author: Andrei Costescu (@cosandr)
+version_added: "1.4.0"
+short_description: Compute add, update and remove lists for any MikroTik API path.
+description:
+  - Compare existing entries of any RouterOS table with expected data.
+  - Entries are matched by one or more key fields using a hash index.
+options:
+    existing:
+        description: Existing data fetched using community.routeros.api_info
+        required: true
+        type: list
+        elements: dict
+    data:
+        description: Expected data in the same format as existing data.
+        required: true
+        type: list
+        elements: dict
+    keys:
+        description:
+          - Fields identifying an entry, entries with equal values for all of them are compared.
+          - Every entry in I(data) must have all key fields.
+        required: true
+        type: list
+        elements: str
+    ignore_fields:
+        description: Fields in I(data) that are not compared.
+        required: false
+        type: list
+        elements: str
+        default: []
+    comment_regex:
+        description: Include only existing entries whose comments match regex.
+        required: false
+        type: str
+        default: ''
+    exclude_comment_regex:
+        description: Exclude existing entries whose comments match regex.
+        required: false
+        type: str
+        default: ''
+"""
+
+EXAMPLES = r"""
+- name: Get DHCP leases
+  community.routeros.api_info:
+    path: ip dhcp-server lease
+    handle_disabled: null-value
+  register: __mt_leases
+
+- name: Get add, update, remove lists
+  andrei.utils.mt_diff:
+    existing: "{{ __mt_leases.result }}"
+    data:
+      - mac-address: "AA:BB:CC:DD:EE:01"
+        address: 10.0.50.10
+        server: general
+    keys:
+      - mac-address
+      - server
+    exclude_comment_regex: "^manual"
+  register: __lease_lists
+
+- name: Add missing leases
+  community.routeros.api_modify:
+    path: ip dhcp-server lease
+    data: "{{ __lease_lists.to_add }}"
+
+- name: Delete old leases
+  community.routeros.api:
+    path: ip dhcp-server lease
+    remove: "{{ item['.id'] }}"
+  loop: "{{ __lease_lists.to_remove }}"
+
+- name: Update leases
+  community.routeros.api_find_and_modify:
+    path: ip dhcp-server lease
+    find:
+      ".id": "{{ item['.id'] }}"
+    values: "{{ item }}"
+    require_matches_min: 1
+    require_matches_max: 1
+  loop: "{{ __lease_lists.to_update }}"
+"""
+
+RETURN = r"""
+to_add:
+    description: List of entries that need to be added.
+    type: list
+    elements: dict
+    returned: success
+to_update:
+    description: List of entries that need to be updated, with the C(.id) of the existing entry.
+    type: list
+    elements: dict
+    returned: success
+to_remove:
+    description: List of existing entries that need to be removed.
+    type: list
+    elements: dict
+    returned: success
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    MTError,
+    get_diff,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=argspec.DIFF,
+        supports_check_mode=True,
+        mutually_exclusive=argspec.DIFF_MUTUALLY_EXCLUSIVE,
+    )
+
+    try:
+        result = get_diff(**module.params)
+    except MTError as e:
+        module.fail_json(to_text(e))
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
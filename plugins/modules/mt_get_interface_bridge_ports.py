@@ -17,7 +17,9 @@ options:
         required: true
         type: dict
     all_ports:
-        description: List of switch ports to add to bridge.
+        description:
+          - List of switch ports to add to bridge.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
         required: true
         type: list
         elements: str
@@ -26,6 +28,7 @@ options:
           - List of ports to configure admit-only-vlan-tagged for.
           - May use the same format as I(access_ports).
           - Only for CRS3xx devices.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
         required: false
         type: list
         elements: raw
@@ -34,6 +37,7 @@ options:
         description:
           - List of ports to configure pvid for.
           - Only for CRS3xx devices.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
         required: false
         type: list
         elements: dict
@@ -48,6 +52,19 @@ options:
         required: false
         type: dict
         default: {}
+    existing:
+        description:
+          - Existing C(interface bridge port) entries, fetched using community.routeros.api_info
+            with C(hide_defaults=false) and C(handle_disabled=omit).
+          - If set, entries are compared by C(interface) and the changes are returned.
+          - Other writable fields are compared to their defaults, so entries changed outside of
+            this module are updated, like community.routeros.api_modify does with
+            C(handle_entries_content=remove_as_much_as_possible).
+          - C(ingress-filtering) is not compared, its default depends on the RouterOS version.
+        required: false
+        type: list
+        elements: dict
+        version_added: "1.4.0"
 """
 
 EXAMPLES = r"""
@@ -104,78 +121,46 @@ new_data:
     type: list
     elements: dict
     returned: success
+to_add:
+    description: List of entries that need to be added.
+    type: list
+    elements: dict
+    returned: if I(existing) is set
+to_update:
+    description: List of entries that need to be updated, with the C(.id) of the existing entry.
+    type: list
+    elements: dict
+    returned: if I(existing) is set
+to_remove:
+    description: List of existing entries that are not in I(new_data).
+    type: list
+    elements: dict
+    returned: if I(existing) is set
+unchanged:
+    description: Whether existing entries already match I(new_data), applying it can be skipped.
+    type: bool
+    returned: if I(existing) is set
 """
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import make_vid_map
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    MTError,
+    get_bridge_ports,
+)
 
 
 def main():
-    argument_spec = dict(
-        networks=dict(type="dict", required=True),
-        all_ports=dict(type="list", elements="str", required=True),
-        trunk_ports=dict(type="list", elements="raw", default=[]),
-        access_ports=dict(type="list", elements="dict", default=[]),
-        bridge_name=dict(type="str", default="bridge1"),
-        port_params=dict(type="dict", default={}),
-    )
-
     module = AnsibleModule(
-        argument_spec=argument_spec,
+        argument_spec=argspec.INTERFACE_BRIDGE_PORTS,
         supports_check_mode=True,
     )
 
-    networks = module.params["networks"]
-    all_ports = module.params["all_ports"]
-    trunk_ports = module.params["trunk_ports"]
-    access_ports = module.params["access_ports"]
-    bridge_name = module.params["bridge_name"]
-    port_params = module.params["port_params"]
-
-    vid_map = make_vid_map(networks)
-
-    # Mapping to make processing easier
-    new_data = {}
-    # Add all ports
-    for p in all_ports:
-        new_data[p] = {
-            "bridge": bridge_name,
-            "interface": p,
-        }
-        for k, v in port_params.items():
-            new_data[p][k] = v
-    all_access_ports = set()
-    # Configure access ports
-    for cfg in access_ports:
-        vid = vid_map.get(cfg["vlan"])
-        if not vid:
-            module.fail_json("Cannot find VID for '{}'".format(cfg["vlan"]))
-        for p in cfg["ports"]:
-            if p not in new_data:
-                module.fail_json("'{}' is not a bridge port".format(p))
-            new_data[p]["pvid"] = vid
-            all_access_ports.add(p)
-
-    # Configure trunk ports
-    for idx, item in enumerate(trunk_ports):
-        ports = []
-        if isinstance(item, str):
-            ports = [item]
-        elif isinstance(item, dict):
-            ports = item["ports"]
-        else:
-            module.fail_json(
-                "Element at index {} type ({}) is unsupported".format(
-                    idx, type(item).__name__
-                )
-            )
-        for p in ports:
-            if p not in new_data:
-                module.fail_json("'{}' is not a bridge port".format(p))
-            if p not in all_access_ports:
-                new_data[p]["frame-types"] = "admit-only-vlan-tagged"
-
-    result = dict(changed=False, new_data=list(new_data.values()))
+    try:
+        result = get_bridge_ports(**module.params)
+    except MTError as e:
+        module.fail_json(to_text(e))
 
     module.exit_json(**result)
 
@@ -23,12 +23,15 @@ options:
           - List of ports to configure as tagged.
           - May use the same format as I(access_ports).
           - The bridge interface is always included.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
         required: false
         type: list
         elements: raw
         default: []
     access_ports:
-        description: List of ports to configure as untagged.
+        description:
+          - List of ports to configure as untagged.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
         required: false
         type: list
         elements: dict
@@ -87,76 +90,25 @@ new_data:
     returned: success
 """
 
-
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
 from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
-    make_vid_map,
-    sort_ports,
+    MTError,
+    get_bridge_vlan,
 )
 
 
 def main():
-    argument_spec = dict(
-        networks=dict(type="dict", required=True),
-        trunk_ports=dict(type="list", elements="raw", default=[]),
-        access_ports=dict(type="list", elements="dict", default=[]),
-        bridge_name=dict(type="str", default="bridge1"),
-    )
-
     module = AnsibleModule(
-        argument_spec=argument_spec,
+        argument_spec=argspec.INTERFACE_BRIDGE_VLAN,
         supports_check_mode=True,
     )
 
-    networks = module.params["networks"]
-    trunk_ports = module.params["trunk_ports"]
-    access_ports = module.params["access_ports"]
-    bridge_name = module.params["bridge_name"]
-
-    vid_map = make_vid_map(networks)
-
-    access_port_map = {}
-    # Mapping to make processing easier
-    new_data = {}
-    # Add all VLANs
-    for name, vid in vid_map.items():
-        new_data[name] = {
-            "bridge": bridge_name,
-            "vlan-ids": vid,
-        }
-        access_port_map[name] = set()
-
-    # Configure access ports
-    for cfg in access_ports:
-        vlan = cfg["vlan"]
-        if vlan not in new_data:
-            module.fail_json("Cannot find VLAN '{}'".format(vlan))
-        access_port_map[vlan] = set(cfg["ports"])
-        new_data[vlan]["untagged"] = ",".join(sort_ports(cfg["ports"]))
-
-    # Configure trunk ports
-    for vlan in new_data.keys():
-        ports = []
-        for idx, item in enumerate(trunk_ports):
-            if isinstance(item, str):
-                # Add plain ports to all VLANs
-                ports.append(item)
-            elif isinstance(item, dict):
-                if item["vlan"] not in new_data:
-                    module.fail_json("Cannot find VLAN '{}'".format(item["vlan"]))
-                if vlan == item["vlan"]:
-                    ports.extend(item["ports"])
-            else:
-                module.fail_json(
-                    "Element at index {} type ({}) is unsupported".format(
-                        idx, type(item).__name__
-                    )
-                )
-        ports = [p for p in ports if p not in access_port_map[vlan]]
-        if ports:
-            new_data[vlan]["tagged"] = ",".join([bridge_name] + sort_ports(ports))
-
-    result = dict(changed=False, new_data=list(new_data.values()))
+    try:
+        result = get_bridge_vlan(**module.params)
+    except MTError as e:
+        module.fail_json(to_text(e))
 
     module.exit_json(**result)
 
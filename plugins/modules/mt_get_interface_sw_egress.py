@@ -28,12 +28,15 @@ options:
         description:
           - List of ports to configure as tagged.
           - The switch chip is always included.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
         required: false
         type: list
         elements: raw
         default: []
     access_ports:
-        description: List of ports to configure as access ports. Used for hybrid ports.
+        description:
+          - List of ports to configure as access ports. Used for hybrid ports.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
         required: false
         type: list
         elements: dict
@@ -99,75 +102,38 @@ to_remove:
     type: list
     elements: dict
     returned: success
+commands:
+    description:
+      - RouterOS commands applying all changes, in order.
+      - Entries are removed first, then updated and added last so they cannot collide.
+    type: list
+    elements: str
+    returned: success
+    version_added: "1.4.0"
+    sample:
+      - /interface ethernet switch egress-vlan-tag remove *5
+      - /interface ethernet switch egress-vlan-tag add tagged-ports="switch1-cpu,ether1,ether2" vlan-id=10
 """
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
 from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
-    make_add_update_remove,
-    make_vid_map,
-    sort_ports,
+    MTError,
+    get_sw_egress,
 )
 
 
 def main():
-    argument_spec = dict(
-        existing=dict(type="list", elements="dict", required=True),
-        networks=dict(type="dict", required=True),
-        trunk_ports=dict(type="list", elements="raw", default=[]),
-        access_ports=dict(type="list", elements="dict", default=[]),
-        switch_cpu=dict(type="str", default="switch1-cpu"),
-    )
-
     module = AnsibleModule(
-        argument_spec=argument_spec,
+        argument_spec=argspec.INTERFACE_SW_EGRESS,
         supports_check_mode=True,
     )
 
-    existing = module.params["existing"]
-    networks = module.params["networks"]
-    trunk_ports = module.params["trunk_ports"]
-    access_ports = module.params["access_ports"]
-    switch_cpu = module.params["switch_cpu"]
-
-    vid_map = make_vid_map(networks)
-
-    access_port_map = {}
-    for cfg in access_ports:
-        access_port_map[cfg["vlan"]] = set(cfg["ports"])
-    new_data = []
-
-    # Add trunk ports
-    for vlan, vid in vid_map.items():
-        ports = []
-        for idx, item in enumerate(trunk_ports):
-            if isinstance(item, str):
-                # Add plain ports to all VLANs
-                ports.append(item)
-            elif isinstance(item, dict):
-                if item["vlan"] not in vid_map:
-                    module.fail_json("Cannot find VLAN '{}'".format(item["vlan"]))
-                if vlan == item["vlan"]:
-                    ports.extend(item["ports"])
-            else:
-                module.fail_json(
-                    "Element at index {} type ({}) is unsupported".format(
-                        idx, type(item).__name__
-                    )
-                )
-        ports = [p for p in ports if p not in access_port_map.get(vlan, [])]
-        if ports:
-            new_data.append(
-                {
-                    "tagged-ports": ",".join([switch_cpu] + sort_ports(ports)),
-                    "vlan-id": vid,
-                }
-            )
-
-    to_add, to_update, to_remove = make_add_update_remove(existing, new_data, "vlan-id")
-
-    result = dict(
-        changed=False, to_add=to_add, to_update=to_update, to_remove=to_remove
-    )
+    try:
+        result = get_sw_egress(**module.params)
+    except MTError as e:
+        module.fail_json(to_text(e))
 
     module.exit_json(**result)
 
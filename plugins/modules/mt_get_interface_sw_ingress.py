@@ -24,7 +24,9 @@ options:
         required: true
         type: dict
     access_ports:
-        description: List of ports to configure as access ports.
+        description:
+          - List of ports to configure as access ports.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
         required: false
         type: list
         elements: dict
@@ -89,56 +91,38 @@ to_remove:
     type: list
     elements: dict
     returned: success
+commands:
+    description:
+      - RouterOS commands applying all changes, in order.
+      - Entries are removed first, then updated and added last so they cannot collide.
+    type: list
+    elements: str
+    returned: success
+    version_added: "1.4.0"
+    sample:
+      - /interface ethernet switch ingress-vlan-translation remove *5
+      - /interface ethernet switch ingress-vlan-translation add customer-vid=0 new-customer-vid=10 ports="ether3"
 """
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
 from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
-    make_add_update_remove,
-    make_vid_map,
+    MTError,
+    get_sw_ingress,
 )
 
 
 def main():
-    argument_spec = dict(
-        existing=dict(type="list", elements="dict", required=True),
-        networks=dict(type="dict", required=True),
-        access_ports=dict(type="list", elements="dict", default=[]),
-    )
-
     module = AnsibleModule(
-        argument_spec=argument_spec,
+        argument_spec=argspec.INTERFACE_SW_INGRESS,
         supports_check_mode=True,
     )
 
-    existing = module.params["existing"]
-    networks = module.params["networks"]
-    access_ports = module.params["access_ports"]
-
-    vid_map = make_vid_map(networks)
-    new_data = []
-
-    # Configure access ports
-    for cfg in access_ports:
-        vlan = cfg["vlan"]
-        vid = vid_map.get(vlan)
-        if not vid:
-            module.fail_json("Cannot find VLAN or its VID '{}'".format(vlan))
-
-        new_data.append(
-            {
-                "customer-vid": 0,
-                "new-customer-vid": vid,
-                "ports": ",".join(cfg["ports"]),
-            }
-        )
-
-    to_add, to_update, to_remove = make_add_update_remove(
-        existing, new_data, "new-customer-vid"
-    )
-
-    result = dict(
-        changed=False, to_add=to_add, to_update=to_update, to_remove=to_remove
-    )
+    try:
+        result = get_sw_ingress(**module.params)
+    except MTError as e:
+        module.fail_json(to_text(e))
 
     module.exit_json(**result)
 
@@ -21,6 +21,18 @@ options:
         required: false
         type: str
         default: bridge1
+    existing:
+        description:
+          - Existing C(interface vlan) entries, fetched using community.routeros.api_info
+            with C(hide_defaults=false) and C(handle_disabled=omit).
+          - If set, entries are compared by C(name) and the changes are returned.
+          - Other writable fields are compared to their defaults, so entries changed outside of
+            this module are updated, like community.routeros.api_modify does with
+            C(handle_entries_content=remove_as_much_as_possible).
+        required: false
+        type: list
+        elements: dict
+        version_added: "1.4.0"
 """
 
 EXAMPLES = r"""
@@ -63,46 +75,46 @@ new_data:
     type: list
     elements: dict
     returned: success
+to_add:
+    description: List of entries that need to be added.
+    type: list
+    elements: dict
+    returned: if I(existing) is set
+to_update:
+    description: List of entries that need to be updated, with the C(.id) of the existing entry.
+    type: list
+    elements: dict
+    returned: if I(existing) is set
+to_remove:
+    description: List of existing entries that are not in I(new_data).
+    type: list
+    elements: dict
+    returned: if I(existing) is set
+unchanged:
+    description: Whether existing entries already match I(new_data), applying it can be skipped.
+    type: bool
+    returned: if I(existing) is set
 """
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    MTError,
+    get_interface_vlan,
+)
 
 
 def main():
-    argument_spec = dict(
-        networks=dict(type="dict", required=True),
-        bridge_name=dict(type="str", default="bridge1"),
-    )
-
     module = AnsibleModule(
-        argument_spec=argument_spec,
+        argument_spec=argspec.INTERFACE_VLAN,
         supports_check_mode=True,
     )
 
-    networks = module.params["networks"]
-    bridge_name = module.params["bridge_name"]
-
-    new_data = []
-    for net_name, net_config in networks.items():
-        if "vlan" not in net_config:
-            continue
-        comment = []
-        if "cidr" in net_config:
-            comment.append(net_config["cidr"])
-        if "cidr6" in net_config:
-            comment.append(net_config["cidr6"])
-        comment = "; ".join(comment)
-        new_data.append(
-            {
-                "interface": bridge_name,
-                "name": net_name.upper(),
-                "vlan-id": net_config["vlan"],
-                "mtu": net_config.get("mtu", 1500),
-                "comment": comment or None,
-            }
-        )
-
-    result = dict(changed=False, new_data=new_data)
+    try:
+        result = get_interface_vlan(**module.params)
+    except MTError as e:
+        module.fail_json(to_text(e))
 
     module.exit_json(**result)
 
@@ -0,0 +1,89 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: mt_vlan_fleet_plan
+author: Andrei Costescu (@cosandr)
+version_added: "1.4.0"
+short_description: Compute VLAN config sections for many MikroTik devices.
+description:
+  - Compute the output of M(andrei.utils.mt_vlan_plan) for many MikroTik devices in one call.
+  - Meant to be used with C(run_once), results are read by each host through C(hostvars).
+  - VLAN ID maps and sorted port lists are cached and shared between all hosts.
+options:
+    hosts:
+        description:
+          - Mapping of host name to the options of M(andrei.utils.mt_vlan_plan) for that host.
+          - Including existing switch chip tables for legacy devices.
+        required: true
+        type: dict
+    networks:
+        description: Network definition used for hosts that do not define I(networks).
+        required: false
+        type: dict
+"""
+
+EXAMPLES = r"""
+- name: Get VLAN plans for all switches
+  run_once: true
+  andrei.utils.mt_vlan_fleet_plan:
+    networks: "{{ mt_networks }}"
+    hosts: >-
+      {%- set hosts = {} -%}
+      {%- for h in ansible_play_hosts -%}
+      {%-   set _ = hosts.update({h: {
+              'all_ports': hostvars[h].mt_bridge_ports,
+              'trunk_ports': hostvars[h].mt_trunk_ports,
+              'access_ports': hostvars[h].mt_access_ports,
+              'bridge_name': hostvars[h].mt_bridge_name,
+            }}) -%}
+      {%- endfor -%}
+      {{ hosts }}
+  register: __vlan_fleet_plan
+
+- name: Configure bridge VLANs
+  community.routeros.api_modify:
+    path: interface bridge vlan
+    data: "{{ __vlan_fleet_plan.plans[inventory_hostname].bridge_vlan.new_data }}"
+    handle_absent_entries: remove
+    handle_entries_content: remove_as_much_as_possible
+"""
+
+RETURN = r"""
+plans:
+    description:
+      - Mapping of host name to its plan.
+      - Each plan has the same keys as the output of M(andrei.utils.mt_vlan_plan).
+    type: dict
+    returned: success
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    MTError,
+    get_vlan_fleet_plan,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=argspec.VLAN_FLEET_PLAN,
+        supports_check_mode=True,
+    )
+
+    try:
+        result = get_vlan_fleet_plan(**module.params)
+    except MTError as e:
+        module.fail_json(to_text(e))
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
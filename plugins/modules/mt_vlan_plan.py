@@ -0,0 +1,328 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: mt_vlan_plan
+author: Andrei Costescu (@cosandr)
+version_added: "1.4.0"
+short_description: Compute all VLAN config sections for MikroTik devices.
+description:
+  - Compute all VLAN config sections for MikroTik devices in one call.
+  - Returns the same data as M(andrei.utils.mt_get_interface_vlan), M(andrei.utils.mt_get_interface_bridge_ports)
+    and either M(andrei.utils.mt_get_interface_bridge_vlan) or the C(mt_get_interface_sw_*) modules.
+  - VLAN IDs and trunk ports are only expanded once for all sections.
+options:
+    networks:
+        description: Network definition
+        required: true
+        type: dict
+    all_ports:
+        description:
+          - List of switch ports to add to bridge.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
+        required: true
+        type: list
+        elements: str
+    trunk_ports:
+        description:
+          - List of ports to configure as tagged.
+          - Elements are either port names, added to all VLANs, or dicts with I(vlan) and I(ports) keys.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
+        required: false
+        type: list
+        elements: raw
+        default: []
+    access_ports:
+        description:
+          - List of ports to configure as untagged, dicts with I(vlan) and I(ports) keys.
+          - Ranges of C(ether), C(sfpplus), C(sfp-sfpplus) and C(combo) ports like C(ether1-24) are expanded.
+        required: false
+        type: list
+        elements: dict
+        default: []
+    bridge_name:
+        description: Name of bridge to configure.
+        required: false
+        type: str
+        default: bridge1
+    port_params:
+        description: Extra parameters for all bridge ports.
+        required: false
+        type: dict
+        default: {}
+    legacy:
+        description:
+          - Compute switch chip config for CRS2xx devices instead of bridge VLANs.
+          - Bridge ports do not get VLAN settings in legacy mode.
+        required: false
+        type: bool
+        default: false
+    switch_cpu:
+        description: Name of switch chip to configure, only used if I(legacy=true).
+        required: false
+        type: str
+        default: switch1-cpu
+    existing:
+        description:
+          - Existing data from MikroTik API.
+          - Switch tables are only used if I(legacy=true).
+        required: false
+        type: dict
+        default: {}
+        suboptions:
+            sw_vlan:
+                description: Existing C(interface ethernet switch vlan) entries.
+                type: list
+                elements: dict
+                default: []
+            sw_egress:
+                description: Existing C(interface ethernet switch egress-vlan-tag) entries.
+                type: list
+                elements: dict
+                default: []
+            sw_ingress:
+                description: Existing C(interface ethernet switch ingress-vlan-translation) entries.
+                type: list
+                elements: dict
+                default: []
+            interface_vlan:
+                description:
+                  - Existing C(interface vlan) entries, see I(existing) of M(andrei.utils.mt_get_interface_vlan).
+                  - If set, I(interface_vlan) also contains the changes.
+                type: list
+                elements: dict
+            bridge_ports:
+                description:
+                  - Existing C(interface bridge port) entries, see I(existing) of M(andrei.utils.mt_get_interface_bridge_ports).
+                  - If set, I(bridge_ports) also contains the changes.
+                type: list
+                elements: dict
+    summary:
+        description: Also return the tagged and untagged ports of each VLAN with port ranges compressed in I(summary).
+        required: false
+        type: bool
+        default: false
+    existing_fingerprint:
+        description:
+          - Fingerprint of the configuration applied to the device, as returned in I(fingerprint) by a previous run.
+          - If it matches, I(fingerprint_matches) is true and applying the plan can be skipped.
+        required: false
+        type: str
+"""
+
+EXAMPLES = r"""
+- name: Get VLAN plan
+  andrei.utils.mt_vlan_plan:
+    networks:
+      example:
+        vlan: 10
+    all_ports: [ether1, ether2, ether3]
+    trunk_ports: [ether1]
+    access_ports:
+      - vlan: EXAMPLE
+        ports: [ether2]
+    bridge_name: bridge1
+  register: __vlan_plan
+
+- name: Configure VLANs
+  community.routeros.api_modify:
+    path: interface vlan
+    data: "{{ __vlan_plan.interface_vlan.new_data }}"
+    handle_absent_entries: remove
+    handle_entries_content: remove_as_much_as_possible
+
+- name: Configure bridge ports
+  community.routeros.api_modify:
+    path: interface bridge port
+    data: "{{ __vlan_plan.bridge_ports.new_data }}"
+    handle_absent_entries: remove
+    handle_entries_content: remove_as_much_as_possible
+
+- name: Configure bridge VLANs
+  community.routeros.api_modify:
+    path: interface bridge vlan
+    data: "{{ __vlan_plan.bridge_vlan.new_data }}"
+    handle_absent_entries: remove
+    handle_entries_content: remove_as_much_as_possible
+
+- name: Check whether the device already has the desired configuration
+  andrei.utils.mt_vlan_plan:
+    networks: "{{ mt_networks }}"
+    all_ports: [ether1-3]
+    existing_fingerprint: "{{ stored_fingerprint }}"
+  register: __vlan_desired
+"""
+
+RETURN = r"""
+interface_vlan:
+    description: Interface VLANs, see M(andrei.utils.mt_get_interface_vlan).
+    type: dict
+    returned: success
+    contains:
+        new_data:
+            description: List of entries that need to be present.
+            type: list
+            elements: dict
+        to_add:
+            description: List of entries that need to be added, if I(existing.interface_vlan) is set.
+            type: list
+            elements: dict
+        to_update:
+            description: List of entries that need to be updated, if I(existing.interface_vlan) is set.
+            type: list
+            elements: dict
+        to_remove:
+            description: List of entries that need to be removed, if I(existing.interface_vlan) is set.
+            type: list
+            elements: dict
+        unchanged:
+            description: Whether I(new_data) is already applied, if I(existing.interface_vlan) is set.
+            type: bool
+bridge_ports:
+    description: Bridge ports, see M(andrei.utils.mt_get_interface_bridge_ports).
+    type: dict
+    returned: success
+    contains:
+        new_data:
+            description: List of entries that need to be present.
+            type: list
+            elements: dict
+        to_add:
+            description: List of entries that need to be added, if I(existing.bridge_ports) is set.
+            type: list
+            elements: dict
+        to_update:
+            description: List of entries that need to be updated, if I(existing.bridge_ports) is set.
+            type: list
+            elements: dict
+        to_remove:
+            description: List of entries that need to be removed, if I(existing.bridge_ports) is set.
+            type: list
+            elements: dict
+        unchanged:
+            description: Whether I(new_data) is already applied, if I(existing.bridge_ports) is set.
+            type: bool
+bridge_vlan:
+    description: Bridge VLANs, see M(andrei.utils.mt_get_interface_bridge_vlan).
+    type: dict
+    returned: if I(legacy=false)
+    contains:
+        new_data:
+            description: List of entries that need to be present.
+            type: list
+            elements: dict
+sw_vlan:
+    description: Switch VLANs, see M(andrei.utils.mt_get_interface_sw_vlan).
+    type: dict
+    returned: if I(legacy=true)
+    contains:
+        to_add:
+            description: List of entries that need to be added.
+            type: list
+            elements: dict
+        to_update:
+            description: List of entries that need to be updated.
+            type: list
+            elements: dict
+        to_remove:
+            description: List of entries that need to be removed.
+            type: list
+            elements: dict
+        commands:
+            description: RouterOS commands applying all changes, in order.
+            type: list
+            elements: str
+sw_egress:
+    description: Switch egress VLAN tags, see M(andrei.utils.mt_get_interface_sw_egress).
+    type: dict
+    returned: if I(legacy=true)
+    contains:
+        to_add:
+            description: List of entries that need to be added.
+            type: list
+            elements: dict
+        to_update:
+            description: List of entries that need to be updated.
+            type: list
+            elements: dict
+        to_remove:
+            description: List of entries that need to be removed.
+            type: list
+            elements: dict
+        commands:
+            description: RouterOS commands applying all changes, in order.
+            type: list
+            elements: str
+sw_ingress:
+    description: Switch ingress VLAN translations, see M(andrei.utils.mt_get_interface_sw_ingress).
+    type: dict
+    returned: if I(legacy=true)
+    contains:
+        to_add:
+            description: List of entries that need to be added.
+            type: list
+            elements: dict
+        to_update:
+            description: List of entries that need to be updated.
+            type: list
+            elements: dict
+        to_remove:
+            description: List of entries that need to be removed.
+            type: list
+            elements: dict
+        commands:
+            description: RouterOS commands applying all changes, in order.
+            type: list
+            elements: str
+summary:
+    description:
+      - Mapping of VLAN name to its C(vlan-id) and comma separated C(tagged) and C(untagged) ports.
+      - Consecutive ports are compressed to ranges like C(ether1-24).
+    type: dict
+    returned: if I(summary=true)
+    sample:
+      GENERAL:
+        vlan-id: 50
+        tagged: ether1,sfp-sfpplus1-2
+        untagged: ether2-24
+fingerprint:
+    description:
+      - SHA-256 hash of the desired entries of all config sections.
+      - Does not depend on I(existing), so it can be computed before reading any table from the device.
+    type: str
+    returned: success
+fingerprint_matches:
+    description: Whether I(existing_fingerprint) equals I(fingerprint).
+    type: bool
+    returned: success
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.mt import argspec
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    MTError,
+    get_vlan_plan,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=argspec.VLAN_PLAN,
+        supports_check_mode=True,
+    )
+
+    try:
+        result = get_vlan_plan(**module.params)
+    except MTError as e:
+        module.fail_json(to_text(e))
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import tempfile
+
+from ansible.errors import AnsibleLookupError
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.andrei.utils.plugins.module_utils.network import (
+    NetworkError,
+    ipaddr_concat,
+)
+from ansible_collections.ansible.utils.plugins.filter import ipv4, ipv6
+
+try:
+    import netaddr  # Used by ipaddr_concat
+except ImportError as imp_exc:
+    NETADDR_IMPORT_ERROR = imp_exc
+else:
+    NETADDR_IMPORT_ERROR = None
+
+CACHE_VERSION = 1
+
+# Host variables that affect the computed addresses
+HOST_VARS = (
+    "host_num",
+    "host_net",
+    "host_subnet",
+    "host_num6_offset",
+    "host_wg_num",
+    "host_wg_net",
+    "host_wg_subnet",
+    "host_wg_num6_offset",
+)
+
+
+def wrap_exception(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except NetworkError as e:
+        raise AnsibleLookupError(to_text(e))
+
+
+def check_ip_duplicates(data, index=None):
+    """Check data for duplicate IPs, index maps already checked IPs to host names
+    Allows for more useful error messages than just IPs
+    """
+    if index is None:
+        index = {}
+    for name, ips in data.items():
+        for ip in ips.values():
+            dup = index.get(ip)
+            if dup is not None:
+                raise AnsibleLookupError(
+                    "%s duplicated for %s and %s" % (ip, name, dup)
+                )
+            index[ip] = name
+    return index
+
+
+def get_host_inputs(hv):
+    """Get host variables and subnet definitions used to compute addresses"""
+    inputs = {k: hv[k] for k in HOST_VARS if k in hv}
+    subnets = hv.get("subnets", {})
+    for net_key, subnet_key in (
+        ("host_net", "host_subnet"),
+        ("host_wg_net", "host_wg_subnet"),
+    ):
+        if net_key not in inputs or subnet_key not in inputs:
+            continue
+        net = subnets.get(inputs[net_key], {})
+        inputs["%s_cidrs" % net_key] = net.get(inputs[subnet_key])
+    return inputs
+
+
+def host_fingerprint(inputs):
+    data = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def num6_offset(hv, var):
+    """Offset added to a host number for IPv6, 1 unless var disables it"""
+    if var in hv and str(hv[var]).lower() in ("false", "no"):
+        return 0
+    return 1
+
+
+def compute_host_addresses(name, hv):
+    tmp = {}
+    # Populate dict
+    if "host_num" in hv:
+        if "host_net" not in hv or "host_subnet" not in hv:
+            raise AnsibleLookupError(
+                "host_net and host_subnet must be defined for %s" % name
+            )
+        v4_subnet = ipv4.ipv4(hv["subnets"][hv["host_net"]][hv["host_subnet"]])
+        if v4_subnet:
+            tmp["ansible_host"] = wrap_exception(
+                ipaddr_concat, v4_subnet, hv["host_num"]
+            )
+        v6_subnet = ipv6.ipv6(hv["subnets"][hv["host_net"]][hv["host_subnet"]])
+        if v6_subnet:
+            host_num6 = hv["host_num"] + num6_offset(hv, "host_num6_offset")
+            tmp["ansible_host6"] = wrap_exception(ipaddr_concat, v6_subnet, host_num6)
+    if "host_wg_num" in hv:
+        if "host_wg_net" not in hv or "host_wg_subnet" not in hv:
+            raise AnsibleLookupError(
+                "host_wg_net and host_wg_subnet must be defined for %s" % name
+            )
+        v4_subnet = ipv4.ipv4(hv["subnets"][hv["host_wg_net"]][hv["host_wg_subnet"]])
+        if v4_subnet:
+            tmp["wireguard_ip"] = wrap_exception(
+                ipaddr_concat, v4_subnet, hv["host_wg_num"]
+            )
+        v6_subnet = ipv6.ipv6(hv["subnets"][hv["host_wg_net"]][hv["host_wg_subnet"]])
+        if v6_subnet:
+            host_wg_num6 = hv["host_wg_num"] + num6_offset(hv, "host_wg_num6_offset")
+            tmp["wireguard_ip6"] = wrap_exception(
+                ipaddr_concat, v6_subnet, host_wg_num6
+            )
+    return tmp
+
+
+def load_cache(path):
+    """Load cached hosts, returns an empty cache if missing or outdated"""
+    try:
+        with open(path, "r") as f:
+            cache = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("hosts", {})
+
+
+def save_cache(path, hosts):
+    content = json.dumps(dict(version=CACHE_VERSION, hosts=hosts), indent=2)
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return
+    except (IOError, OSError):
+        pass
+    # Write to a temporary file first so an interrupted run cannot corrupt the cache
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".generate_hosts"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
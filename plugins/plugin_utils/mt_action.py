@@ -0,0 +1,46 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.common.text.converters import to_text
+from ansible.plugins.action import ActionBase
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import MTError
+
+
+class MTActionBase(ActionBase):
+    """Run a MikroTik compute module in the controller process
+    The modules only transform their arguments, running them here avoids
+    building and executing a module payload for every task.
+    """
+
+    TRANSFERS_FILES = False
+    _requires_connection = False
+
+    argument_spec = {}
+    mutually_exclusive = []
+
+    def compute(self, params, warnings):
+        """Return the module result for validated params"""
+        raise NotImplementedError
+
+    def run(self, tmp=None, task_vars=None):
+        self._supports_check_mode = True
+        result = super(MTActionBase, self).run(tmp, task_vars)
+        del tmp
+
+        dummy, params = self.validate_argument_spec(
+            argument_spec=self.argument_spec,
+            mutually_exclusive=self.mutually_exclusive,
+        )
+
+        warnings = []
+        try:
+            result.update(self.compute(params, warnings))
+        except MTError as e:
+            raise AnsibleActionFail(to_text(e))
+        if warnings:
+            result["warnings"] = warnings
+        return result
@@ -0,0 +1,139 @@
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+    name: generate_network
+    author: Andrei Costescu (@cosandr)
+    version_added: "1.4.0"
+    short_description: Load generated network variables when the inventory is parsed
+    requirements:
+      - Enabled in configuration
+    description:
+      - Templates and validates network files like the andrei.utils.generate_network lookup
+        and exposes the result as variables of a group.
+      - Files are rendered once per process, the result is cached using a hash of the file contents and options.
+      - Templates only have access to variables defined by previous files, inventory variables are not available.
+    options:
+      network_files:
+        description:
+          - List of files to template, in order.
+          - Relative paths are relative to the inventory source or playbook directory being loaded,
+            directories where the files do not exist are skipped.
+        type: list
+        elements: path
+        default: []
+        ini:
+          - key: network_files
+            section: andrei.utils.generate_network
+        env:
+          - name: ANDREI_UTILS_NETWORK_FILES
+      group:
+        description: Name of the group the variables are added to.
+        type: str
+        default: all
+        ini:
+          - key: group
+            section: andrei.utils.generate_network
+        env:
+          - name: ANDREI_UTILS_NETWORK_GROUP
+      v4_name:
+        description: Name of the IPv4 CIDR key in network definitions.
+        type: str
+        default: cidr
+        ini:
+          - key: v4_name
+            section: andrei.utils.generate_network
+      v6_name:
+        description: Name of the IPv6 CIDR key in network definitions.
+        type: str
+        default: cidr6
+        ini:
+          - key: v6_name
+            section: andrei.utils.generate_network
+    extends_documentation_fragment:
+      - vars_plugin_staging
+"""
+
+EXAMPLES = r"""
+# ansible.cfg
+# [defaults]
+# vars_plugins_enabled = host_group_vars,andrei.utils.generate_network
+#
+# [andrei.utils.generate_network]
+# network_files = network/base.yml.j2,network/subnets.yml.j2
+"""
+
+import copy
+import hashlib
+import os
+
+from ansible.errors import AnsibleError, AnsibleParserError
+from ansible.inventory.group import Group
+from ansible.module_utils.common.text.converters import to_bytes, to_text
+from ansible.plugins.loader import lookup_loader
+from ansible.plugins.vars import BaseVarsPlugin
+from ansible.template import Templar
+
+# Content hash => generated variables
+CACHE = {}
+
+
+class VarsModule(BaseVarsPlugin):
+    is_stateless = True
+
+    def get_vars(self, loader, path, entities, cache=True):
+        if not isinstance(entities, list):
+            entities = [entities]
+
+        super(VarsModule, self).get_vars(loader, path, entities)
+
+        group = self.get_option("group")
+        if not any(isinstance(e, Group) and e.name == group for e in entities):
+            return {}
+
+        network_files = self.get_option("network_files")
+        if not network_files:
+            return {}
+
+        files = [os.path.join(self._basedir, f) for f in network_files]
+        # Not configured for this inventory source or playbook directory
+        if not any(os.path.exists(f) for f in files):
+            return {}
+        v4_name = self.get_option("v4_name")
+        v6_name = self.get_option("v6_name")
+
+        content_hash = hashlib.sha256()
+        content_hash.update(to_bytes("%s\0%s\0" % (v4_name, v6_name)))
+        for f in files:
+            try:
+                with open(f, "rb") as fh:
+                    content = fh.read()
+            except (IOError, OSError) as e:
+                raise AnsibleParserError(
+                    "Cannot read network file %s: %s" % (f, to_text(e))
+                )
+            content_hash.update(to_bytes(f) + b"\0" + content + b"\0")
+        key = content_hash.hexdigest()
+
+        if not cache or key not in CACHE:
+            lookup = lookup_loader.get(
+                "andrei.utils.generate_network",
+                loader=loader,
+                templar=Templar(loader=loader),
+            )
+            try:
+                CACHE[key] = lookup.generate(
+                    [files],
+                    {"ansible_search_path": [self._basedir]},
+                    v4_name=v4_name,
+                    v6_name=v6_name,
+                )
+            except AnsibleError as e:
+                raise AnsibleParserError(
+                    "Failed to generate network variables: %s" % to_text(e)
+                ) from e
+        # Callers may change the result, the cached copy is shared by later calls
+        return copy.deepcopy(CACHE[key])
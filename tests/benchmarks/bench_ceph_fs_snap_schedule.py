@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Run ceph_fs_snap_schedule batch mode against a fake Ceph with many paths
+
+Compares the CLI and rados backends at different concurrency levels, the
+fake adds a fixed latency to each CLI process and manager command. Run
+from the directory containing ansible_collections/:
+
+    PYTHONPATH=. python ansible_collections/andrei/utils/tests/benchmarks/bench_ceph_fs_snap_schedule.py
+
+Each scenario reports the paths changed, commands run, cluster connections
+and wall time.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from unittest.mock import patch
+
+from ansible.module_utils import basic
+
+from ansible_collections.andrei.utils.plugins.modules import ceph_fs_snap_schedule
+from ansible_collections.andrei.utils.tests.unit.plugins.modules.fake_ceph import (
+    FakeCeph,
+)
+from ansible_collections.andrei.utils.tests.unit.plugins.modules.utils import (
+    set_module_args,
+)
+
+
+def make_schedules(paths):
+    """Every other path already has the old retention"""
+    return {
+        "/vol/%d" % i: dict(schedule=["1h"], retention={"d": 7})
+        for i in range(0, paths, 2)
+    }
+
+
+def run_module(ceph, args):
+    set_module_args(args)
+    out = io.StringIO()
+    with patch.object(basic.AnsibleModule, "run_command", side_effect=ceph):
+        with patch.object(
+            ceph_fs_snap_schedule, "rados", ceph.rados_module(), create=True
+        ):
+            with patch.object(ceph_fs_snap_schedule, "HAS_RADOS", True):
+                with contextlib.redirect_stdout(out):
+                    try:
+                        ceph_fs_snap_schedule.main()
+                    except SystemExit:
+                        pass
+    result = json.loads(out.getvalue())
+    if result.get("failed"):
+        raise SystemExit(result["msg"])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=200)
+    parser.add_argument("--cli-latency", type=float, default=0.05)
+    parser.add_argument("--mgr-latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    module_args = {
+        "fs": "cephfs",
+        "retention": {"days": 14},
+        "paths": [{"path": "/vol/%d" % i} for i in range(args.paths)],
+    }
+    print(
+        "%d paths, %.0fms per CLI command, %.0fms per manager command"
+        % (args.paths, args.cli_latency * 1000, args.mgr_latency * 1000)
+    )
+    print(
+        "%-8s %11s %8s %9s %12s %8s"
+        % ("backend", "concurrency", "changed", "commands", "connections", "time")
+    )
+    for backend in ("cli", "rados"):
+        for concurrency in (1, 8):
+            ceph = FakeCeph(
+                make_schedules(args.paths),
+                cli_latency=args.cli_latency,
+                mgr_latency=args.mgr_latency,
+            )
+            start = time.time()
+            result = run_module(
+                ceph, dict(module_args, backend=backend, concurrency=concurrency)
+            )
+            elapsed = time.time() - start
+            print(
+                "%-8s %11d %8d %9d %12d %7.2fs"
+                % (
+                    backend,
+                    concurrency,
+                    sum(p["changed"] for p in result["paths"]),
+                    len(ceph.calls) + len(ceph.mgr_calls),
+                    ceph.connections,
+                    elapsed,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Time make_add_update_remove with up to 4094 VLANs
+
+Run from the directory containing ansible_collections/:
+
+    PYTHONPATH=. python ansible_collections/andrei/utils/tests/benchmarks/bench_make_add_update_remove.py
+
+Time per entry should stay roughly constant as the number of VLANs grows.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import timeit
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt.utils import (
+    make_add_update_remove,
+)
+
+
+def make_data(count):
+    existing = [
+        {
+            ".id": "*%X" % vid,
+            "tagged-ports": "switch1-cpu,ether1" if vid % 3 else "switch1-cpu",
+            "vlan-id": vid,
+        }
+        for vid in range(1, count + 1)
+        if vid % 2
+    ]
+    new_data = [
+        {
+            "tagged-ports": "switch1-cpu,ether1",
+            "vlan-id": vid,
+        }
+        for vid in range(count, 0, -1)
+    ]
+    return existing, new_data
+
+
+def main():
+    results = []
+    for count in (512, 1024, 2048, 4094):
+        existing, new_data = make_data(count)
+        runs = 20
+        elapsed = timeit.timeit(
+            lambda: make_add_update_remove(
+                existing, [dict(d) for d in new_data], "vlan-id"
+            ),
+            number=runs,
+        )
+        per_call = elapsed / runs
+        results.append((count, per_call))
+        print(
+            "%5d VLANs: %8.3f ms/call %6.3f us/entry"
+            % (count, per_call * 1000, per_call / count * 1e6)
+        )
+    # Quadratic growth would make this ratio ~8
+    small, large = results[0], results[-1]
+    ratio = (large[1] / large[0]) / (small[1] / small[0])
+    print("Per entry time ratio %d/%d VLANs: %.2f" % (large[0], small[0], ratio))
+
+
+if __name__ == "__main__":
+    main()
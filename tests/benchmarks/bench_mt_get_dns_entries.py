@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Time get_dns_entries with many static DNS entries
+
+Run from the directory containing ansible_collections/:
+
+    PYTHONPATH=. python ansible_collections/andrei/utils/tests/benchmarks/bench_mt_get_dns_entries.py
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import copy
+import time
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt.dns import (
+    get_dns_entries,
+)
+
+
+def make_data(count):
+    """Dual stack hosts, a tenth of them renumbered and a tenth removed"""
+    existing = []
+    data = []
+    for i in range(count // 2):
+        name = "host%d.example.com" % i
+        v4 = "10.%d.%d.%d" % (i >> 16, (i >> 8) & 0xFF, i & 0xFF)
+        v6 = "fd00::%x" % i
+        existing.append(
+            {".id": "*%X" % (2 * i), "comment": None, "name": name, "address": v4}
+        )
+        existing.append(
+            {".id": "*%X" % (2 * i + 1), "comment": None, "name": name, "address": v6}
+        )
+        if i % 10 == 0:
+            continue
+        if i % 10 == 1:
+            v4 = "10.255.%d.%d" % ((i >> 8) & 0xFF, i & 0xFF)
+        data.append({"name": name, "address": v4})
+        data.append({"name": name, "address": v6})
+    return existing, data
+
+
+def main():
+    for count in (2000, 5000, 10000, 20000):
+        existing, data = make_data(count)
+        start = time.perf_counter()
+        result = get_dns_entries(
+            copy.deepcopy(existing),
+            copy.deepcopy(data),
+            comment_regex="",
+            exclude_comment_regex="",
+            remove_without_comment=True,
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            "%5d entries: %7.3f s, %d add, %d update, %d remove"
+            % (
+                count,
+                elapsed,
+                len(result["to_add"]),
+                len(result["to_update"]),
+                len(result["to_remove"]),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""Run the mt_vlans role against a fake RouterOS API with many VLANs and ports
+
+Needs ansible-playbook, the community.routeros collection and librouteros.
+Run from the directory containing ansible_collections/:
+
+    PYTHONPATH=. python ansible_collections/andrei/utils/tests/benchmarks/bench_mt_vlans.py
+
+Each scenario reports the tasks run and changed, API connections and
+command sentences received by the fake device, and wall time.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from ansible_collections.andrei.utils.tests.benchmarks.fake_routeros_api import (
+    FakeRouterOSServer,
+)
+
+PLAYBOOK = """
+- hosts: switch
+  gather_facts: false
+  module_defaults:
+    group/community.routeros.api:
+      hostname: 127.0.0.1
+      port: {port}
+      username: admin
+      password: ""
+  roles:
+    - andrei.utils.mt_vlans
+"""
+
+RECAP_RE = re.compile(
+    r"ok=(\d+)\s+changed=(\d+)\s+unreachable=(\d+)\s+failed=(\d+)\s+skipped=(\d+)"
+)
+
+
+def make_vars(vlans, ports):
+    """Every VLAN tagged on the uplinks, a quarter of the ports as access ports"""
+    networks = {}
+    for i in range(vlans):
+        networks["net%d" % i] = {
+            "vlan": 10 + i,
+            "cidr": "10.%d.%d.0/24" % (i >> 8, i & 0xFF),
+        }
+    all_ports = ["ether1-%d" % ports, "sfp-sfpplus1-4"]
+    access_ports = []
+    for i in range(0, ports, 4):
+        access_ports.append(
+            {"vlan": "NET%d" % (i % vlans), "ports": ["ether%d" % (i + 1)]}
+        )
+    return {
+        "mt_networks": networks,
+        "mt_bridge_name": "bridge1",
+        "mt_bridge_ports": all_ports,
+        "mt_trunk_ports": ["sfp-sfpplus1-4"],
+        "mt_access_ports": access_ports,
+    }
+
+
+def run_play(tmp_dir, extra_vars, server):
+    server.device.reset_counters()
+    env = dict(os.environ)
+    env.setdefault("ANSIBLE_COLLECTIONS_PATH", os.getcwd())
+    env["ANSIBLE_NOCOLOR"] = "1"
+    cmd = [
+        "ansible-playbook",
+        "-i",
+        os.path.join(tmp_dir, "inventory.ini"),
+        "-e",
+        "@" + os.path.join(tmp_dir, "vars.json"),
+        os.path.join(tmp_dir, "play.yml"),
+    ]
+    if extra_vars:
+        cmd.extend(["-e", json.dumps(extra_vars)])
+    start = time.time()
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    elapsed = time.time() - start
+    recap = RECAP_RE.search(proc.stdout)
+    if proc.returncode or not recap:
+        sys.stderr.write(proc.stdout + proc.stderr)
+        raise SystemExit("ansible-playbook failed")
+    ok, changed, _, failed, skipped = (int(x) for x in recap.groups())
+    return {
+        "tasks": ok + failed,
+        "skipped": skipped,
+        "changed": changed,
+        "connections": server.device.connections,
+        "sentences": server.device.sentences,
+        "elapsed": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vlans", type=int, default=300)
+    parser.add_argument("--ports", type=int, default=200)
+    args = parser.parse_args()
+
+    server = FakeRouterOSServer()
+    server.start()
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(tmp_dir, "play.yml"), "w") as f:
+            f.write(PLAYBOOK.format(port=server.port))
+        with open(os.path.join(tmp_dir, "inventory.ini"), "w") as f:
+            f.write(
+                "switch ansible_connection=local ansible_python_interpreter=%s\n"
+                % sys.executable
+            )
+        vlan_vars = make_vars(args.vlans, args.ports)
+        with open(os.path.join(tmp_dir, "vars.json"), "w") as f:
+            json.dump(vlan_vars, f)
+
+        scenarios = [
+            ("initial", {}),
+            ("fingerprint match", {}),
+            ("compare unchanged", {"mt_vlan_fingerprint": False}),
+        ]
+        print("%d VLANs, %d ports" % (args.vlans, args.ports + 4))
+        print(
+            "%-18s %6s %8s %8s %12s %10s %8s"
+            % (
+                "scenario",
+                "tasks",
+                "skipped",
+                "changed",
+                "connections",
+                "sentences",
+                "time",
+            )
+        )
+        for name, extra_vars in scenarios:
+            r = run_play(tmp_dir, extra_vars, server)
+            print(
+                "%-18s %6d %8d %8d %12d %10d %7.2fs"
+                % (
+                    name,
+                    r["tasks"],
+                    r["skipped"],
+                    r["changed"],
+                    r["connections"],
+                    r["sentences"],
+                    r["elapsed"],
+                )
+            )
+    finally:
+        shutil.rmtree(tmp_dir)
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""In-memory stand-in for the RouterOS API
+
+Speaks enough of the RouterOS API protocol for the community.routeros api
+modules: login, print, add, set and remove on any menu path. Entries are
+stored per path in memory, default values of some paths are filled in
+like a device would. Every command sentence is counted, so callers can
+compare how many round trips a play needs.
+
+Not a RouterOS emulator, queries and most validation are not implemented.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import socketserver
+import threading
+
+# Fields RouterOS returns for new entries when not given
+PATH_DEFAULTS = {
+    "/interface/bridge/port": {
+        "disabled": "false",
+        "frame-types": "admit-all",
+        "ingress-filtering": "true",
+        "pvid": "1",
+    },
+    "/interface/bridge/vlan": {
+        "disabled": "false",
+    },
+    "/interface/vlan": {
+        "arp": "enabled",
+        "disabled": "false",
+        "mtu": "1500",
+    },
+    "/system/script": {
+        "dont-require-permissions": "false",
+        "policy": "ftp,reboot,read,write,policy,test,password,sniff,sensitive,romon",
+    },
+}
+
+ROUTEROS_VERSION = "7.13 (stable)"
+
+
+def encode_length(length):
+    if length < 0x80:
+        return bytes((length,))
+    if length < 0x4000:
+        return (length | 0x8000).to_bytes(2, "big")
+    if length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, "big")
+    return (length | 0xE0000000).to_bytes(4, "big")
+
+
+def encode_sentence(words):
+    data = b""
+    for word in words:
+        word = word.encode("utf-8")
+        data += encode_length(len(word)) + word
+    return data + b"\x00"
+
+
+class FakeRouterOS(object):
+    """Tables of one device and counters of the requests it received"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.next_id = 1
+        self.connections = 0
+        self.sentences = 0
+        self.commands = {}
+        self.tables["/system/resource"] = [
+            {".id": "*0", "version": ROUTEROS_VERSION, "board-name": "fake"}
+        ]
+
+    def reset_counters(self):
+        with self.lock:
+            self.connections = 0
+            self.sentences = 0
+            self.commands = {}
+
+    def table(self, path):
+        return self.tables.setdefault(path, [])
+
+    def find(self, path, entry_id):
+        for entry in self.table(path):
+            if entry[".id"] == entry_id:
+                return entry
+        raise LookupError("no such item")
+
+    def handle(self, command, attrs):
+        """Replies to one command sentence, as lists of words"""
+        with self.lock:
+            self.sentences += 1
+            self.commands[command] = self.commands.get(command, 0) + 1
+            if command == "/login":
+                return [["!done"]]
+            path, _, action = command.rpartition("/")
+            try:
+                if action == "print":
+                    return [
+                        ["!re"] + ["=%s=%s" % kv for kv in entry.items()]
+                        for entry in self.table(path)
+                    ] + [["!done"]]
+                if action == "add":
+                    entry = {".id": "*%X" % self.next_id}
+                    self.next_id += 1
+                    entry.update(PATH_DEFAULTS.get(path, {}))
+                    entry.update(attrs)
+                    self.table(path).append(entry)
+                    return [["!done", "=ret=%s" % entry[".id"]]]
+                if action == "set":
+                    entry_id = attrs.pop(".id")
+                    for item in entry_id.split(","):
+                        self.find(path, item).update(attrs)
+                    return [["!done"]]
+                if action == "remove":
+                    for item in attrs[".id"].split(","):
+                        self.table(path).remove(self.find(path, item))
+                    return [["!done"]]
+            except LookupError as e:
+                return [["!trap", "=message=%s" % e], ["!done"]]
+            return [["!trap", "=message=no such command"], ["!done"]]
+
+
+class APIHandler(socketserver.BaseRequestHandler):
+    def read_exact(self, length):
+        data = b""
+        while len(data) < length:
+            chunk = self.request.recv(length - len(data))
+            if not chunk:
+                raise EOFError()
+            data += chunk
+        return data
+
+    def read_length(self):
+        first = self.read_exact(1)[0]
+        if first < 0x80:
+            return first
+        if first < 0xC0:
+            return ((first << 8) | self.read_exact(1)[0]) ^ 0x8000
+        if first < 0xE0:
+            rest = self.read_exact(2)
+            return int.from_bytes(bytes((first,)) + rest, "big") ^ 0xC00000
+        rest = self.read_exact(3)
+        return int.from_bytes(bytes((first,)) + rest, "big") ^ 0xE0000000
+
+    def read_sentence(self):
+        words = []
+        while True:
+            length = self.read_length()
+            if not length:
+                return words
+            words.append(self.read_exact(length).decode("utf-8"))
+
+    def handle(self):
+        device = self.server.device
+        with device.lock:
+            device.connections += 1
+        while True:
+            try:
+                words = self.read_sentence()
+            except (EOFError, ConnectionError):
+                return
+            if not words:
+                continue
+            attrs = {}
+            for word in words[1:]:
+                if word.startswith("="):
+                    key, _, value = word[1:].partition("=")
+                    attrs[key] = value
+            replies = device.handle(words[0], attrs)
+            self.request.sendall(b"".join(encode_sentence(r) for r in replies))
+
+
+class FakeRouterOSServer(socketserver.ThreadingTCPServer):
+    """Serve device on a free local port, see port"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, device=None, host="127.0.0.1"):
+        socketserver.ThreadingTCPServer.__init__(self, (host, 0), APIHandler)
+        self.device = device or FakeRouterOS()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    server = FakeRouterOSServer()
+    print("Listening on %s:%d" % server.server_address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,249 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import copy
+import json
+
+import pytest
+
+from unittest.mock import MagicMock
+
+from ansible.errors import AnsibleActionFail
+from ansible.playbook.play_context import PlayContext
+from ansible.plugins.loader import action_loader
+
+from ansible_collections.andrei.utils.plugins.modules import (
+    mt_diff,
+    mt_get_dns_entries,
+    mt_get_interface_bridge_ports,
+    mt_get_interface_bridge_vlan,
+    mt_get_interface_sw_egress,
+    mt_get_interface_sw_ingress,
+    mt_get_interface_sw_vlan,
+    mt_get_interface_vlan,
+    mt_vlan_plan,
+)
+from ansible_collections.andrei.utils.tests.unit.plugins.modules.utils import (
+    set_module_args,
+)
+
+NETWORKS = {
+    "vm": {
+        "vlan": 10,
+        "cidr": "10.0.10.0/24",
+    },
+    "general": {
+        "vlan": 50,
+        "cidr": "10.0.50.0/24",
+        "cidr6": "fd00:50::/64",
+    },
+    "mgmt": {
+        "vlan": 100,
+    },
+    "no_vlan": {
+        "cidr": "10.1.0.0/24",
+    },
+}
+
+TRUNK_PORTS = [
+    "sfp-sfpplus1",
+    "ether1",
+    {"vlan": "VM", "ports": ["ether5", "ether6"]},
+]
+
+ACCESS_PORTS = [
+    {"vlan": "GENERAL", "ports": ["ether3", "ether2"]},
+    {"vlan": "MGMT", "ports": ["ether4", "ether6"]},
+]
+
+CASES = [
+    (
+        mt_get_interface_vlan,
+        {"networks": NETWORKS, "bridge_name": "bridge2"},
+    ),
+    (
+        mt_get_interface_bridge_ports,
+        {
+            "networks": NETWORKS,
+            "all_ports": ["ether%d" % i for i in range(1, 7)] + ["sfp-sfpplus1"],
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+            "port_params": {"hw": True},
+        },
+    ),
+    (
+        mt_get_interface_bridge_vlan,
+        {
+            "networks": NETWORKS,
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+        },
+    ),
+    (
+        mt_get_interface_sw_vlan,
+        {
+            "existing": [
+                {".id": "*1", "ports": "switch1-cpu,ether1", "vlan-id": 10},
+                {".id": "*2", "ports": "switch1-cpu,ether1", "vlan-id": 20},
+            ],
+            "networks": NETWORKS,
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+        },
+    ),
+    (
+        mt_get_interface_sw_egress,
+        {
+            "existing": [
+                {".id": "*1", "tagged-ports": "switch1-cpu,ether1", "vlan-id": 10},
+                {".id": "*2", "tagged-ports": "switch1-cpu,ether1", "vlan-id": 20},
+            ],
+            "networks": NETWORKS,
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+        },
+    ),
+    (
+        mt_get_interface_sw_ingress,
+        {
+            "existing": [
+                {
+                    ".id": "*1",
+                    "customer-vid": 0,
+                    "new-customer-vid": 50,
+                    "ports": "ether3",
+                },
+            ],
+            "networks": NETWORKS,
+            "access_ports": ACCESS_PORTS,
+        },
+    ),
+    (
+        mt_vlan_plan,
+        {
+            "networks": NETWORKS,
+            "all_ports": ["ether%d" % i for i in range(1, 7)] + ["sfp-sfpplus1"],
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+            "legacy": True,
+            "existing": {
+                "sw_vlan": [
+                    {".id": "*1", "ports": "switch1-cpu,ether1", "vlan-id": 10},
+                ],
+            },
+        },
+    ),
+    (
+        mt_get_dns_entries,
+        {
+            "existing": [
+                {
+                    ".id": "*1",
+                    "comment": None,
+                    "name": "a.example.com",
+                    "address": "10.0.0.1",
+                },
+                {
+                    ".id": "*2",
+                    "comment": "dhcp",
+                    "name": "b.example.com",
+                    "address": "10.0.0.2",
+                },
+                {
+                    ".id": "*3",
+                    "comment": None,
+                    "name": "c.example.com",
+                    "address": "10.0.0.3",
+                },
+            ],
+            "data": [
+                {"name": "a.example.com", "address": "10.0.0.10"},
+                {"name": "d.example.com", "address": "10.0.0.4"},
+                {"address": "10.0.0.5"},
+            ],
+            "exclude_comment_regex": "^dhcp",
+            "output_commands": True,
+        },
+    ),
+    (
+        mt_diff,
+        {
+            "existing": [
+                {".id": "*1", "list": "trusted", "address": "10.0.0.1"},
+                {".id": "*2", "list": "trusted", "address": "10.0.0.2"},
+                {".id": "*3", "list": "blocked", "address": "10.0.0.1"},
+            ],
+            "data": [
+                {"list": "trusted", "address": "10.0.0.1"},
+                {"list": "blocked", "address": "10.0.0.3"},
+            ],
+            "keys": ["list", "address"],
+        },
+    ),
+]
+
+
+def run_module(module, args, capfd):
+    set_module_args(copy.deepcopy(args))
+    with pytest.raises(SystemExit):
+        module.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    out.pop("invocation", None)
+    # Format differs between ansible-core versions
+    out.pop("warnings", None)
+    return out
+
+
+def run_action(name, args):
+    task = MagicMock()
+    task.args = copy.deepcopy(args)
+    task.async_val = 0
+    task.check_mode = False
+    action = action_loader.get(
+        "andrei.utils.%s" % name,
+        task=task,
+        connection=MagicMock(),
+        play_context=PlayContext(),
+        loader=None,
+        templar=None,
+        shared_loader_obj=None,
+    )
+    return action.run(task_vars={})
+
+
+@pytest.mark.parametrize(
+    "module, args", CASES, ids=[m.__name__.split(".")[-1] for m, a in CASES]
+)
+def test_action_matches_module(module, args, capfd):
+    name = module.__name__.split(".")[-1]
+    expected = run_module(module, args, capfd)
+    actual = run_action(name, args)
+    actual.pop("warnings", None)
+    assert actual == expected
+
+
+def test_action_warnings():
+    args = {
+        "existing": [],
+        "data": [{"address": "10.0.0.5"}],
+    }
+    result = run_action("mt_get_dns_entries", args)
+    assert result["warnings"] == [
+        "mt_get_dns_entries: Data missing 'name' and 'regexp', check for undefined variables."
+    ]
+
+
+def test_action_error():
+    args = {
+        "networks": NETWORKS,
+        "access_ports": [{"vlan": "MISSING", "ports": ["ether1"]}],
+    }
+    with pytest.raises(AnsibleActionFail, match="Cannot find VLAN 'MISSING'"):
+        run_action("mt_get_interface_bridge_vlan", args)
+
+
+def test_action_missing_args():
+    with pytest.raises(AnsibleActionFail, match="missing required arguments"):
+        run_action("mt_get_interface_sw_vlan", {})
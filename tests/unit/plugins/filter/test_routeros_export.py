@@ -0,0 +1,48 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import unittest
+
+from ansible.errors import AnsibleFilterError, AnsibleFilterTypeError
+
+from ansible_collections.andrei.utils.plugins.filter.routeros_export import (
+    routeros_export,
+)
+
+EXPORT = """# RouterOS 7.13
+/interface ethernet switch vlan add ports=switch1-cpu,ether2 switch=switch1 vlan-id=10
+/ip dns static add address=10.0.0.1 name=host.example.com
+"""
+
+
+class TestRouterOSExport(unittest.TestCase):
+    def test_routeros_export_filter_plugin(self):
+        self.assertEqual(
+            routeros_export(EXPORT),
+            {
+                "interface ethernet switch vlan": [
+                    {"ports": "switch1-cpu,ether2", "switch": "switch1", "vlan-id": 10}
+                ],
+                "ip dns static": [
+                    {"address": "10.0.0.1", "name": "host.example.com"},
+                ],
+            },
+        )
+
+    def test_routeros_export_paths(self):
+        self.assertEqual(
+            routeros_export(EXPORT.splitlines(), ["ip dns static", "ip pool"]),
+            {
+                "ip dns static": [
+                    {"address": "10.0.0.1", "name": "host.example.com"},
+                ],
+                "ip pool": [],
+            },
+        )
+
+    def test_fail_routeros_export_filter_plugin(self):
+        with self.assertRaises(AnsibleFilterTypeError):
+            routeros_export(1)
+        with self.assertRaisesRegex(AnsibleFilterError, "Cannot parse export line"):
+            routeros_export("add name=x")
@@ -0,0 +1,104 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import unittest
+
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.loader import lookup_loader
+
+SUBNETS = {
+    "general": {
+        "servers": ["10.0.50.0/28", "fd00:50::/124"],
+        "clients": ["10.0.50.128/25"],
+    },
+    "wg": {
+        "peers": ["10.1.0.0/24"],
+    },
+}
+
+
+def make_hostvars():
+    return {
+        "server1": {
+            "host_num": 5,
+            "host_net": "general",
+            "host_subnet": "servers",
+            "host_wg_num": 2,
+            "host_wg_net": "wg",
+            "host_wg_subnet": "peers",
+            "subnets": SUBNETS,
+        },
+        "client1.example.com": {
+            "host_num": 10,
+            "host_net": "general",
+            "host_subnet": "clients",
+            "subnets": SUBNETS,
+        },
+        "unmanaged": {
+            "subnets": SUBNETS,
+        },
+    }
+
+
+class TestGenerateDnsEntries(unittest.TestCase):
+    def setUp(self):
+        self.lookup = lookup_loader.get("andrei.utils.generate_dns_entries")
+
+    def test_generate(self):
+        expected = [
+            {"name": "client1.example.com", "address": "10.0.50.138"},
+            {"name": "server1.example.com", "address": "10.0.50.5"},
+            {"name": "server1.example.com", "address": "fd00:50::6", "type": "AAAA"},
+        ]
+        result = self.lookup.run(
+            [], {"hostvars": make_hostvars()}, domain="example.com"
+        )
+        self.assertEqual(result, expected)
+
+    def test_options(self):
+        expected = [
+            {
+                "name": "server1",
+                "address": "10.1.0.2",
+                "ttl": "1h",
+                "comment": "ansible",
+            },
+            {
+                "regexp": "^.*\\.server1$",
+                "address": "10.1.0.2",
+                "ttl": "1h",
+                "comment": "ansible",
+            },
+        ]
+        result = self.lookup.run(
+            [],
+            {"hostvars": make_hostvars()},
+            address_vars=["wireguard_ip"],
+            wildcard=True,
+            ttl="1h",
+            comment="ansible",
+        )
+        self.assertEqual(result, expected)
+
+    def test_invalid_address_vars(self):
+        with self.assertRaisesRegex(AnsibleLookupError, "Invalid address_vars foo"):
+            self.lookup.run([], {"hostvars": make_hostvars()}, address_vars=["foo"])
+
+    def test_many_hosts(self):
+        subnets = {"general": {"servers": ["10.0.0.0/16", "fd00::/64"]}}
+        hostvars = {
+            "host%05d"
+            % i: {
+                "host_num": i,
+                "host_net": "general",
+                "host_subnet": "servers",
+                "subnets": subnets,
+            }
+            for i in range(1, 2001)
+        }
+        result = self.lookup.run([], {"hostvars": hostvars})
+        self.assertEqual(len(result), 4000)
+        self.assertEqual(
+            result[-1], {"name": "host02000", "address": "fd00::7d1", "type": "AAAA"}
+        )
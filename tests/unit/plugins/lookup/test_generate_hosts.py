@@ -0,0 +1,236 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.loader import lookup_loader
+
+from ansible_collections.andrei.utils.plugins.lookup import generate_hosts
+from ansible_collections.andrei.utils.plugins.plugin_utils import host_addresses
+
+SUBNETS = {
+    "general": {
+        "servers": ["10.0.50.0/28", "fd00:50::/124"],
+        "clients": ["10.0.50.128/25"],
+    },
+}
+
+
+def make_hostvars():
+    return {
+        "server1": {
+            "host_num": 5,
+            "host_net": "general",
+            "host_subnet": "servers",
+            "subnets": SUBNETS,
+        },
+        "client1": {
+            "host_num": 10,
+            "host_net": "general",
+            "host_subnet": "clients",
+            "subnets": SUBNETS,
+        },
+        "unmanaged": {
+            "subnets": SUBNETS,
+        },
+    }
+
+
+class TestGenerateHosts(unittest.TestCase):
+    def setUp(self):
+        self.lookup = lookup_loader.get("andrei.utils.generate_hosts")
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.tmp_dir, "cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_generate(self):
+        output = [
+            'server1 ansible_host="10.0.50.5"   ansible_host6="fd00:50::6"',
+            'client1 ansible_host="10.0.50.138"',
+        ]
+        result = self.lookup.run([], {"hostvars": make_hostvars()})
+        self.assertEqual(result, ["\n".join(output)])
+
+    def test_duplicates(self):
+        hostvars = make_hostvars()
+        hostvars["client1"]["host_subnet"] = "servers"
+        hostvars["client1"]["host_num"] = 5
+        with self.assertRaisesRegex(
+            AnsibleLookupError, "10.0.50.5 duplicated for client1 and server1"
+        ):
+            self.lookup.run([], {"hostvars": hostvars})
+
+    def test_cache_written(self):
+        expected = self.lookup.run([], {"hostvars": make_hostvars()})
+        result = self.lookup.run(
+            [], {"hostvars": make_hostvars()}, cache_file=self.cache_file
+        )
+        self.assertEqual(result, expected)
+        with open(self.cache_file) as f:
+            cache = json.load(f)
+        self.assertEqual(cache["version"], host_addresses.CACHE_VERSION)
+        self.assertEqual(
+            cache["hosts"]["server1"]["addresses"],
+            {"ansible_host": "10.0.50.5", "ansible_host6": "fd00:50::6"},
+        )
+        self.assertEqual(cache["hosts"]["unmanaged"]["addresses"], {})
+
+    def test_cache_only_changed(self):
+        self.lookup.run([], {"hostvars": make_hostvars()}, cache_file=self.cache_file)
+        hostvars = make_hostvars()
+        hostvars["client1"]["host_num"] = 11
+        with patch.object(
+            generate_hosts,
+            "compute_host_addresses",
+            wraps=generate_hosts.compute_host_addresses,
+        ) as mock_compute:
+            result = self.lookup.run(
+                [], {"hostvars": hostvars}, cache_file=self.cache_file
+            )
+        self.assertEqual([c.args[0] for c in mock_compute.call_args_list], ["client1"])
+        self.assertIn('client1 ansible_host="10.0.50.139"', result[0])
+
+    def test_cache_subnet_changed(self):
+        self.lookup.run([], {"hostvars": make_hostvars()}, cache_file=self.cache_file)
+        subnets = {
+            "general": {
+                "servers": ["10.0.60.0/28"],
+                "clients": SUBNETS["general"]["clients"],
+            },
+        }
+        hostvars = make_hostvars()
+        for hv in hostvars.values():
+            hv["subnets"] = subnets
+        with patch.object(
+            generate_hosts,
+            "compute_host_addresses",
+            wraps=generate_hosts.compute_host_addresses,
+        ) as mock_compute:
+            result = self.lookup.run(
+                [], {"hostvars": hostvars}, cache_file=self.cache_file
+            )
+        self.assertEqual([c.args[0] for c in mock_compute.call_args_list], ["server1"])
+        self.assertIn('server1 ansible_host="10.0.60.5"', result[0])
+        self.assertNotIn("ansible_host6", result[0])
+
+    def test_cache_duplicates(self):
+        self.lookup.run([], {"hostvars": make_hostvars()}, cache_file=self.cache_file)
+        hostvars = make_hostvars()
+        hostvars["client1"]["host_subnet"] = "servers"
+        hostvars["client1"]["host_num"] = 5
+        with self.assertRaisesRegex(
+            AnsibleLookupError, "10.0.50.5 duplicated for client1 and server1"
+        ):
+            self.lookup.run([], {"hostvars": hostvars}, cache_file=self.cache_file)
+
+    def test_cache_invalid(self):
+        with open(self.cache_file, "w") as f:
+            f.write("not json")
+        expected = self.lookup.run([], {"hostvars": make_hostvars()})
+        result = self.lookup.run(
+            [], {"hostvars": make_hostvars()}, cache_file=self.cache_file
+        )
+        self.assertEqual(result, expected)
+
+    def test_lowest_free_bit(self):
+        self.assertEqual(generate_hosts.lowest_free_bit(0), 0)
+        self.assertEqual(generate_hosts.lowest_free_bit(0b1011), 2)
+        self.assertEqual(generate_hosts.lowest_free_bit(0b1011, 3), 4)
+        self.assertEqual(generate_hosts.lowest_free_bit(0b1011, 6), 6)
+
+    def test_auto_host_num(self):
+        hostvars = make_hostvars()
+        for name in ("new2", "new1"):
+            hostvars[name] = {
+                "host_net": "general",
+                "host_subnet": "servers",
+                "subnets": SUBNETS,
+            }
+        hostvars["server2"] = {
+            "host_num": 2,
+            "host_net": "general",
+            "host_subnet": "servers",
+            "subnets": SUBNETS,
+        }
+        output = [
+            'new1    ansible_host="10.0.50.1"   ansible_host6="fd00:50::2" host_num=1',
+            'server2 ansible_host="10.0.50.2"   ansible_host6="fd00:50::3"',
+            'new2    ansible_host="10.0.50.3"   ansible_host6="fd00:50::4" host_num=3',
+            'server1 ansible_host="10.0.50.5"   ansible_host6="fd00:50::6"',
+            'client1 ansible_host="10.0.50.138"',
+        ]
+        result = self.lookup.run([], {"hostvars": hostvars}, auto_host_num=True)
+        self.assertEqual(result, ["\n".join(output)])
+
+    def test_auto_host_num_disabled(self):
+        hostvars = make_hostvars()
+        hostvars["new1"] = {
+            "host_net": "general",
+            "host_subnet": "servers",
+            "subnets": SUBNETS,
+        }
+        result = self.lookup.run([], {"hostvars": hostvars})
+        self.assertNotIn("new1", result[0])
+
+    def test_auto_host_num_start(self):
+        hostvars = make_hostvars()
+        hostvars["new1"] = {
+            "host_net": "general",
+            "host_subnet": "servers",
+            "subnets": SUBNETS,
+        }
+        result = self.lookup.run(
+            [], {"hostvars": hostvars}, auto_host_num=True, auto_host_num_start=5
+        )
+        self.assertIn('new1    ansible_host="10.0.50.6"', result[0])
+
+    def test_auto_host_num_full(self):
+        hostvars = {}
+        # fd00:50::/124 limits the subnet to 15 hosts
+        for i in range(16):
+            hostvars["new%02d" % i] = {
+                "host_net": "general",
+                "host_subnet": "servers",
+                "subnets": SUBNETS,
+            }
+        with self.assertRaisesRegex(
+            AnsibleLookupError, r"No free host_num in servers \[general\] for new15"
+        ):
+            self.lookup.run(
+                [], {"hostvars": hostvars}, auto_host_num=True, auto_host_num_start=0
+            )
+
+    def test_auto_host_num_full_no_offset(self):
+        hostvars = {}
+        # Without the IPv6 offset all 16 addresses of fd00:50::/124 are usable
+        for i in range(16):
+            hostvars["new%02d" % i] = {
+                "host_net": "general",
+                "host_subnet": "servers",
+                "host_num6_offset": "false",
+                "subnets": SUBNETS,
+            }
+        result = self.lookup.run(
+            [], {"hostvars": hostvars}, auto_host_num=True, auto_host_num_start=0
+        )
+        self.assertIn(
+            'new15 ansible_host="10.0.50.15" ansible_host6="fd00:50::f"', result[0]
+        )
+
+    def test_auto_host_num_negative(self):
+        hostvars = make_hostvars()
+        hostvars["server1"]["host_num"] = -1
+        with self.assertRaisesRegex(
+            AnsibleLookupError, r"host_num of server1 must be an integer >= 0, got -1"
+        ):
+            self.lookup.run([], {"hostvars": hostvars}, auto_host_num=True)
@@ -0,0 +1,168 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import pytest
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt import utils
+from ansible_collections.andrei.utils.plugins.module_utils.mt.dns import (
+    get_dns_entries,
+)
+from ansible_collections.andrei.utils.plugins.module_utils.mt.export import (
+    iter_export,
+    parse_export,
+)
+
+TERSE = r"""# 2024-01-01 12:00:00 by RouterOS 7.13
+# software id = ABCD-1234
+#
+/interface ethernet switch vlan add ports=switch1-cpu,ether2 switch=switch1 vlan-id=10
+/interface ethernet switch vlan add ports=switch1-cpu,ether3 switch=switch1 vlan-id=20
+/interface ethernet set [ find default-name=ether1 ] comment="uplink port"
+/ip dns static add address=10.0.0.1 comment="managed \"by\" ansible" name=host.example.com
+/ip dns static add address=fd00::1 name=host.example.com type=AAAA
+/ip dns static add comment="caf\C3\A9" disabled=yes name=long.example.com \
+    text="line1\nline2" type=TXT
+"""
+
+DEFAULT = """/interface ethernet switch vlan
+add ports=switch1-cpu,ether2 switch=switch1 vlan-id=10
+add ports=switch1-cpu,ether3 \\
+    switch=switch1 vlan-id=20
+/ip dns static
+add address=10.0.0.1 comment="managed \\"by\\" ansible" name=host.example.com
+"""
+
+
+def test_parse_terse():
+    result = parse_export(TERSE)
+    assert result["interface ethernet switch vlan"] == [
+        {"ports": "switch1-cpu,ether2", "switch": "switch1", "vlan-id": 10},
+        {"ports": "switch1-cpu,ether3", "switch": "switch1", "vlan-id": 20},
+    ]
+    assert result["ip dns static"] == [
+        {
+            "address": "10.0.0.1",
+            "comment": 'managed "by" ansible',
+            "name": "host.example.com",
+        },
+        {"address": "fd00::1", "name": "host.example.com", "type": "AAAA"},
+        {
+            "comment": "caf\u00e9",
+            "disabled": True,
+            "name": "long.example.com",
+            "text": "line1\nline2",
+            "type": "TXT",
+        },
+    ]
+    # Only add commands are entries
+    assert "interface ethernet" not in result
+
+
+def test_parse_default_format():
+    assert parse_export(DEFAULT) == {
+        "interface ethernet switch vlan": [
+            {"ports": "switch1-cpu,ether2", "switch": "switch1", "vlan-id": 10},
+            {"ports": "switch1-cpu,ether3", "switch": "switch1", "vlan-id": 20},
+        ],
+        "ip dns static": [
+            {
+                "address": "10.0.0.1",
+                "comment": 'managed "by" ansible',
+                "name": "host.example.com",
+            },
+        ],
+    }
+
+
+def test_parse_paths():
+    result = parse_export(TERSE.splitlines(), ["ip dns static", "ip firewall nat"])
+    assert sorted(result) == ["ip dns static", "ip firewall nat"]
+    assert len(result["ip dns static"]) == 3
+    assert result["ip firewall nat"] == []
+
+
+def test_iter_export_set():
+    commands = list(iter_export(TERSE.splitlines()))
+    assert commands[2] == ("interface ethernet", "set", {"comment": "uplink port"})
+
+
+def test_iter_export_invalid():
+    with pytest.raises(utils.MTError, match="Cannot parse export line 1: add name=x"):
+        list(iter_export(["add name=x"]))
+
+
+def test_diff_without_ids():
+    existing = parse_export(TERSE)["interface ethernet switch vlan"]
+    new_data = [
+        {"ports": "switch1-cpu,ether2,ether4", "switch": "switch1", "vlan-id": 10},
+    ]
+    to_add, to_update, to_remove = utils.make_add_update_remove(
+        existing, new_data, "vlan-id"
+    )
+    assert to_add == []
+    assert to_update == new_data
+    assert ".id" not in to_update[0]
+    assert to_remove == [existing[1]]
+    # Without IDs, entries are selected by their fields
+    assert utils.routeros_commands(
+        "interface ethernet switch vlan", to_add, to_update, to_remove, ["vlan-id"]
+    ) == [
+        '/interface ethernet switch vlan remove [find where vlan-id=20]',
+        '/interface ethernet switch vlan set [find where vlan-id=10] ports="switch1-cpu,ether2,ether4" switch="switch1" vlan-id=10',
+    ]
+
+
+def test_dns_without_ids():
+    existing = parse_export(TERSE)["ip dns static"]
+    data = [
+        {"name": "host.example.com", "address": "10.0.0.2", "comment": "ansible"},
+    ]
+    result = get_dns_entries(existing, data, None, None, False)
+    assert result["to_update"] == data
+    assert ".id" not in data[0]
+
+
+def test_dns_update_without_ids():
+    existing = [{"name": "foo.lan", "address": "10.0.0.1", "comment": "ansible"}]
+    data = [{"name": "foo.lan", "address": "10.0.0.2", "comment": "ansible"}]
+    result = get_dns_entries(existing, data, None, None, False, output_commands=True)
+    assert result["to_update"] == data
+    # Selected by the existing record, the new address matches nothing yet
+    assert result["commands"] == [
+        '/ip dns static set [find where name="foo.lan" and address="10.0.0.1"]'
+        ' address="10.0.0.2" comment="ansible" name="foo.lan"'
+    ]
+
+
+UNCHANGED = """/interface bridge port
+add bridge=bridge1 frame-types=admit-only-vlan-tagged interface=ether1
+add bridge=bridge1 interface=ether2 pvid=50
+/interface vlan
+add comment=10.0.50.0/24 interface=bridge1 name=GENERAL vlan-id=50
+"""
+
+
+def test_export_defaults_unchanged():
+    existing = parse_export(UNCHANGED)
+    assert existing["interface vlan"][0]["mtu"] == 1500
+    assert existing["interface bridge port"][1]["hw"] is True
+    networks = {"general": {"vlan": 50, "cidr": "10.0.50.0/24"}}
+
+    vlans = utils.get_interface_vlan(networks, "bridge1", existing["interface vlan"])
+    ports = utils.get_bridge_ports(
+        networks,
+        ["ether1", "ether2"],
+        ["ether1"],
+        [{"vlan": "GENERAL", "ports": ["ether2"]}],
+        "bridge1",
+        {"hw": True},
+        existing["interface bridge port"],
+    )
+
+    for result in (vlans, ports):
+        assert result["to_add"] == []
+        assert result["to_update"] == []
+        assert result["to_remove"] == []
+        assert result["unchanged"]
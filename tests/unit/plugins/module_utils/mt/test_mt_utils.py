@@ -3,6 +3,8 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import pytest
+
 from ansible_collections.andrei.utils.plugins.module_utils.mt import utils
 
 
@@ -178,3 +180,265 @@ def test_sort_ports_unsorted():
     actual = utils.sort_ports(trunk_ports)
 
     assert actual == expected
+
+
+def test_sort_ports_other_types():
+    ports = [
+        "vlan50",
+        "bond10",
+        "qsfp28-2-1",
+        "wlan2",
+        "ether1.100",
+        "combo1",
+        "qsfp28-1-10",
+        "bond2",
+        "ether1",
+        "qsfp28-1-2",
+        "ether1.20",
+        "wlan1",
+        "sfp-sfpplus1",
+        "vlan100",
+        "bridge1",
+        "ether10",
+    ]
+
+    expected = [
+        "ether1",
+        "ether1.20",
+        "ether1.100",
+        "ether10",
+        "sfp-sfpplus1",
+        "qsfp28-1-2",
+        "qsfp28-1-10",
+        "qsfp28-2-1",
+        "combo1",
+        "wlan1",
+        "wlan2",
+        "bond2",
+        "bond10",
+        "bridge1",
+        "vlan50",
+        "vlan100",
+    ]
+    actual = utils.sort_ports(ports)
+
+    assert actual == expected
+
+
+def test_make_add_update_remove_composite_key():
+    existing = [
+        {
+            ".id": "1",
+            "customer-vid": 0,
+            "new-customer-vid": 50,
+            "ports": "ether1",
+        },
+        {
+            ".id": "2",
+            "customer-vid": 10,
+            "new-customer-vid": 50,
+            "ports": "ether2",
+        },
+    ]
+    new_data = [
+        {
+            "customer-vid": 10,
+            "new-customer-vid": 50,
+            "ports": "ether3",
+        },
+        {
+            "customer-vid": 20,
+            "new-customer-vid": 50,
+            "ports": "ether4",
+        },
+    ]
+    check_key = ["customer-vid", "new-customer-vid"]
+
+    to_add, to_update, to_remove = utils.make_add_update_remove(
+        existing, new_data, check_key
+    )
+
+    assert to_add == [new_data[1]]
+    assert to_update == [
+        {
+            ".id": "2",
+            "customer-vid": 10,
+            "new-customer-vid": 50,
+            "ports": "ether3",
+        },
+    ]
+    assert to_remove == [existing[0]]
+
+
+def test_make_add_update_remove_all_vlans():
+    # Every other VLAN exists, every third one is outdated
+    existing = [
+        {
+            ".id": "*%X" % vid,
+            "tagged-ports": "ether1" if vid % 3 else "ether2",
+            "vlan-id": vid,
+        }
+        for vid in range(1, 4095)
+        if vid % 2
+    ]
+    # Stale entries outside the new range
+    existing.append({".id": "*FFFF", "tagged-ports": "ether1", "vlan-id": 4095})
+    new_data = [
+        {
+            "tagged-ports": "ether1",
+            "vlan-id": vid,
+        }
+        for vid in range(4094, 0, -1)
+    ]
+
+    to_add, to_update, to_remove = utils.make_add_update_remove(
+        existing, new_data, "vlan-id"
+    )
+
+    assert [d["vlan-id"] for d in to_add] == [
+        vid for vid in range(4094, 0, -1) if not vid % 2
+    ]
+    assert [d["vlan-id"] for d in to_update] == [
+        vid for vid in range(4094, 0, -1) if vid % 2 and not vid % 3
+    ]
+    assert all(d[".id"] == "*%X" % d["vlan-id"] for d in to_update)
+    assert to_remove == [existing[-1]]
+
+
+def test_routeros_quote():
+    assert utils.routeros_quote(True) == "yes"
+    assert utils.routeros_quote(False) == "no"
+    assert utils.routeros_quote(10) == "10"
+    assert utils.routeros_quote("10") == '"10"'
+    assert utils.routeros_quote('a "b" \\ $c?\n') == '"a \\"b\\" \\\\ \\$c\\?\\n"'
+
+
+def test_routeros_commands_find():
+    to_update = [{"name": "a.example.com", "address": "10.0.0.2", "disabled": True}]
+    to_remove = [{"name": "b.example.com", "address": "10.0.0.1", "comment": None}]
+
+    commands = utils.routeros_commands(
+        "ip dns static", [], to_update, to_remove, ("name", "address")
+    )
+
+    assert commands == [
+        '/ip dns static remove [find where name="b.example.com" and address="10.0.0.1"]',
+        '/ip dns static set [find where name="a.example.com" and address="10.0.0.2"]'
+        ' address="10.0.0.2" disabled=yes name="a.example.com"',
+    ]
+
+
+def test_vlan_model_duplicate_ports():
+    model = utils.VlanModel(
+        {"general": {"vlan": 50}},
+        trunk_ports=["ether1", {"vlan": "GENERAL", "ports": ["ether1", "ether2"]}],
+        access_ports=[{"vlan": "GENERAL", "ports": ["ether3"]}],
+    )
+
+    actual = utils.build_bridge_vlan(model, "bridge1")
+
+    assert actual == [
+        {
+            "bridge": "bridge1",
+            "vlan-ids": 50,
+            "untagged": "ether3",
+            "tagged": "bridge1,ether1,ether2",
+        }
+    ]
+
+
+def test_expand_ports():
+    ports = ["ether1-3", "sfp-sfpplus1-2", "qsfp28-1-1", "ether01-02", "bridge1"]
+
+    expected = [
+        "ether1",
+        "ether2",
+        "ether3",
+        "sfp-sfpplus1",
+        "sfp-sfpplus2",
+        "qsfp28-1-1",
+        "ether01-02",
+        "bridge1",
+    ]
+    assert utils.expand_ports(ports) == expected
+
+
+def test_compress_ports():
+    ports = [
+        "ether1",
+        "ether2",
+        "ether3",
+        "ether5",
+        "sfp-sfpplus1",
+        "sfp-sfpplus2",
+        "qsfp28-1-1",
+        "qsfp28-1-2",
+        "ether6",
+    ]
+
+    expected = [
+        "ether1-3",
+        "ether5",
+        "sfp-sfpplus1-2",
+        "qsfp28-1-1",
+        "qsfp28-1-2",
+        "ether6",
+    ]
+    actual = utils.compress_ports(ports)
+
+    assert actual == expected
+    assert utils.expand_ports(actual) == ports
+
+
+@pytest.mark.parametrize(
+    "port", ["sfp28-1", "sfp28-30", "qsfp28-1-1", "qsfpplus1-4", "wlan1-2"]
+)
+def test_expand_port_not_range(port):
+    assert utils.expand_port(port) == (port,)
+
+
+def test_compress_ports_not_range():
+    ports = ["sfp28-1", "sfp28-2", "wlan1", "wlan2", "combo1", "combo2"]
+    assert utils.compress_ports(ports) == [
+        "sfp28-1",
+        "sfp28-2",
+        "wlan1",
+        "wlan2",
+        "combo1-2",
+    ]
+
+
+def test_expand_trunk_ports():
+    vid_map = {"VM": 10, "GENERAL": 50, "MGMT": 100}
+    trunk_ports = [
+        "sfp-sfpplus1",
+        {"vlan": "VM", "ports": ["ether5", "ether1-2"]},
+        "ether1",
+        {"vlan": "MGMT", "ports": ["ether3"]},
+        {"vlan": "VM", "ports": ["ether10"]},
+    ]
+
+    assert utils.expand_trunk_ports(vid_map, trunk_ports) == {
+        "VM": ("ether1", "ether2", "ether5", "ether10", "sfp-sfpplus1"),
+        "GENERAL": ("ether1", "sfp-sfpplus1"),
+        "MGMT": ("ether1", "ether3", "sfp-sfpplus1"),
+    }
+
+
+def test_expand_trunk_ports_invalid():
+    vid_map = {"VM": 10}
+
+    with pytest.raises(utils.MTError, match="Cannot find VLAN 'MISSING'"):
+        utils.expand_trunk_ports(vid_map, [{"vlan": "MISSING", "ports": ["ether1"]}])
+    with pytest.raises(utils.MTError, match=r"Element at index 1 type \(int\)"):
+        utils.expand_trunk_ports(vid_map, ["ether1", 5])
+
+
+def test_plan_cache_vid_map():
+    cache = utils.PlanCache()
+    networks = {"general": {"vlan": 50}}
+    vid_map = cache.vid_map(networks)
+    assert vid_map == {"GENERAL": 50}
+    assert cache.vid_map(networks) is vid_map
+    # Keyed by identity, equal networks of another host are computed again
+    assert cache.vid_map(dict(networks)) is not vid_map
@@ -0,0 +1,27 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt.portset import PortSet
+
+
+def test_port_set():
+    port_set = PortSet(["ether1", "ether2", "sfp-sfpplus1"])
+
+    trunk = port_set.mask(["sfp-sfpplus1", "ether1"])
+    access = port_set.mask(["ether1"])
+
+    assert trunk == 0b101
+    assert port_set.names(trunk & ~access) == ["sfp-sfpplus1"]
+    assert port_set.names(trunk | access) == ["ether1", "sfp-sfpplus1"]
+    assert port_set.names(0) == []
+
+
+def test_port_set_add():
+    port_set = PortSet(["ether1"])
+
+    mask = port_set.mask(["ether3", "ether1", "ether3"])
+
+    assert mask == 0b11
+    assert port_set.names(mask) == ["ether1", "ether3"]
@@ -0,0 +1,192 @@
+"""In-memory stand-in for the Ceph snap_schedule manager module
+
+Keeps the snap schedules of one file system and answers fs snap-schedule
+commands given either as ceph CLI arguments (use the FakeCeph object as
+run_command) or as manager commands sent over a fake librados connection
+(see rados_module()). Calls are counted and can be slowed down, so callers
+can compare backends and concurrency without a cluster.
+
+Not a Ceph emulator, only the commands used by ceph_fs_snap_schedule are
+implemented and schedules are not validated.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import re
+import threading
+import time
+import types
+
+# Positional arguments of fs snap-schedule commands, as named by the manager
+COMMAND_ARGS = {
+    "list": ["path"],
+    "add": ["path", "snap_schedule"],
+    "remove": ["path", "repeat"],
+    "retention add": ["path", "retention_spec_or_period"],
+    "retention remove": ["path", "retention_spec_or_period"],
+}
+PREFIX = "fs snap-schedule "
+RETENTION_SPEC_RE = re.compile(r"(\d+)([a-zA-Z])")
+EINVAL = 22
+ENOENT = 2
+
+
+class RadosError(Exception):
+    pass
+
+
+class FakeRados(object):
+    """Connection of the rados bindings, see FakeCeph.rados_module()"""
+
+    def __init__(self, ceph, conffile=None, conf=None):
+        self.ceph = ceph
+        self.conf = conf or {}
+        self.connected = False
+
+    def connect(self, timeout=0):
+        with self.ceph.lock:
+            self.ceph.connect_attempts.append((self.conf, timeout))
+        if self.ceph.unreachable:
+            raise RadosError("error connecting to the cluster")
+        with self.ceph.lock:
+            self.ceph.connections += 1
+        self.connected = True
+
+    def mgr_command(self, cmd, inbuf, timeout=0):
+        assert self.connected
+        params = json.loads(cmd)
+        with self.ceph.lock:
+            self.ceph.mgr_calls.append(params)
+        time.sleep(self.ceph.mgr_latency)
+        params = dict(params)
+        prefix = params.pop("prefix")
+        assert prefix.startswith(PREFIX)
+        rc, stdout, stderr = self.ceph.handle(prefix[len(PREFIX) :], params)
+        return -rc, stdout.encode("utf-8"), stderr
+
+    def shutdown(self):
+        self.connected = False
+
+
+class FakeCeph(object):
+    """Snap schedules of one file system"""
+
+    def __init__(self, schedules=None, fail_paths=(), cli_latency=0, mgr_latency=0):
+        # Path => {"schedule": [...], "retention": {...}}
+        self.schedules = schedules or {}
+        # Changes of these paths fail
+        self.fail_paths = fail_paths
+        # Seconds each CLI process or manager command takes
+        self.cli_latency = cli_latency
+        self.mgr_latency = mgr_latency
+        # rados connect() fails
+        self.unreachable = False
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        # CLI argument lists and manager command dicts received
+        self.calls = []
+        self.mgr_calls = []
+        self.connections = 0
+        # (conf, timeout) of each rados connect()
+        self.connect_attempts = []
+
+    def rados_module(self):
+        """Stand-in for the rados module, connecting to this file system"""
+        return types.SimpleNamespace(
+            Rados=lambda conffile=None, conf=None: FakeRados(self, conffile, conf),
+            Error=RadosError,
+        )
+
+    def __call__(self, cmd, **kwargs):
+        """run_command of the ceph CLI"""
+        with self.lock:
+            self.calls.append(cmd)
+        time.sleep(self.cli_latency)
+        assert cmd[:3] == ["ceph", "fs", "snap-schedule"]
+        args = list(cmd[3:])
+        command = args.pop(0)
+        if command == "retention":
+            command += " " + args.pop(0)
+        params = {}
+        for name in COMMAND_ARGS[command]:
+            params[name] = args.pop(0)
+        while args:
+            flag = args.pop(0)[2:]
+            if flag == "recursive":
+                params[flag] = True
+            else:
+                params[flag] = args.pop(0)
+        return self.handle(command, params)
+
+    def handle(self, command, params):
+        """Run one command, returns rc, stdout and stderr"""
+        with self.lock:
+            if command == "list":
+                return self.list(params)
+            path = params["path"]
+            if path in self.fail_paths:
+                return EINVAL, "", "Error EINVAL: %s" % path
+            try:
+                self.change(command, path, params)
+            except ValueError as e:
+                return EINVAL, "", "Error EINVAL: %s" % e
+            return 0, "", ""
+
+    def change(self, command, path, params):
+        """Refuses the same changes as the snap_schedule manager module"""
+        scheduled = self.schedules.setdefault(path, dict(schedule=[], retention={}))
+        retention = scheduled["retention"]
+        if command.startswith("retention "):
+            if not scheduled["schedule"]:
+                raise ValueError("No schedule found for %s" % path)
+            spec = params["retention_spec_or_period"]
+            for count, unit in RETENTION_SPEC_RE.findall(spec):
+                if command == "retention add":
+                    if unit in retention:
+                        raise ValueError("Retention for %s is already present" % unit)
+                    retention[unit] = int(count)
+                elif retention.get(unit) != int(count):
+                    raise ValueError("Retention for %s%s was not set" % (count, unit))
+                else:
+                    del retention[unit]
+        elif command == "add":
+            if params["snap_schedule"] in scheduled["schedule"]:
+                raise ValueError("Schedule already exists")
+            scheduled["schedule"].append(params["snap_schedule"])
+        else:
+            if params["repeat"] not in scheduled["schedule"]:
+                raise ValueError("No schedule found for %s" % path)
+            scheduled["schedule"].remove(params["repeat"])
+            # Retention is stored with the schedules of a path
+            if not scheduled["schedule"]:
+                scheduled["retention"] = {}
+
+    def list(self, params):
+        path = params["path"]
+        if params.get("recursive"):
+            lines = []
+            for p, s in sorted(self.schedules.items()):
+                if not p.startswith(path):
+                    continue
+                for schedule in s["schedule"]:
+                    retention = "".join(
+                        "%d%s" % (v, k) for k, v in s["retention"].items()
+                    )
+                    lines.append("%s %s %s" % (p, schedule, retention))
+            if not lines:
+                return ENOENT, "", "SnapSchedule for %s not found" % path
+            return 0, "\n".join(lines), ""
+        s = self.schedules.get(path)
+        if not s or not s["schedule"]:
+            return 0, "{}", ""
+        out = dict(
+            path=path,
+            schedule=s["schedule"],
+            retention=[s["retention"]] * len(s["schedule"]),
+        )
+        return 0, json.dumps(out), ""
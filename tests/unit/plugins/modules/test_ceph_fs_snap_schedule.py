@@ -0,0 +1,356 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import json
+
+from unittest.mock import patch
+
+import pytest
+
+from ansible.module_utils import basic
+
+from ansible_collections.andrei.utils.plugins.modules import ceph_fs_snap_schedule
+from ansible_collections.andrei.utils.tests.unit.plugins.modules.fake_ceph import (
+    FakeCeph,
+)
+from ansible_collections.andrei.utils.tests.unit.plugins.modules.utils import (
+    set_module_args,
+)
+
+
+def run_module(args, ceph, capfd, has_rados=True):
+    set_module_args(args)
+    rados = ceph.rados_module()
+    with patch.object(basic.AnsibleModule, "run_command", side_effect=ceph):
+        with patch.object(ceph_fs_snap_schedule, "rados", rados, create=True):
+            with patch.object(ceph_fs_snap_schedule, "HAS_RADOS", has_rados):
+                with pytest.raises(SystemExit):
+                    ceph_fs_snap_schedule.main()
+    out, err = capfd.readouterr()
+    # Warnings are also returned in the result
+    assert all(line.startswith("[WARNING]") for line in err.splitlines())
+    return json.loads(out)
+
+
+def test_single_path(capfd):
+    ceph = FakeCeph({"/": dict(schedule=["1h"], retention={"h": 24, "d": 7})})
+    out = run_module(
+        {"path": "/", "schedule": "1h", "retention": {"days": 14}}, ceph, capfd
+    )
+    assert out["changed"]
+    assert out["remove_spec"] == "24h7d"
+    assert out["add_spec"] == "14d"
+    assert ceph.schedules["/"] == dict(schedule=["1h"], retention={"d": 14})
+
+
+def test_missing_retention(capfd):
+    out = run_module({"path": "/"}, FakeCeph(), capfd)
+    assert out.get("failed", False)
+    assert "retention" in out["msg"]
+
+
+def test_parse_retention():
+    assert ceph_fs_snap_schedule.parse_retention("24h7d1M") == {
+        "h": 24,
+        "d": 7,
+        "M": 1,
+    }
+    assert ceph_fs_snap_schedule.parse_retention("") == {}
+
+
+def test_batch(capfd):
+    ceph = FakeCeph(
+        {
+            "/home": dict(schedule=["1h"], retention={"d": 2}),
+            "/data": dict(schedule=["1h"], retention={"d": 7}),
+            "/my dir": dict(schedule=["1d"], retention={"w": 4}),
+        }
+    )
+    out = run_module(
+        {
+            "fs": "cephfs",
+            "retention": {"days": 2},
+            "paths": [
+                {"path": "/home/"},
+                {"path": "/data"},
+                {"path": "/my dir", "schedule": "1d", "retention": {"weeks": 4}},
+                {"path": "/new", "retention": {"hours": 24}},
+            ],
+        },
+        ceph,
+        capfd,
+    )
+    assert not out.get("failed", False)
+    assert out["changed"]
+    assert [(p["path"], p["changed"]) for p in out["paths"]] == [
+        ("/home", False),
+        ("/data", True),
+        ("/my dir", False),
+        ("/new", True),
+    ]
+    assert out["diff"]["before"]["/data"] == dict(schedule="1h", retention="7d")
+    assert out["diff"]["after"]["/data"] == dict(schedule="1h", retention="2d")
+    # One listing for all paths
+    assert [c for c in ceph.calls if "list" in c] == [
+        ["ceph", "fs", "snap-schedule", "list", "/", "--recursive", "--fs", "cephfs"]
+    ]
+    assert ceph.schedules["/data"] == dict(schedule=["1h"], retention={"d": 2})
+    assert ceph.schedules["/new"] == dict(schedule=["1h"], retention={"h": 24})
+
+
+def test_batch_check_mode(capfd):
+    ceph = FakeCeph()
+    out = run_module(
+        {
+            "_ansible_check_mode": True,
+            "retention": {"days": 2},
+            "paths": [{"path": "/a"}, {"path": "/b"}],
+        },
+        ceph,
+        capfd,
+    )
+    assert out["changed"]
+    assert len(ceph.calls) == 1
+    assert ceph.schedules == {}
+
+
+def test_batch_missing_retention(capfd):
+    out = run_module({"paths": [{"path": "/a"}]}, FakeCeph(), capfd)
+    assert out.get("failed", False)
+    assert out["msg"] == "retention is required for path /a"
+
+
+def test_batch_duplicate_paths(capfd):
+    ceph = FakeCeph()
+    out = run_module(
+        {"retention": {"days": 2}, "paths": [{"path": "/a"}, {"path": "/a/"}]},
+        ceph,
+        capfd,
+    )
+    assert out.get("failed", False)
+    assert out["msg"] == "Path /a is given more than once: /a, /a/"
+    assert ceph.calls == []
+
+
+def test_batch_concurrent(capfd):
+    ceph = FakeCeph(
+        {"/p%d" % i: dict(schedule=["1h"], retention={"d": 1}) for i in range(20)}
+    )
+    out = run_module(
+        {
+            "schedule": "1d",
+            "retention": {"days": 2},
+            "paths": [{"path": "/p%d" % i} for i in range(20)],
+            "concurrency": 8,
+        },
+        ceph,
+        capfd,
+    )
+    assert not out.get("failed", False)
+    for i in range(20):
+        path = "/p%d" % i
+        assert ceph.schedules[path] == dict(schedule=["1d"], retention={"d": 2})
+        # Commands of a path keep their order
+        calls = [c[3:] for c in ceph.calls if path in c]
+        assert calls == [
+            ["add", path, "1d"],
+            ["remove", path, "1h"],
+            ["retention", "remove", path, "1d"],
+            ["retention", "add", path, "2d"],
+        ]
+
+
+def test_batch_error(capfd):
+    ceph = FakeCeph(fail_paths=["/b"])
+    out = run_module(
+        {
+            "retention": {"days": 2},
+            "paths": [{"path": "/a"}, {"path": "/b"}, {"path": "/c"}],
+        },
+        ceph,
+        capfd,
+    )
+    assert out.get("failed", False)
+    assert out["msg"] == "Failed to add snap schedule"
+    assert out["cmd"] == ["ceph", "fs", "snap-schedule", "add", "/b", "1h"]
+    assert out["rc"] == 22
+
+
+def test_run_jobs_sequential():
+    calls = []
+    ceph_fs_snap_schedule.run_jobs(calls.append, [(1,), (2,), (3,)], 1)
+    assert calls == [1, 2, 3]
+
+
+def test_rados_batch(capfd):
+    ceph = FakeCeph({"/a": dict(schedule=["1h"], retention={"d": 1})})
+    out = run_module(
+        {
+            "fs": "cephfs",
+            "backend": "rados",
+            "retention": {"days": 2},
+            "paths": [{"path": "/a"}, {"path": "/b"}],
+        },
+        ceph,
+        capfd,
+    )
+    assert not out.get("failed", False)
+    assert out["changed"]
+    assert ceph.calls == []
+    # All commands over one connection
+    assert ceph.connections == 1
+    assert ceph.mgr_calls[0] == {
+        "prefix": "fs snap-schedule list",
+        "path": "/",
+        "recursive": True,
+        "fs": "cephfs",
+    }
+    assert {
+        "prefix": "fs snap-schedule add",
+        "path": "/b",
+        "snap_schedule": "1h",
+        "fs": "cephfs",
+    } in ceph.mgr_calls
+    assert ceph.schedules["/a"] == dict(schedule=["1h"], retention={"d": 2})
+    assert ceph.schedules["/b"] == dict(schedule=["1h"], retention={"d": 2})
+
+
+def test_rados_error(capfd):
+    ceph = FakeCeph(fail_paths=["/a"])
+    out = run_module(
+        {"path": "/a", "backend": "rados", "retention": {"days": 2}}, ceph, capfd
+    )
+    assert out.get("failed", False)
+    assert out["msg"] == "Failed to add snap schedule"
+    assert out["cmd"]["prefix"] == "fs snap-schedule add"
+    assert out["rc"] == -22
+
+
+def test_rados_missing(capfd):
+    ceph = FakeCeph()
+    out = run_module(
+        {"path": "/a", "backend": "rados", "retention": {"days": 2}},
+        ceph,
+        capfd,
+        has_rados=False,
+    )
+    assert out.get("failed", False)
+    assert "rados" in out["msg"]
+
+
+@pytest.mark.parametrize("has_rados, unreachable", [(False, False), (True, True)])
+def test_auto_fallback(capfd, has_rados, unreachable):
+    ceph = FakeCeph()
+    ceph.unreachable = unreachable
+    out = run_module(
+        {"path": "/a", "backend": "auto", "retention": {"days": 2}},
+        ceph,
+        capfd,
+        has_rados=has_rados,
+    )
+    assert not out.get("failed", False)
+    assert ceph.mgr_calls == []
+    assert ceph.calls[0][:4] == ["ceph", "fs", "snap-schedule", "list"]
+    assert ceph.schedules["/a"] == dict(schedule=["1h"], retention={"d": 2})
+
+
+def test_auto_rados(capfd):
+    ceph = FakeCeph()
+    out = run_module(
+        {"path": "/a", "backend": "auto", "retention": {"days": 2}}, ceph, capfd
+    )
+    assert not out.get("failed", False)
+    assert ceph.calls == []
+    assert ceph.connections == 1
+    assert ceph.connect_attempts == [
+        (dict(client_mount_timeout="10", rados_mon_op_timeout="10"), 10)
+    ]
+
+
+def test_auto_connect_timeout(capfd):
+    ceph = FakeCeph()
+    ceph.unreachable = True
+    out = run_module(
+        {
+            "path": "/a",
+            "backend": "auto",
+            "connect_timeout": 2,
+            "retention": {"days": 2},
+        },
+        ceph,
+        capfd,
+    )
+    assert not out.get("failed", False)
+    # Gave up after the timeout and used the CLI
+    assert ceph.connect_attempts == [
+        (dict(client_mount_timeout="2", rados_mon_op_timeout="2"), 2)
+    ]
+    assert ceph.schedules["/a"] == dict(schedule=["1h"], retention={"d": 2})
+
+
+def test_changed_unit_only(capfd):
+    ceph = FakeCeph({"/": dict(schedule=["1h"], retention={"h": 24, "d": 7})})
+    out = run_module({"path": "/", "retention": {"hours": 24, "days": 14}}, ceph, capfd)
+    assert out["changed"]
+    assert out["commands"] == ["retention remove 7d", "retention add 14d"]
+    assert ceph.schedules["/"] == dict(schedule=["1h"], retention={"h": 24, "d": 14})
+
+
+def test_schedule_only(capfd):
+    ceph = FakeCeph({"/": dict(schedule=["1h"], retention={"d": 7})})
+    out = run_module(
+        {"path": "/", "schedule": "1d", "retention": {"days": 7}}, ceph, capfd
+    )
+    assert out["changed"]
+    assert out["commands"] == ["add 1d", "remove 1h"]
+    assert ceph.schedules["/"] == dict(schedule=["1d"], retention={"d": 7})
+
+
+def test_schedule_only_check_mode(capfd):
+    ceph = FakeCeph({"/": dict(schedule=["1h"], retention={"d": 7})})
+    out = run_module(
+        {
+            "_ansible_check_mode": True,
+            "path": "/",
+            "schedule": "1d",
+            "retention": {"days": 7},
+        },
+        ceph,
+        capfd,
+    )
+    assert out["changed"]
+    assert out["diff"]["before"] == dict(schedule="1h", retention="7d")
+    assert out["diff"]["after"] == dict(schedule="1d", retention="7d")
+    assert len(ceph.calls) == 1
+
+
+def test_order_only(capfd):
+    ceph = FakeCeph({"/a": dict(schedule=["1d", "1h"], retention={"d": 7, "h": 24})})
+    out = run_module(
+        {
+            "schedule": "1h",
+            "retention": {"days": 7, "hours": 24},
+            "paths": [{"path": "/a"}],
+        },
+        ceph,
+        capfd,
+    )
+    assert not out["changed"]
+    assert out["paths"][0]["commands"] == []
+    assert out["diff"]["before"] == out["diff"]["after"]
+    assert len(ceph.calls) == 1
+
+
+def test_predict_state():
+    assert ceph_fs_snap_schedule.predict_state(
+        ["1h"], {"d": 7}, ["add 1d", "remove 1h", "retention add 24h"]
+    ) == (["1d"], {"d": 7, "h": 24})
+    # Ceph drops retention with the last schedule of a path
+    assert ceph_fs_snap_schedule.predict_state(["1h"], {"d": 7}, ["remove 1h"]) == (
+        [],
+        {},
+    )
+    with pytest.raises(ceph_fs_snap_schedule.CephError):
+        ceph_fs_snap_schedule.predict_state(["1h"], {"d": 7}, ["retention add 14d"])
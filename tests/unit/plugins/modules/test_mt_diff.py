@@ -0,0 +1,170 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import json
+
+import pytest
+
+from ansible_collections.andrei.utils.plugins.modules import mt_diff
+from ansible_collections.andrei.utils.tests.unit.plugins.modules.utils import (
+    set_module_args,
+    validate_output,
+)
+
+EXISTING = [
+    {
+        ".id": "*1",
+        "address": "10.0.50.10",
+        "comment": None,
+        "dynamic": False,
+        "mac-address": "AA:BB:CC:DD:EE:01",
+        "server": "general",
+    },
+    {
+        ".id": "*2",
+        "address": "10.0.50.11",
+        "comment": None,
+        "dynamic": False,
+        "mac-address": "AA:BB:CC:DD:EE:02",
+        "server": "general",
+    },
+    {
+        ".id": "*3",
+        "address": "10.0.10.11",
+        "comment": None,
+        "dynamic": False,
+        "mac-address": "AA:BB:CC:DD:EE:02",
+        "server": "vm",
+    },
+    {
+        ".id": "*4",
+        "address": "10.0.50.99",
+        "comment": "manual",
+        "dynamic": False,
+        "mac-address": "AA:BB:CC:DD:EE:99",
+        "server": "general",
+    },
+]
+
+
+def run_module(args, capfd):
+    set_module_args(args)
+    with pytest.raises(SystemExit):
+        mt_diff.main()
+    out, err = capfd.readouterr()
+    assert not err
+    return json.loads(out)
+
+
+def test_missing_args(capfd):
+    out = run_module({}, capfd)
+    assert out.get("failed", False)
+    assert "missing required arguments" in out["msg"]
+
+
+def test_composite_keys(capfd):
+    args = {
+        "existing": EXISTING,
+        "data": [
+            {
+                "address": "10.0.50.10",
+                "mac-address": "AA:BB:CC:DD:EE:01",
+                "server": "general",
+            },
+            {
+                "address": "10.0.10.12",
+                "mac-address": "AA:BB:CC:DD:EE:02",
+                "server": "vm",
+            },
+            {
+                "address": "10.0.10.13",
+                "mac-address": "AA:BB:CC:DD:EE:03",
+                "server": "vm",
+            },
+        ],
+        "keys": ["mac-address", "server"],
+        "exclude_comment_regex": "^manual",
+    }
+    expected_add = [
+        {
+            "address": "10.0.10.13",
+            "mac-address": "AA:BB:CC:DD:EE:03",
+            "server": "vm",
+        },
+    ]
+    expected_update = [
+        {
+            ".id": "*3",
+            "address": "10.0.10.12",
+            "mac-address": "AA:BB:CC:DD:EE:02",
+            "server": "vm",
+        },
+    ]
+    expected_remove = [EXISTING[1]]
+
+    out = run_module(args, capfd)
+    assert not out.get("failed", False)
+    assert not out["changed"]
+    validate_output(out, expected_add, expected_update, expected_remove)
+
+
+def test_comment_regex(capfd):
+    args = {
+        "existing": EXISTING,
+        "data": [
+            {
+                "address": "10.0.50.100",
+                "comment": "manual",
+                "mac-address": "AA:BB:CC:DD:EE:99",
+            },
+        ],
+        "keys": ["mac-address"],
+        "comment_regex": "^manual",
+    }
+    expected_update = [
+        {
+            ".id": "*4",
+            "address": "10.0.50.100",
+            "comment": "manual",
+            "mac-address": "AA:BB:CC:DD:EE:99",
+        },
+    ]
+    # Entries without comments are always managed
+    expected_remove = EXISTING[:3]
+
+    out = run_module(args, capfd)
+    assert not out.get("failed", False)
+    validate_output(out, [], expected_update, expected_remove)
+
+
+def test_ignore_fields(capfd):
+    args = {
+        "existing": EXISTING[:1],
+        "data": [
+            {
+                "address": "10.0.50.10",
+                "comment": "from inventory",
+                "mac-address": "AA:BB:CC:DD:EE:01",
+            },
+        ],
+        "keys": ["mac-address"],
+        "ignore_fields": ["comment"],
+    }
+
+    out = run_module(args, capfd)
+    assert not out.get("failed", False)
+    validate_output(out, [], [], [])
+
+
+def test_missing_key_field(capfd):
+    args = {
+        "existing": EXISTING,
+        "data": [{"address": "10.0.50.10"}],
+        "keys": ["mac-address", "server"],
+    }
+
+    out = run_module(args, capfd)
+    assert out.get("failed", False)
+    assert "missing key fields mac-address, server" in out["msg"]
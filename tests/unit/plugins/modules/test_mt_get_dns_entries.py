@@ -1837,3 +1837,161 @@ def test_rr_dualstack_multiple(capfd):
     assert not err
     assert not out.get("failed", False)
     validate_output(out, expected_add, expected_update, expected_remove)
+
+
+def test_many_entries(capfd):
+    existing = []
+    data = []
+    for i in range(1000):
+        name = "host%d.example.com" % i
+        existing.append(
+            {
+                ".id": "*%X" % i,
+                "comment": None,
+                "name": name,
+                "address": "10.0.%d.%d" % (i >> 8, i & 0xFF),
+            }
+        )
+        if i % 3:
+            data.append({"name": name, "address": "10.0.%d.%d" % (i >> 8, i & 0xFF)})
+        else:
+            data.append({"name": name, "address": "10.1.%d.%d" % (i >> 8, i & 0xFF)})
+    data.append({"name": "new.example.com", "address": "10.2.0.1"})
+    set_module_args(
+        {
+            "existing": existing,
+            "data": data,
+        }
+    )
+    expected_add = [{"name": "new.example.com", "address": "10.2.0.1"}]
+    expected_update = [
+        {
+            ".id": "*%X" % i,
+            "name": "host%d.example.com" % i,
+            "address": "10.1.%d.%d" % (i >> 8, i & 0xFF),
+        }
+        for i in range(0, 1000, 3)
+    ]
+    expected_remove = []
+
+    with pytest.raises(SystemExit):
+        mt_get_dns_entries.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    validate_output(out, expected_add, expected_update, expected_remove)
+
+
+def test_ipv6_notation_indempotency(capfd):
+    set_module_args(
+        {
+            "existing": [
+                {
+                    ".id": "*1",
+                    "comment": None,
+                    "name": "example.com",
+                    "address": "fd00:0:0::0a",
+                },
+                {
+                    ".id": "*2",
+                    "comment": None,
+                    "name": "example.com",
+                    "address": "10.0.0.1",
+                },
+            ],
+            "data": [
+                {"name": "example.com", "address": "FD00::A"},
+                {"name": "example.com", "address": "10.0.0.1"},
+            ],
+        }
+    )
+
+    with pytest.raises(SystemExit):
+        mt_get_dns_entries.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    validate_output(out, [], [], [])
+
+
+def test_ipv6_notation_update(capfd):
+    set_module_args(
+        {
+            "existing": [
+                {
+                    ".id": "*1",
+                    "comment": None,
+                    "name": "example.com",
+                    "address": "fd00::1",
+                    "ttl": "1d",
+                },
+                {
+                    ".id": "*2",
+                    "comment": None,
+                    "name": "example.com",
+                    "address": "fd00::0:2",
+                    "ttl": "1d",
+                },
+            ],
+            "data": [
+                {"name": "example.com", "address": "fd00::1", "ttl": "1d"},
+                {"name": "example.com", "address": "fd00:0::2", "ttl": "2d"},
+            ],
+        }
+    )
+    expected_update = [
+        {".id": "*2", "name": "example.com", "address": "fd00:0::2", "ttl": "2d"},
+    ]
+
+    with pytest.raises(SystemExit):
+        mt_get_dns_entries.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    validate_output(out, [], expected_update, [])
+
+
+def test_output_commands(capfd):
+    set_module_args(
+        {
+            "existing": [
+                {
+                    ".id": "*1",
+                    "comment": None,
+                    "name": "old.example.com",
+                    "address": "10.0.0.1",
+                },
+                {
+                    ".id": "*2",
+                    "comment": None,
+                    "name": "example.com",
+                    "address": "10.0.0.2",
+                },
+            ],
+            "data": [
+                {"name": "example.com", "address": "10.0.0.3"},
+                {
+                    "name": "new.example.com",
+                    "address": "10.0.0.1",
+                    "comment": 'say "hi" $user',
+                },
+            ],
+            "output_commands": True,
+        }
+    )
+    expected_commands = [
+        "/ip dns static remove *1",
+        '/ip dns static set *2 address="10.0.0.3" name="example.com"',
+        '/ip dns static add address="10.0.0.1" comment="say \\"hi\\" \\$user" name="new.example.com"',
+    ]
+
+    with pytest.raises(SystemExit):
+        mt_get_dns_entries.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    assert out["commands"] == expected_commands
@@ -212,6 +212,57 @@ def test_bad_ports_trunk(capfd):
     assert "'ether101' is not a bridge port" in out["msg"]
 
 
+def test_trunk_without_vlans(capfd):
+    set_module_args(
+        {
+            "networks": {"lan": {"cidr": "10.0.0.0/24"}},
+            "all_ports": ["ether1", "ether2", "ether3"],
+            "trunk_ports": ["ether1", {"vlan": "VM", "ports": ["ether2"]}],
+        }
+    )
+    expected = [
+        {
+            "bridge": "bridge1",
+            "interface": "ether1",
+            "frame-types": "admit-only-vlan-tagged",
+        },
+        {
+            "bridge": "bridge1",
+            "interface": "ether2",
+            "frame-types": "admit-only-vlan-tagged",
+        },
+        {
+            "bridge": "bridge1",
+            "interface": "ether3",
+        },
+    ]
+
+    with pytest.raises(SystemExit):
+        mt_get_interface_bridge_ports.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    assert out["new_data"] == expected
+
+
+def test_bad_ports_trunk_without_vlans(capfd):
+    set_module_args(
+        {
+            "networks": {"lan": {"cidr": "10.0.0.0/24"}},
+            "all_ports": ["ether1", "ether2"],
+            "trunk_ports": ["ether101"],
+        }
+    )
+    with pytest.raises(SystemExit):
+        mt_get_interface_bridge_ports.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert out.get("failed", False)
+    assert "'ether101' is not a bridge port" in out["msg"]
+
+
 def test_selective_trunk(capfd):
     set_module_args(
         {
@@ -385,3 +436,134 @@ def test_hybrid_crs3xx(capfd):
     assert not err
     assert not out.get("failed", False)
     assert out["new_data"] == expected
+
+
+def test_existing_stale_pvid(capfd):
+    set_module_args(
+        {
+            "networks": NETWORKS,
+            "all_ports": ["ether1", "ether2"],
+            "trunk_ports": ["ether1"],
+            "access_ports": [{"vlan": "VM", "ports": ["ether2"]}],
+            "existing": [
+                {
+                    ".id": "*1",
+                    "bridge": "bridge1",
+                    "frame-types": "admit-only-vlan-tagged",
+                    "horizon": "none",
+                    "interface": "ether1",
+                    # Was an access port before
+                    "pvid": 50,
+                },
+                {
+                    ".id": "*2",
+                    "bridge": "bridge1",
+                    "frame-types": "admit-all",
+                    "horizon": "none",
+                    "interface": "ether2",
+                    "pvid": 10,
+                },
+            ],
+        }
+    )
+    expected_update = [
+        {
+            ".id": "*1",
+            "bridge": "bridge1",
+            "frame-types": "admit-only-vlan-tagged",
+            "interface": "ether1",
+        },
+    ]
+
+    with pytest.raises(SystemExit):
+        mt_get_interface_bridge_ports.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    assert not out["unchanged"]
+    assert out["to_add"] == []
+    assert out["to_update"] == expected_update
+    assert out["to_remove"] == []
+
+
+def test_existing_unchanged(capfd):
+    set_module_args(
+        {
+            "networks": NETWORKS,
+            "all_ports": ["ether1", "ether2"],
+            "trunk_ports": ["ether1"],
+            "access_ports": [{"vlan": "VM", "ports": ["ether2"]}],
+            "port_params": {"hw": True},
+            "existing": [
+                {
+                    ".id": "*1",
+                    "bridge": "bridge1",
+                    "frame-types": "admit-only-vlan-tagged",
+                    "hw": True,
+                    "interface": "ether1",
+                    "pvid": 1,
+                },
+                {
+                    ".id": "*2",
+                    "bridge": "bridge1",
+                    "frame-types": "admit-all",
+                    "hw": True,
+                    "interface": "ether2",
+                    "pvid": 10,
+                },
+            ],
+        }
+    )
+
+    with pytest.raises(SystemExit):
+        mt_get_interface_bridge_ports.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    assert out["unchanged"]
+
+
+def test_existing_other_fields_changed(capfd):
+    set_module_args(
+        {
+            "networks": NETWORKS,
+            "all_ports": ["ether1", "ether2"],
+            "trunk_ports": ["ether1"],
+            "access_ports": [{"vlan": "VM", "ports": ["ether2"]}],
+            "port_params": {"hw": True},
+            "existing": [
+                {
+                    ".id": "*1",
+                    "bridge": "bridge1",
+                    "frame-types": "admit-only-vlan-tagged",
+                    "hw": True,
+                    "interface": "ether1",
+                    "pvid": 1,
+                    "comment": "",
+                    "horizon": "none",
+                },
+                {
+                    ".id": "*2",
+                    "bridge": "bridge1",
+                    "frame-types": "admit-all",
+                    "hw": True,
+                    "interface": "ether2",
+                    "pvid": 10,
+                    # Changed outside of this module
+                    "comment": "temporary",
+                    "learn": "no",
+                },
+            ],
+        }
+    )
+
+    with pytest.raises(SystemExit):
+        mt_get_interface_bridge_ports.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    assert not out["unchanged"]
+    assert [d["interface"] for d in out["to_update"]] == ["ether2"]
@@ -538,6 +538,15 @@ def test_all(capfd):
     assert not err
     assert not out.get("failed", False)
     validate_output(out, expected_add, expected_update, expected_remove)
+    assert out["commands"] == [
+        "/interface ethernet switch vlan remove 5",
+        "/interface ethernet switch vlan set 3"
+        ' ports="switch2-cpu,ether1,ether2,ether50,ether60,sfpplus1,sfpplus30,sfp-sfpplus1,sfp-sfpplus30"'
+        ' vlan-id=100',
+        "/interface ethernet switch vlan add"
+        ' ports="switch2-cpu,ether1,ether2,ether40,ether100,sfpplus1,sfpplus20,sfp-sfpplus1,sfp-sfpplus10"'
+        ' vlan-id=50',
+    ]
 
 
 def test_access_to_trunk(capfd):
@@ -11,6 +11,7 @@ from ansible_collections.andrei.utils.plugins.modules import (
 )
 from ansible_collections.andrei.utils.tests.unit.plugins.modules.utils import (
     set_module_args,
+    validate_output,
 )
 
 
@@ -139,3 +140,122 @@ def test_all(capfd):
     assert not err
     assert not out.get("failed", False)
     assert out["new_data"] == expected
+
+
+def test_existing(capfd):
+    set_module_args(
+        {
+            "networks": {
+                "vm": {
+                    "vlan": 10,
+                },
+                "general": {
+                    "vlan": 50,
+                    "cidr": "10.0.50.0/24",
+                },
+                "mgmt": {
+                    "vlan": 100,
+                },
+            },
+            "existing": [
+                {
+                    ".id": "*1",
+                    "arp": "enabled",
+                    "interface": "bridge1",
+                    "name": "VM",
+                    "vlan-id": 10,
+                    "mtu": 1500,
+                },
+                {
+                    ".id": "*2",
+                    "interface": "bridge1",
+                    "name": "GENERAL",
+                    "vlan-id": 50,
+                    "mtu": 1500,
+                },
+                {
+                    ".id": "*3",
+                    "interface": "bridge1",
+                    "name": "OLD",
+                    "vlan-id": 20,
+                    "mtu": 1500,
+                },
+            ],
+        }
+    )
+    expected_add = [
+        {
+            "interface": "bridge1",
+            "name": "MGMT",
+            "vlan-id": 100,
+            "mtu": 1500,
+            "comment": None,
+        },
+    ]
+    expected_update = [
+        {
+            ".id": "*2",
+            "interface": "bridge1",
+            "name": "GENERAL",
+            "vlan-id": 50,
+            "mtu": 1500,
+            "comment": "10.0.50.0/24",
+        },
+    ]
+
+    with pytest.raises(SystemExit):
+        mt_get_interface_vlan.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    assert not out["changed"]
+    assert not out["unchanged"]
+    validate_output(
+        out,
+        expected_add,
+        expected_update,
+        [
+            {
+                ".id": "*3",
+                "interface": "bridge1",
+                "name": "OLD",
+                "vlan-id": 20,
+                "mtu": 1500,
+            }
+        ],
+    )
+    assert all(".id" not in d for d in out["new_data"])
+
+
+def test_existing_unchanged(capfd):
+    set_module_args(
+        {
+            "networks": {
+                "general": {
+                    "vlan": 50,
+                    "cidr": "10.0.50.0/24",
+                },
+            },
+            "existing": [
+                {
+                    ".id": "*2",
+                    "arp": "enabled",
+                    "comment": "10.0.50.0/24",
+                    "interface": "bridge1",
+                    "name": "GENERAL",
+                    "vlan-id": 50,
+                    "mtu": 1500,
+                },
+            ],
+        }
+    )
+
+    with pytest.raises(SystemExit):
+        mt_get_interface_vlan.main()
+    out, err = capfd.readouterr()
+    out = json.loads(out)
+    assert not err
+    assert not out.get("failed", False)
+    assert out["unchanged"]
+    validate_output(out, [], [], [])
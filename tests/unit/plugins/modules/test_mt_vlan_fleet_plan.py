@@ -0,0 +1,126 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import json
+
+import pytest
+
+from unittest.mock import patch
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt import utils
+from ansible_collections.andrei.utils.plugins.modules import mt_vlan_fleet_plan
+from ansible_collections.andrei.utils.tests.unit.plugins.modules.utils import (
+    set_module_args,
+)
+
+NETWORKS = {
+    "vm": {
+        "vlan": 10,
+    },
+    "general": {
+        "vlan": 50,
+    },
+}
+
+HOSTS = {
+    "switch1": {
+        "all_ports": ["ether1", "ether2", "sfp-sfpplus1"],
+        "trunk_ports": ["sfp-sfpplus1"],
+        "access_ports": [{"vlan": "GENERAL", "ports": ["ether2", "ether1"]}],
+    },
+    "switch2": {
+        "all_ports": ["ether1", "ether2", "sfp-sfpplus1"],
+        "trunk_ports": ["sfp-sfpplus1"],
+        "access_ports": [{"vlan": "VM", "ports": ["ether1", "ether2"]}],
+        "bridge_name": "bridge2",
+    },
+    "legacy1": {
+        "networks": {"other": {"vlan": 20}},
+        "all_ports": ["ether1"],
+        "trunk_ports": ["ether1"],
+        "legacy": True,
+        "existing": {
+            "sw_vlan": [{".id": "*1", "ports": "switch1-cpu,ether1", "vlan-id": 20}],
+        },
+    },
+}
+
+
+def run_module(args, capfd):
+    set_module_args(args)
+    with pytest.raises(SystemExit):
+        mt_vlan_fleet_plan.main()
+    out, err = capfd.readouterr()
+    assert not err
+    return json.loads(out)
+
+
+def test_missing_args(capfd):
+    out = run_module({}, capfd)
+    assert out.get("failed", False)
+    assert "missing required arguments" in out["msg"]
+
+
+def test_plans(capfd):
+    out = run_module({"hosts": HOSTS, "networks": NETWORKS}, capfd)
+    assert not out.get("failed", False)
+    plans = out["plans"]
+    assert sorted(plans.keys()) == ["legacy1", "switch1", "switch2"]
+    for host in ("switch1", "switch2"):
+        expected = utils.get_vlan_plan(
+            networks=NETWORKS,
+            all_ports=HOSTS[host]["all_ports"],
+            trunk_ports=HOSTS[host]["trunk_ports"],
+            access_ports=HOSTS[host]["access_ports"],
+            bridge_name=HOSTS[host].get("bridge_name", "bridge1"),
+            port_params={},
+            legacy=False,
+            switch_cpu="switch1-cpu",
+            existing={},
+        )
+        expected.pop("changed")
+        assert plans[host] == expected
+    assert plans["switch1"]["bridge_vlan"]["new_data"][1] == {
+        "bridge": "bridge1",
+        "vlan-ids": 50,
+        "untagged": "ether1,ether2",
+        "tagged": "bridge1,sfp-sfpplus1",
+    }
+    assert plans["legacy1"]["sw_vlan"] == {
+        "to_add": [],
+        "to_update": [],
+        "to_remove": [],
+        "commands": [],
+    }
+    assert plans["legacy1"]["sw_egress"]["to_add"] == [
+        {"tagged-ports": "switch1-cpu,ether1", "vlan-id": 20}
+    ]
+
+
+def test_shared_cache(capfd):
+    with patch.object(utils, "make_vid_map", wraps=utils.make_vid_map) as mock_map:
+        out = run_module({"hosts": HOSTS, "networks": NETWORKS}, capfd)
+    assert not out.get("failed", False)
+    # One for the shared networks, one for legacy1
+    assert mock_map.call_count == 2
+
+
+def test_host_error(capfd):
+    hosts = {
+        "switch1": {
+            "all_ports": ["ether1"],
+            "access_ports": [{"vlan": "MISSING", "ports": ["ether1"]}],
+        }
+    }
+    out = run_module({"hosts": hosts, "networks": NETWORKS}, capfd)
+    assert out.get("failed", False)
+    assert out["msg"] == "switch1: Cannot find VID for 'MISSING'"
+
+
+def test_host_invalid_args(capfd):
+    hosts = {"switch1": {"trunk_ports": []}}
+    out = run_module({"hosts": hosts}, capfd)
+    assert out.get("failed", False)
+    assert out["msg"].startswith("switch1: missing required arguments")
@@ -0,0 +1,302 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import copy
+import json
+
+import pytest
+
+from ansible_collections.andrei.utils.plugins.module_utils.mt import utils
+from ansible_collections.andrei.utils.plugins.modules import mt_vlan_plan
+from ansible_collections.andrei.utils.tests.unit.plugins.modules.utils import (
+    set_module_args,
+)
+
+NETWORKS = {
+    "vm": {
+        "vlan": 10,
+        "cidr": "10.0.10.0/24",
+    },
+    "general": {
+        "vlan": 50,
+        "cidr": "10.0.50.0/24",
+    },
+    "mgmt": {
+        "vlan": 100,
+    },
+}
+
+ALL_PORTS = ["ether1", "ether2", "ether3", "ether4", "ether5", "sfp-sfpplus1"]
+
+TRUNK_PORTS = [
+    "sfp-sfpplus1",
+    {"vlan": "VM", "ports": ["ether5"]},
+]
+
+ACCESS_PORTS = [
+    {"vlan": "GENERAL", "ports": ["ether3", "ether2"]},
+    {"vlan": "MGMT", "ports": ["ether4"]},
+]
+
+EXISTING = {
+    "sw_vlan": [
+        {".id": "*1", "ports": "switch1-cpu,sfp-sfpplus1", "vlan-id": 10},
+        {".id": "*2", "ports": "switch1-cpu,ether1", "vlan-id": 20},
+    ],
+    "sw_egress": [
+        {".id": "*3", "tagged-ports": "switch1-cpu,sfp-sfpplus1", "vlan-id": 50},
+    ],
+    "sw_ingress": [
+        {
+            ".id": "*4",
+            "customer-vid": 0,
+            "new-customer-vid": 100,
+            "ports": "ether4",
+        },
+    ],
+}
+
+
+def run_module(args, capfd):
+    set_module_args(args)
+    with pytest.raises(SystemExit):
+        mt_vlan_plan.main()
+    out, err = capfd.readouterr()
+    assert not err
+    return json.loads(out)
+
+
+def test_missing_args(capfd):
+    out = run_module({}, capfd)
+    assert out.get("failed", False)
+    assert "missing required arguments" in out["msg"]
+
+
+def test_modern(capfd):
+    out = run_module(
+        {
+            "networks": NETWORKS,
+            "all_ports": ALL_PORTS,
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+            "bridge_name": "bridge2",
+            "port_params": {"hw": True},
+        },
+        capfd,
+    )
+    assert not out.get("failed", False)
+    assert not out["changed"]
+    assert "sw_vlan" not in out
+    assert (
+        out["interface_vlan"]["new_data"]
+        == utils.get_interface_vlan(NETWORKS, "bridge2")["new_data"]
+    )
+    assert (
+        out["bridge_ports"]["new_data"]
+        == utils.get_bridge_ports(
+            NETWORKS,
+            ALL_PORTS,
+            TRUNK_PORTS,
+            ACCESS_PORTS,
+            "bridge2",
+            {"hw": True},
+        )["new_data"]
+    )
+    assert out["bridge_vlan"]["new_data"] == [
+        {
+            "bridge": "bridge2",
+            "vlan-ids": 10,
+            "tagged": "bridge2,ether5,sfp-sfpplus1",
+        },
+        {
+            "bridge": "bridge2",
+            "vlan-ids": 50,
+            "untagged": "ether2,ether3",
+            "tagged": "bridge2,sfp-sfpplus1",
+        },
+        {
+            "bridge": "bridge2",
+            "vlan-ids": 100,
+            "untagged": "ether4",
+            "tagged": "bridge2,sfp-sfpplus1",
+        },
+    ]
+
+
+def test_legacy(capfd):
+    out = run_module(
+        {
+            "networks": NETWORKS,
+            "all_ports": ALL_PORTS,
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+            "legacy": True,
+            "existing": copy.deepcopy(EXISTING),
+        },
+        capfd,
+    )
+    assert not out.get("failed", False)
+    assert "bridge_vlan" not in out
+    # No VLAN settings on bridge ports
+    assert out["bridge_ports"]["new_data"] == [
+        {"bridge": "bridge1", "interface": p} for p in ALL_PORTS
+    ]
+    expected_sw_vlan = utils.get_sw_vlan(
+        copy.deepcopy(EXISTING["sw_vlan"]),
+        NETWORKS,
+        TRUNK_PORTS,
+        ACCESS_PORTS,
+        "switch1-cpu",
+    )
+    expected_sw_egress = utils.get_sw_egress(
+        copy.deepcopy(EXISTING["sw_egress"]),
+        NETWORKS,
+        TRUNK_PORTS,
+        ACCESS_PORTS,
+        "switch1-cpu",
+    )
+    expected_sw_ingress = utils.get_sw_ingress(
+        copy.deepcopy(EXISTING["sw_ingress"]),
+        NETWORKS,
+        ACCESS_PORTS,
+    )
+    for key, expected in (
+        ("sw_vlan", expected_sw_vlan),
+        ("sw_egress", expected_sw_egress),
+        ("sw_ingress", expected_sw_ingress),
+    ):
+        expected.pop("changed")
+        assert out[key] == expected
+    assert out["sw_vlan"]["to_remove"] == [EXISTING["sw_vlan"][1]]
+
+
+def test_legacy_no_existing(capfd):
+    out = run_module(
+        {
+            "networks": NETWORKS,
+            "all_ports": ALL_PORTS,
+            "access_ports": ACCESS_PORTS,
+            "legacy": True,
+        },
+        capfd,
+    )
+    assert not out.get("failed", False)
+    assert len(out["sw_vlan"]["to_add"]) == 2
+    assert len(out["sw_ingress"]["to_add"]) == 2
+    assert out["sw_egress"] == {
+        "to_add": [],
+        "to_update": [],
+        "to_remove": [],
+        "commands": [],
+    }
+    assert out["sw_ingress"]["commands"] == [
+        "/interface ethernet switch ingress-vlan-translation add"
+        ' customer-vid=0 new-customer-vid=50 ports="ether3,ether2"',
+        "/interface ethernet switch ingress-vlan-translation add"
+        ' customer-vid=0 new-customer-vid=100 ports="ether4"',
+    ]
+
+
+def test_missing_vlan(capfd):
+    out = run_module(
+        {
+            "networks": NETWORKS,
+            "all_ports": ALL_PORTS,
+            "access_ports": [{"vlan": "MISSING", "ports": ["ether1"]}],
+        },
+        capfd,
+    )
+    assert out.get("failed", False)
+    assert out["msg"] == "Cannot find VID for 'MISSING'"
+
+
+def test_port_ranges(capfd):
+    expanded = run_module(
+        {
+            "networks": NETWORKS,
+            "all_ports": ALL_PORTS,
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+        },
+        capfd,
+    )
+    out = run_module(
+        {
+            "networks": NETWORKS,
+            "all_ports": ["ether1-5", "sfp-sfpplus1"],
+            "trunk_ports": ["sfp-sfpplus1", {"vlan": "VM", "ports": ["ether5-5"]}],
+            "access_ports": [
+                {"vlan": "GENERAL", "ports": ["ether2-3"]},
+                {"vlan": "MGMT", "ports": ["ether4"]},
+            ],
+            "summary": True,
+        },
+        capfd,
+    )
+    assert out.pop("summary") == {
+        "VM": {"vlan-id": 10, "tagged": "ether5,sfp-sfpplus1", "untagged": ""},
+        "GENERAL": {"vlan-id": 50, "tagged": "sfp-sfpplus1", "untagged": "ether2-3"},
+        "MGMT": {"vlan-id": 100, "tagged": "sfp-sfpplus1", "untagged": "ether4"},
+    }
+    out.pop("invocation")
+    expanded.pop("invocation")
+    assert out == expanded
+
+
+def test_invalid_port_range(capfd):
+    out = run_module(
+        {
+            "networks": NETWORKS,
+            "all_ports": ["ether5-1"],
+        },
+        capfd,
+    )
+    assert out.get("failed", False)
+    assert out["msg"] == "Invalid port range 'ether5-1'"
+
+
+def test_existing_tables(capfd):
+    interface_vlan = utils.get_interface_vlan(NETWORKS, "bridge1")["new_data"]
+    existing_vlans = [
+        dict(d, **{".id": "*%d" % i}) for i, d in enumerate(interface_vlan)
+    ]
+    out = run_module(
+        {
+            "networks": NETWORKS,
+            "all_ports": ALL_PORTS,
+            "trunk_ports": TRUNK_PORTS,
+            "access_ports": ACCESS_PORTS,
+            "existing": {"interface_vlan": existing_vlans},
+        },
+        capfd,
+    )
+    assert not out.get("failed", False)
+    assert out["interface_vlan"]["unchanged"]
+    assert out["interface_vlan"]["new_data"] == interface_vlan
+    assert "unchanged" not in out["bridge_ports"]
+
+
+def test_fingerprint(capfd):
+    args = {
+        "networks": NETWORKS,
+        "all_ports": ALL_PORTS,
+        "trunk_ports": TRUNK_PORTS,
+        "access_ports": ACCESS_PORTS,
+        "legacy": True,
+    }
+    first = run_module(copy.deepcopy(args), capfd)
+    assert not first["fingerprint_matches"]
+
+    # Existing tables don't change the fingerprint
+    args["existing"] = copy.deepcopy(EXISTING)
+    args["existing_fingerprint"] = first["fingerprint"]
+    out = run_module(copy.deepcopy(args), capfd)
+    assert out["fingerprint"] == first["fingerprint"]
+    assert out["fingerprint_matches"]
+
+    args["access_ports"] = ACCESS_PORTS[:1]
+    out = run_module(copy.deepcopy(args), capfd)
+    assert out["fingerprint"] != first["fingerprint"]
+    assert not out["fingerprint_matches"]
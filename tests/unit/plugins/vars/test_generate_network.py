@@ -0,0 +1,94 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import Group
+from ansible.inventory.host import Host
+from ansible.parsing.dataloader import DataLoader
+from ansible.plugins.loader import vars_loader
+
+from ansible_collections.andrei.utils.plugins.vars import generate_network
+
+NETWORK = """
+base_net:
+  lan:
+    cidr: 10.0.0.0/16
+"""
+
+SUBNETS = """
+subnets:
+  lan:
+    servers:
+      - "{{ base_net.lan.cidr | replace('0.0/16', '1.0/24') }}"
+    _reserved:
+      - 10.0.2.0/24
+"""
+
+
+class TestGenerateNetworkVars(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        for name, content in (("network.yml", NETWORK), ("subnets.yml", SUBNETS)):
+            with open(os.path.join(self.tmp_dir, name), "w") as f:
+                f.write(content)
+        self.plugin = vars_loader.get("andrei.utils.generate_network")
+        self.plugin.set_options(
+            direct=dict(network_files=["network.yml", "subnets.yml"])
+        )
+        self.loader = DataLoader()
+        generate_network.CACHE.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def get_vars(self, entities):
+        return self.plugin.get_vars(self.loader, self.tmp_dir, entities)
+
+    def test_group_vars(self):
+        expected = {
+            "base_net": {"lan": {"cidr": "10.0.0.0/16"}},
+            "subnets": {"lan": {"servers": ["10.0.1.0/24"]}},
+        }
+        self.assertEqual(self.get_vars([Group("all")]), expected)
+
+    def test_other_entities(self):
+        self.assertEqual(self.get_vars([Group("other"), Host("host1")]), {})
+
+    def test_missing_files(self):
+        self.plugin.set_options(direct=dict(network_files=["missing.yml"]))
+        self.assertEqual(self.get_vars([Group("all")]), {})
+
+    def test_cached(self):
+        first = self.get_vars([Group("all")])
+        with patch.object(generate_network, "lookup_loader") as mock_loader:
+            second = self.get_vars([Group("all")])
+        mock_loader.get.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_cached_copy(self):
+        first = self.get_vars([Group("all")])
+        first["subnets"]["lan"]["servers"].append("10.0.3.0/24")
+        second = self.get_vars([Group("all")])
+        self.assertEqual(second["subnets"]["lan"]["servers"], ["10.0.1.0/24"])
+
+    def test_cache_content_changed(self):
+        self.get_vars([Group("all")])
+        with open(os.path.join(self.tmp_dir, "network.yml"), "w") as f:
+            f.write(NETWORK.replace("10.0.0.0/16", "10.1.0.0/16"))
+        result = self.get_vars([Group("all")])
+        self.assertEqual(result["base_net"]["lan"]["cidr"], "10.1.0.0/16")
+        self.assertEqual(len(generate_network.CACHE), 2)
+
+    def test_validation(self):
+        with open(os.path.join(self.tmp_dir, "subnets.yml"), "a") as f:
+            f.write("    other:\n      - 10.0.1.128/25\n")
+        with self.assertRaisesRegex(AnsibleParserError, "overlaps with"):
+            self.get_vars([Group("all")])